@@ -0,0 +1,39 @@
+"""Shared helpers for the benchmark scripts."""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, cast
+
+SCRIPTS = Path(__file__).resolve().parents[1] / "scripts"
+if str(SCRIPTS) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS))
+
+
+def load_script(filename: str, module_name: str) -> Any:
+    """Import a numbered pipeline script (e.g. ``01_clean_data.py``) as a module."""
+
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, SCRIPTS / filename)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Failed to load {filename}")
+    module = cast(Any, importlib.util.module_from_spec(spec))
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)  # type: ignore[arg-type]
+    return module
+
+
+def best_of(func: Callable[[], object], *, repeat: int = 3) -> float:
+    """Return the fastest wall time (seconds) over ``repeat`` calls of ``func``."""
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
@@ -0,0 +1,165 @@
+"""Per-value reference implementations that ``01_clean_data.py`` used to run.
+
+The pipeline now decodes every JSON column in one pass
+(``_decode_json_columns``) and buckets whole columns (``buckets.bucketize``).
+These scalar helpers are kept only as the baselines that
+``bench_json_decode.py`` and ``bench_buckets.py`` time and check results against.
+"""
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+
+from buckets import BUCKETS, UNKNOWN_DECADE
+
+
+def parse_json_list(value: object) -> list[dict]:
+    """Return a parsed list of dicts for JSON-like columns."""
+    if isinstance(value, str) and value.strip():
+        loaded = json.loads(value)
+        if isinstance(loaded, list):
+            return [item for item in loaded if isinstance(item, dict)]
+    return []
+
+
+def names_from_json(value: object, *, key: str = "name") -> list[str]:
+    """Return all truthy string values for ``key`` from a JSON-like payload.
+
+    Args:
+        value: Raw JSON string, list of dicts, or other value to inspect.
+        key: Dictionary key whose values should be collected.
+
+    Returns:
+        A list of strings extracted from the JSON structure. Missing or falsey
+        values are ignored.
+    """
+
+    return [item[key] for item in parse_json_list(value) if key in item and item[key]]
+
+
+def codes_from_json(key: str):
+    """Build an extractor that returns all truthy values for ``key``.
+
+    Args:
+        key: Dictionary key to read from each JSON object.
+
+    Returns:
+        A callable that accepts a JSON-like payload and returns a list of codes
+        associated with ``key``.
+    """
+
+    def extractor(value: object) -> list[str]:
+        """Extract values for the preconfigured key from ``value``."""
+        return [item[key] for item in parse_json_list(value) if key in item and item[key]]
+
+    return extractor
+
+
+def extract_director(crew_str: object) -> str:
+    """Return the first crew member whose job is ``Director``.
+
+    Returns:
+        The name of the first director found, or "Unknown" if no director exists.
+    """
+
+    for entry in parse_json_list(crew_str):
+        if entry.get("job") == "Director" and entry.get("name"):
+            return entry["name"]
+    return "Unknown"
+
+
+def pick_if_present(position: int, default: str = "Unknown"):
+    """Return a function that picks a position from a sequence if available.
+
+    Args:
+        position: The zero-based index to extract from the sequence.
+        default: Value to return if the position doesn't exist or is empty.
+
+    Returns:
+        A function that extracts the item at ``position`` or returns ``default``.
+    """
+
+    def picker(seq: list[str]) -> str:
+        if isinstance(seq, list) and len(seq) > position:
+            value = seq[position]
+            if isinstance(value, str) and value:
+                return value
+        return default
+
+    return picker
+
+
+def take_first(n: int):
+    """Return a function that returns the first ``n`` entries from a list.
+
+    Args:
+        n: Number of elements to take from the beginning.
+
+    Returns:
+        A function that returns the first n elements of a list, or an empty
+        list if the input is not a list.
+    """
+
+    def taker(seq: list[str]) -> list[str]:
+        if isinstance(seq, list):
+            return seq[:n]
+        return []
+
+    return taker
+
+
+def decade_label(year: int | None) -> str:
+    """Convert a release year into a decade label (e.g., ``1990s``).
+
+    Args:
+        year: A release year (e.g., 1995).
+
+    Returns:
+        A decade string like "1990s", or "Unknown" if year is None or NaN.
+    """
+
+    if year is None or np.isnan(year):
+        return UNKNOWN_DECADE
+    return f"{int(year // 10 * 10)}s"
+
+
+def budget_category(amount: float) -> str:
+    """Bucket budgets into low/medium/high tiers.
+
+    Returns:
+        - "low" if budget < $20M
+        - "medium" if $20M <= budget < $80M
+        - "high" if budget >= $80M
+        - "unknown" if budget is None or NaN
+    """
+
+    return BUCKETS["budget_category"].label(amount)
+
+
+def vote_count_bucket(votes: float) -> str:
+    """Classify vote counts into engagement buckets.
+
+    Returns:
+        - "emerging" if votes < 500
+        - "established" if 500 <= votes < 2000
+        - "blockbuster" if votes >= 2000
+        - "unknown" if votes is None or NaN
+    """
+
+    return BUCKETS["vote_count_bucket"].label(votes)
+
+
+def runtime_bucket(runtime: float) -> str:
+    """Categorise runtimes into short/standard/extended/epic.
+
+    Returns:
+        - "short" if runtime < 90 minutes
+        - "standard" if 90 <= runtime < 120 minutes
+        - "extended" if 120 <= runtime < 150 minutes
+        - "epic" if runtime >= 150 minutes
+        - "unknown" if runtime is None or NaN
+    """
+
+    return BUCKETS["runtime_bucket"].label(runtime)
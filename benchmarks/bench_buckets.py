@@ -0,0 +1,77 @@
+"""Compare per-row ``Series.apply`` bucketing with the vectorized bucket table.
+
+Usage:
+    uv run python benchmarks/bench_buckets.py --rows 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from _common import best_of
+from _legacy import budget_category, decade_label, runtime_bucket, vote_count_bucket
+from buckets import BUCKETS, bucketize, decade_labels
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(
+        {
+            "release_year": rng.integers(1920, 2025, args.rows).astype("float64"),
+            "budget": rng.lognormal(17, 1.2, args.rows),
+            "vote_count": rng.integers(0, 20_000, args.rows).astype("float64"),
+            "runtime": rng.normal(110, 25, args.rows),
+        }
+    )
+    frame.loc[frame.sample(frac=0.01, random_state=0).index, "budget"] = np.nan
+
+    cases = [
+        ("decade", "release_year", decade_label, decade_labels),
+        (
+            "budget_category",
+            "budget",
+            budget_category,
+            lambda s: bucketize(s, BUCKETS["budget_category"]),
+        ),
+        (
+            "vote_count_bucket",
+            "vote_count",
+            vote_count_bucket,
+            lambda s: bucketize(s, BUCKETS["vote_count_bucket"]),
+        ),
+        (
+            "runtime_bucket",
+            "runtime",
+            runtime_bucket,
+            lambda s: bucketize(s, BUCKETS["runtime_bucket"]),
+        ),
+    ]
+
+    print(f"{args.rows:,} rows")
+    for name, source, scalar, vectorized in cases:
+        column = frame[source]
+        legacy = column.apply(scalar)
+        fast = pd.Series(vectorized(column), index=column.index)
+        assert legacy.tolist() == fast.astype(str).tolist(), name
+
+        apply_seconds = best_of(lambda: column.apply(scalar), repeat=args.repeat)
+        vector_seconds = best_of(lambda: vectorized(column), repeat=args.repeat)
+        legacy_mb = legacy.astype(object).memory_usage(deep=True) / 1e6
+        fast_mb = fast.memory_usage(deep=True) / 1e6
+        print(
+            f"  {name:<18} apply {apply_seconds:7.3f}s  vectorized {vector_seconds:7.4f}s "
+            f"({apply_seconds / vector_seconds:6.0f}x)  "
+            f"object {legacy_mb:6.1f} MB -> categorical {fast_mb:5.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Compare categorical encodings for the high-cardinality model features.
+
+For each encoding of ``director``, ``lead_actor`` and ``top_keyword`` the
+benchmark reports the width and memory of the preprocessed feature matrix,
+the time to fit the full pipeline and the 5-fold CV metrics. Run
+``scripts/01_clean_data.py`` first.
+
+Usage:
+    uv run python benchmarks/bench_encodings.py --n-estimators 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+from _common import load_script
+from encoders import ENCODINGS
+from movie_data import clean_data_path, load_clean_columns
+
+_model = load_script("04_build_model.py", "build_model")
+
+
+def _matrix_bytes(matrix: object) -> int:
+    if sp.issparse(matrix):
+        csr = sp.csr_matrix(matrix)
+        return csr.data.nbytes + csr.indices.nbytes + csr.indptr.nbytes
+    return np.asarray(matrix).nbytes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n-estimators", type=int, default=100)
+    args = parser.parse_args()
+
+    columns = set(_model.NUM_FEATURES + _model.CAT_FEATURES + ["vote_average"])
+    df, _ = load_clean_columns(clean_data_path(), columns)
+    X = df[_model.NUM_FEATURES + _model.CAT_FEATURES]
+    y = df["vote_average"].astype(float)
+
+    print(f"{len(X)} rows; high-cardinality columns: {_model.HIGH_CARDINALITY_FEATURES}")
+    print(f"{'encoding':<8} {'width':>6} {'matrix':>10} {'fit':>7} {'CV R^2':>14} {'CV MAE':>14}")
+    for mode in ENCODINGS:
+        encodings = dict.fromkeys(_model.HIGH_CARDINALITY_FEATURES, mode)
+        pipeline = _model._build_pipeline(encodings)
+        pipeline.set_params(model__n_estimators=args.n_estimators)
+
+        matrix = pipeline.named_steps["pre"].fit_transform(X, y)
+        start = time.perf_counter()
+        pipeline.fit(X, y)
+        fit_seconds = time.perf_counter() - start
+        folds = _model._cross_validate_folds(pipeline, X, y)
+
+        print(
+            f"{mode:<8} {matrix.shape[1]:>6} {_matrix_bytes(matrix) / 1e6:>8.2f}MB "
+            f"{fit_seconds:>6.2f}s "
+            f"{folds['r2'].mean():>7.3f} ± {folds['r2'].std(ddof=0):.3f} "
+            f"{folds['mae'].mean():>7.3f} ± {folds['mae'].std(ddof=0):.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Compare the model engines side by side.
+
+For each engine in ``04_build_model.ENGINES`` the benchmark reports the time
+to fit the full pipeline, batch predict throughput and the 5-fold CV
+metrics on the cleaned dataset. Run ``scripts/01_clean_data.py`` first.
+
+Usage:
+    uv run python benchmarks/bench_engines.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import pandas as pd
+
+from _common import best_of, load_script
+from movie_data import clean_data_path, load_clean_columns
+
+_model = load_script("04_build_model.py", "build_model")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--predict-rows", type=int, default=100_000, help="Rows per predict-throughput call."
+    )
+    args = parser.parse_args()
+
+    columns = set(_model.NUM_FEATURES + _model.CAT_FEATURES + ["vote_average"])
+    df, _ = load_clean_columns(clean_data_path(), columns)
+    X = df[_model.NUM_FEATURES + _model.CAT_FEATURES]
+    y = df["vote_average"].astype(float)
+    repeats = -(-args.predict_rows // len(X))
+    X_predict = pd.concat([X] * repeats, ignore_index=True).head(args.predict_rows)
+
+    print(f"{len(X)} training rows, predicting {len(X_predict)} rows")
+    print(f"{'engine':<7} {'fit':>7} {'predict rows/s':>15} {'CV R^2':>14} {'CV MAE':>14}")
+    for engine in _model.ENGINES:
+        pipeline = _model._build_pipeline(engine=engine)
+        start = time.perf_counter()
+        pipeline.fit(X, y)
+        fit_seconds = time.perf_counter() - start
+        predict_seconds = best_of(lambda: pipeline.predict(X_predict), repeat=2)
+        folds = _model._cross_validate_folds(pipeline, X, y)
+
+        print(
+            f"{engine:<7} {fit_seconds:>6.2f}s {len(X_predict) / predict_seconds:>15,.0f} "
+            f"{folds['r2'].mean():>7.3f} ± {folds['r2'].std(ddof=0):.3f} "
+            f"{folds['mae'].mean():>7.3f} ± {folds['mae'].std(ddof=0):.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Compare the legacy per-column JSON parsing with the single-pass decoder.
+
+Usage:
+    uv run python benchmarks/bench_json_decode.py --rows 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+from _common import best_of, load_script
+from _legacy import (
+    codes_from_json,
+    extract_director,
+    names_from_json,
+    pick_if_present,
+    take_first,
+)
+
+_clean = load_script("01_clean_data.py", "clean_data")
+
+
+def _synthetic_raw(rows: int, *, seed: int = 0) -> pd.DataFrame:
+    """Build raw rows whose JSON payloads resemble TMDB sizes (large cast/crew)."""
+
+    rng = np.random.default_rng(seed)
+
+    def payload(key: str, low: int, high: int, extra: dict | None = None) -> str:
+        size = int(rng.integers(low, high))
+        return json.dumps(
+            [
+                {key: f"{key}-{rng.integers(0, 5_000)}", "id": i, **(extra or {})}
+                for i in range(size)
+            ]
+        )
+
+    return pd.DataFrame(
+        {
+            "genres": [payload("name", 1, 4) for _ in range(rows)],
+            "keywords": [payload("name", 0, 15) for _ in range(rows)],
+            "production_companies": [payload("name", 0, 5) for _ in range(rows)],
+            "production_countries": [payload("iso_3166_1", 0, 3) for _ in range(rows)],
+            "spoken_languages": [payload("iso_639_1", 0, 3) for _ in range(rows)],
+            "original_language": ["en"] * rows,
+            "crew": [
+                payload("name", 10, 80, {"job": "Producer", "department": "Production"})
+                for _ in range(rows)
+            ],
+            "cast": [
+                payload("name", 10, 60, {"character": "Someone", "order": 0}) for _ in range(rows)
+            ],
+        }
+    )
+
+
+def _legacy_decode(df: pd.DataFrame) -> pd.DataFrame:
+    """The per-column ``Series.apply`` chain that ``clean_movie_data`` used to run."""
+
+    out = pd.DataFrame(index=df.index)
+    out["genres_list"] = df["genres"].apply(names_from_json)
+    out["genre_count"] = out["genres_list"].apply(len)
+    out["primary_genre"] = out["genres_list"].apply(pick_if_present(0))
+    out["keywords_list"] = df["keywords"].apply(names_from_json)
+    out["keywords_count"] = out["keywords_list"].apply(len)
+    out["top_keyword"] = out["keywords_list"].apply(pick_if_present(0, default="None"))
+    out["production_companies_list"] = df["production_companies"].apply(names_from_json)
+    out["primary_company"] = out["production_companies_list"].apply(pick_if_present(0))
+    out["production_countries_list"] = df["production_countries"].apply(
+        codes_from_json("iso_3166_1")
+    )
+    out["primary_country"] = out["production_countries_list"].apply(pick_if_present(0))
+    out["spoken_languages_list"] = df["spoken_languages"].apply(codes_from_json("iso_639_1"))
+    out["primary_language"] = out["spoken_languages_list"].apply(pick_if_present(0))
+    out["director"] = df["crew"].apply(extract_director)
+    out["cast_list"] = df["cast"].apply(names_from_json)
+    out["top_cast"] = out["cast_list"].apply(take_first(3))
+    out["lead_actor"] = out["cast_list"].apply(pick_if_present(0))
+    out["supporting_actor"] = out["cast_list"].apply(pick_if_present(1))
+    out["ensemble_size"] = out["cast_list"].apply(len)
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    raw = _synthetic_raw(args.rows)
+    print(f"{args.rows:,} synthetic rows")
+
+    legacy = best_of(lambda: _legacy_decode(raw), repeat=args.repeat)
+    print(f"  legacy apply chain        : {args.rows / legacy:>12,.0f} rows/s")
+    for backend in sorted(_clean.JSON_BACKENDS):
+        loads = _clean._json_loads(backend)
+        elapsed = best_of(lambda: _clean._decode_json_columns(raw, loads=loads), repeat=args.repeat)
+        print(
+            f"  single pass ({backend:<6})     : {args.rows / elapsed:>12,.0f} rows/s "
+            f"({legacy / elapsed:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
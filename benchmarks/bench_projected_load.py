@@ -0,0 +1,52 @@
+"""Compare full-file loads of the cleaned dataset with per-stage projected loads.
+
+Run ``scripts/01_clean_data.py`` first (with ``--format parquet`` as well to
+benchmark the columnar file).
+
+Usage:
+    uv run python benchmarks/bench_projected_load.py
+"""
+
+from __future__ import annotations
+
+import time
+
+from _common import load_script
+from movie_data import CLEAN_CSV, CLEAN_PARQUET, load_clean_columns, read_clean_dataset
+
+_genres = load_script("02_analyze_genres.py", "analyze_genres")
+_fin = load_script("03_analyze_financials.py", "analyze_financials")
+_model = load_script("04_build_model.py", "build_model")
+
+STAGES = {
+    "02_analyze_genres": set(_genres.REQUIRED_COLUMNS),
+    "03_analyze_financials": set(_fin.REQUIRED_COLUMNS),
+    "04_build_model": set(_model.NUM_FEATURES + _model.CAT_FEATURES + ["vote_average"]),
+}
+
+
+def main() -> None:
+    paths = [path for path in (CLEAN_CSV, CLEAN_PARQUET) if path.exists()]
+    if not paths:
+        raise SystemExit("No cleaned dataset found. Run scripts/01_clean_data.py first.")
+
+    for path in paths:
+        start = time.perf_counter()
+        full = read_clean_dataset(path)
+        full_seconds = time.perf_counter() - start
+        full_bytes = int(full.memory_usage(deep=True).sum())
+        print(f"{path}: full load {full_seconds:.3f}s, {full_bytes / 1e6:.1f} MB in memory")
+
+        for stage, columns in STAGES.items():
+            _, report = load_clean_columns(path, columns)
+            speedup = full_seconds / report.seconds
+            shrink = full_bytes / report.memory_bytes
+            print(
+                f"  {stage:<22} {report.columns_loaded:>3} cols  "
+                f"{report.seconds:.3f}s ({speedup:4.1f}x faster)  "
+                f"{report.memory_bytes / 1e6:7.2f} MB ({shrink:4.1f}x less)"
+            )
+
+
+if __name__ == "__main__":
+    main()
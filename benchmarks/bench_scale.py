@@ -0,0 +1,212 @@
+"""Run the pipeline on synthetic data at several scales and compare with a stored baseline.
+
+For each scale a ``movies_raw.csv``-shaped file is generated once by
+``synthetic_raw.py`` (and reused while the generator and row count are
+unchanged), then ``01``–``04`` run as separate processes in
+``results/bench/scale/<scale>/``, exactly as the pipeline runs them. Each
+script's instrumentation log (see ``scripts/instrumentation.py``) provides
+its wall time, peak RSS and per-step breakdown; throughput is input rows per
+second of wall time.
+
+The numbers are compared with ``baseline_scale.json``. A stage that is more
+than ``--tolerance`` slower, or whose peak memory is that much larger, is a
+regression: the report marks it and the script exits with status 1.
+Baselines are machine specific; record one with ``--update-baseline``.
+
+Usage:
+    uv run python benchmarks/bench_scale.py                 # 10k and 100k rows
+    uv run python benchmarks/bench_scale.py --scales 1m 10m --workers 8
+    uv run python benchmarks/bench_scale.py --update-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from _common import SCRIPTS
+from instrumentation import METRICS_ENV, read_steps
+from synthetic_raw import GENERATOR_VERSION, SCALES, write_synthetic_raw
+
+BASELINE = Path(__file__).resolve().with_name("baseline_scale.json")
+WORK_DIR = Path("results/bench/scale")
+DEFAULT_SCALES = ("10k", "100k")
+DEFAULT_TOLERANCE = 0.25
+SEED = 0
+
+# Stage name -> (script, arguments). Cleaning streams in chunks so memory stays
+# bounded at every scale; the model uses the histogram engine because a
+# 400-tree forest over millions of rows would dominate the run.
+STAGES: dict[str, tuple[str, tuple[str, ...]]] = {
+    "clean": ("01_clean_data.py", ("--chunk-size", "20000")),
+    "genres": ("02_analyze_genres.py", ()),
+    "financials": ("03_analyze_financials.py", ()),
+    "model": ("04_build_model.py", ("--engine", "hgb", "--no-fold-cache", "--no-save")),
+}
+
+
+def _machine() -> dict[str, Any]:
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def prepare_raw(work_dir: Path, rows: int, *, workers: int) -> Path:
+    """Generate (or reuse) ``work_dir/data/movies_raw.csv`` with ``rows`` rows."""
+
+    raw = work_dir / "data" / "movies_raw.csv"
+    stamp = raw.with_suffix(".json")
+    expected = {"rows": rows, "seed": SEED, "generator_version": GENERATOR_VERSION}
+    if raw.exists() and stamp.exists() and json.loads(stamp.read_text()) == expected:
+        return raw
+    start = time.perf_counter()
+    write_synthetic_raw(raw, rows, seed=SEED, workers=workers)
+    stamp.write_text(json.dumps(expected), encoding="utf-8")
+    size = raw.stat().st_size / 1e6
+    print(f"  generated {rows:,} rows ({size:,.0f} MB) in {time.perf_counter() - start:.1f}s")
+    return raw
+
+
+def run_stage(work_dir: Path, stage: str, rows: int) -> dict[str, Any]:
+    """Run one stage in ``work_dir`` and summarise its instrumentation log."""
+
+    script, args = STAGES[stage]
+    metrics = (work_dir / "steps.jsonl").resolve()
+    log = work_dir / "logs" / f"{stage}.log"
+    log.parent.mkdir(parents=True, exist_ok=True)
+    with log.open("w", encoding="utf-8") as handle:
+        result = subprocess.run(
+            [sys.executable, str(SCRIPTS / script), *args],
+            cwd=work_dir,
+            stdout=handle,
+            stderr=subprocess.STDOUT,
+            env={**os.environ, METRICS_ENV: str(metrics)},
+        )
+    if result.returncode != 0:
+        tail = "".join(log.read_text(encoding="utf-8").splitlines(keepends=True)[-20:])
+        raise SystemExit(f"Stage {stage!r} failed (exit {result.returncode}); see {log}:\n{tail}")
+
+    prefix = Path(script).stem + "-"
+    total = [r for r in read_steps(metrics) if r["step"] == "total" and r["run"].startswith(prefix)]
+    steps = read_steps(metrics, total[-1]["run"])
+    wall = total[-1]["wall_seconds"]
+    breakdown: dict[str, float] = {}
+    for record in steps:
+        if record["step"] != "total":
+            breakdown[record["step"]] = breakdown.get(record["step"], 0.0) + record["wall_seconds"]
+    return {
+        "seconds": wall,
+        "rows_per_second": rows / wall,
+        "peak_rss_mb": max(record["peak_rss_mb"] or 0.0 for record in steps),
+        "steps": breakdown,
+    }
+
+
+def compare(
+    results: dict[str, dict[str, dict[str, Any]]],
+    baseline: dict[str, dict[str, dict[str, Any]]],
+    tolerance: float,
+) -> list[str]:
+    """Print current vs baseline figures and return the regressions found."""
+
+    regressions = []
+    print(
+        f"\n{'scale':<6} {'stage':<11} {'seconds':>8} {'rows/s':>10} {'baseline':>10} "
+        f"{'peak MB':>8} {'baseline':>8}  status"
+    )
+    for scale, stages in results.items():
+        for stage, current in stages.items():
+            base = baseline.get(scale, {}).get(stage)
+            status = "new"
+            base_rate = base_rss = "-"
+            if base:
+                base_rate = f"{base['rows_per_second']:,.0f}"
+                base_rss = f"{base['peak_rss_mb']:.0f}"
+                problems = []
+                if current["rows_per_second"] < base["rows_per_second"] * (1 - tolerance):
+                    drop = 1 - current["rows_per_second"] / base["rows_per_second"]
+                    problems.append(f"throughput -{drop:.0%}")
+                if current["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance):
+                    growth = current["peak_rss_mb"] / base["peak_rss_mb"] - 1
+                    problems.append(f"memory +{growth:.0%}")
+                status = "REGRESSION: " + ", ".join(problems) if problems else "ok"
+                if problems:
+                    regressions.append(f"{scale}/{stage}: {', '.join(problems)}")
+            print(
+                f"{scale:<6} {stage:<11} {current['seconds']:>8.2f} "
+                f"{current['rows_per_second']:>10,.0f} {base_rate:>10} "
+                f"{current['peak_rss_mb']:>8.0f} {base_rss:>8}  {status}"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", nargs="+", choices=sorted(SCALES), default=DEFAULT_SCALES)
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--work-dir", type=Path, default=WORK_DIR)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed relative throughput drop / memory growth before failing.",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Processes for generating the synthetic data."
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Store these results as the baseline instead of comparing.",
+    )
+    args = parser.parse_args()
+
+    results: dict[str, dict[str, dict[str, Any]]] = {}
+    for scale in args.scales:
+        rows = SCALES[scale]
+        work_dir = args.work_dir / scale
+        print(f"[{scale}] {rows:,} rows in {work_dir}")
+        prepare_raw(work_dir, rows, workers=args.workers)
+        results[scale] = {}
+        for stage in args.stages:
+            results[scale][stage] = run_stage(work_dir, stage, rows)
+            print(f"  {stage}: {results[scale][stage]['seconds']:.2f}s")
+
+    report = args.work_dir / "latest.json"
+    report.write_text(
+        json.dumps({"machine": _machine(), "results": results}, indent=2), encoding="utf-8"
+    )
+
+    stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if args.update_baseline:
+        merged = stored.get("results", {})
+        for scale, stages in results.items():
+            merged.setdefault(scale, {}).update(stages)
+        payload = {"machine": _machine(), "results": merged}
+        args.baseline.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+        print(f"\nBaseline updated: {args.baseline}")
+        return
+
+    if stored and stored.get("machine") != _machine():
+        print(f"\nNote: the baseline was recorded on {stored.get('machine')}; expect noise.")
+    regressions = compare(results, stored.get("results", {}), args.tolerance)
+    print(f"\nFull results: {report}")
+    if regressions:
+        raise SystemExit(
+            "PERFORMANCE REGRESSION against "
+            f"{args.baseline} (tolerance {args.tolerance:.0%}):\n  " + "\n  ".join(regressions)
+        )
+
+
+if __name__ == "__main__":
+    main()
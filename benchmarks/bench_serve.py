@@ -0,0 +1,102 @@
+"""Load-test the prediction service with concurrent single-row requests.
+
+Without ``--url`` the benchmark starts ``06_serve_model.py``'s server in
+process on a free localhost port, using the model saved by
+``04_build_model.py``; pass ``--url http://127.0.0.1:8000`` to load-test an
+instance you started yourself. Request rows are taken from the cleaned
+dataset.
+
+Usage:
+    uv run python benchmarks/bench_serve.py --concurrency 32 --requests 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from _common import load_script
+from model_artifact import load_model_artifact
+from movie_data import clean_data_path, load_clean_columns
+
+_serve = load_script("06_serve_model.py", "serve_model")
+
+
+def _request_rows(features: list[str], count: int) -> list[dict]:
+    df, _ = load_clean_columns(clean_data_path(), features)
+    records = json.loads(df[features].astype(object).to_json(orient="records"))
+    return [records[i % len(records)] for i in range(count)]
+
+
+def _post(url: str, row: dict) -> float:
+    body = json.dumps({"rows": [row]}).encode("utf-8")
+    request = urllib.request.Request(
+        f"{url}/predict", data=body, headers={"Content-Type": "application/json"}
+    )
+    start = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def run_load(url: str, rows: list[dict], concurrency: int) -> dict[str, float]:
+    """Send every row as its own request from ``concurrency`` client threads."""
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = np.array(list(pool.map(lambda row: _post(url, row), rows)))
+    elapsed = time.perf_counter() - start
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    return {"p50_ms": p50, "p99_ms": p99, "requests_per_second": len(rows) / elapsed}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Running service to test (default: start one in process).")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--max-wait-ms", type=float, default=_serve.DEFAULT_MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    try:
+        pipeline, meta = load_model_artifact()
+    except FileNotFoundError as exc:
+        raise SystemExit(f"{exc}. Run scripts/04_build_model.py first.")
+    rows = _request_rows(meta.features, args.requests)
+
+    server = None
+    url = args.url
+    if url is None:
+        batcher = _serve.MicroBatcher(pipeline, meta, max_wait_ms=args.max_wait_ms)
+        server = _serve.create_server(batcher, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}"
+
+    try:
+        client = run_load(url, rows, args.concurrency)
+        with urllib.request.urlopen(f"{url}/stats") as response:
+            stats = json.loads(response.read())
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    print(
+        f"{args.requests} requests, concurrency {args.concurrency}: "
+        f"client p50 {client['p50_ms']:.1f} ms, p99 {client['p99_ms']:.1f} ms, "
+        f"{client['requests_per_second']:.0f} req/s"
+    )
+    print(
+        f"server: p50 {stats['p50_ms']:.1f} ms, p99 {stats['p99_ms']:.1f} ms, "
+        f"{stats['rows_per_batch']:.1f} rows per predict call over {stats['batches']} calls"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""Generate ``movies_raw.csv``-shaped files of any size for the scale benchmarks.
+
+Rows look like the output of ``scripts/00_refresh_raw.py``: the same 22
+columns, values that pass its filters (positive budget and revenue, at least
+50 votes, runtime of at least 60 minutes) and TMDB-style JSON payloads with
+the fields, list lengths and cardinalities of the TMDB 5000 dump. The
+``cast`` and ``crew`` payloads average about 3.5 KB and 4.5 KB per row with a
+long tail, and people, companies and keywords are drawn from pools that grow
+with the row count (skewed, so a few names recur a lot, as on TMDB).
+
+Rows are generated in fixed ``CHUNK_ROWS`` blocks, each seeded from
+``(seed, block number)``, so a file is reproducible for a given seed and row
+count however many ``--workers`` produce it.
+
+Usage:
+    uv run python benchmarks/synthetic_raw.py --rows 1m --out data/movies_raw_1m.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Bump when the generated content changes so cached benchmark inputs are rebuilt.
+GENERATOR_VERSION = 1
+CHUNK_ROWS = 10_000
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+GENRES = {
+    "Drama": 0.19,
+    "Comedy": 0.14,
+    "Thriller": 0.10,
+    "Action": 0.10,
+    "Romance": 0.07,
+    "Adventure": 0.07,
+    "Crime": 0.06,
+    "Science Fiction": 0.04,
+    "Horror": 0.04,
+    "Family": 0.04,
+    "Fantasy": 0.035,
+    "Mystery": 0.03,
+    "Animation": 0.02,
+    "History": 0.017,
+    "Music": 0.015,
+    "War": 0.012,
+    "Documentary": 0.009,
+    "Western": 0.007,
+    "Foreign": 0.003,
+    "TV Movie": 0.002,
+}
+GENRE_IDS = [18, 35, 53, 28, 10749, 12, 80, 878, 27, 10751, 14, 9648, 16, 36, 10402, 10752, 99]
+GENRE_IDS += [37, 10769, 10770]
+LANGUAGES = {
+    "en": 0.72, "fr": 0.05, "es": 0.04, "de": 0.03, "ja": 0.03, "it": 0.025, "zh": 0.02,
+    "hi": 0.02, "ko": 0.015, "ru": 0.015, "pt": 0.01, "sv": 0.01, "da": 0.01, "cn": 0.01,
+    "nl": 0.005, "fa": 0.005, "th": 0.005, "he": 0.005,
+}  # fmt: skip
+COUNTRIES = {
+    "US": 0.62, "GB": 0.09, "FR": 0.05, "DE": 0.05, "CA": 0.04, "IN": 0.02, "JP": 0.02,
+    "IT": 0.02, "ES": 0.015, "AU": 0.015, "CN": 0.015, "HK": 0.01, "KR": 0.01, "NZ": 0.01,
+    "IE": 0.005, "SE": 0.005, "DK": 0.005, "BE": 0.005, "MX": 0.005, "CZ": 0.005,
+}  # fmt: skip
+DEPARTMENTS = {
+    "Production": ["Producer", "Executive Producer", "Casting", "Production Manager"],
+    "Writing": ["Screenplay", "Writer", "Novel", "Story"],
+    "Sound": ["Original Music Composer", "Sound Re-Recording Mixer", "Music Supervisor"],
+    "Art": ["Production Design", "Art Direction", "Set Decoration"],
+    "Camera": ["Director of Photography", "Camera Operator", "Still Photographer"],
+    "Editing": ["Editor", "Colorist"],
+    "Costume & Make-Up": ["Costume Design", "Makeup Artist", "Hairstylist"],
+    "Crew": ["Stunts", "Visual Effects Supervisor", "Post Production Supervisor"],
+    "Visual Effects": ["Animation Supervisor", "VFX Artist"],
+    "Lighting": ["Gaffer", "Electrician"],
+}
+CREW_JOBS = [(department, job) for department, jobs in DEPARTMENTS.items() for job in jobs]
+FIRST_NAMES = (
+    "James Mary John Patricia Robert Jennifer Michael Linda William Elizabeth David Barbara "
+    "Richard Susan Joseph Jessica Thomas Sarah Charles Karen Christopher Nancy Daniel Lisa "
+    "Matthew Margaret Anthony Betty Mark Sandra Donald Ashley Steven Kimberly Paul Emily "
+    "Andrew Donna Joshua Michelle Kenneth Carol Kevin Amanda Brian Melissa George Deborah "
+    "Timothy Stephanie Ronald Rebecca Edward Sharon Jason Laura Jeffrey Cynthia Ryan Kathleen"
+).split()
+LAST_NAMES = (
+    "Smith Johnson Williams Brown Jones Garcia Miller Davis Rodriguez Martinez Hernandez Lopez "
+    "Gonzalez Wilson Anderson Thomas Taylor Moore Jackson Martin Lee Perez Thompson White Harris "
+    "Sanchez Clark Ramirez Lewis Robinson Walker Young Allen King Wright Scott Torres Nguyen "
+    "Hill Flores Green Adams Nelson Baker Hall Rivera Campbell Mitchell Carter Roberts"
+).split()
+WORDS = (
+    "love war family friendship revenge journey secret city night future past dream power "
+    "escape truth island heist murder small town space alien robot magic kingdom school "
+    "detective wedding prison survival monster ghost time travel spy rescue betrayal legend"
+).split()
+
+
+def _probabilities(weights: dict[str, float]) -> np.ndarray:
+    values = np.array(list(weights.values()))
+    return values / values.sum()
+
+
+def _person(index: int) -> str:
+    first = FIRST_NAMES[index % len(FIRST_NAMES)]
+    last = LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)]
+    generation = index // (len(FIRST_NAMES) * len(LAST_NAMES))
+    return f"{first} {last}" if generation == 0 else f"{first} {last} {generation + 1}"
+
+
+def _popular_ids(rng: np.random.Generator, size: int, pool: int) -> np.ndarray:
+    """Draw ``size`` ids from ``[0, pool)``, with low ids much more frequent.
+
+    The density falls off as ``1 / sqrt(id)``: with a pool of 4 ids per row
+    the most frequent actor appears in a few percent of movies, while most
+    appear once or twice.
+    """
+
+    return (pool * rng.random(size) ** 2).astype(np.int64)
+
+
+def _lengths(rng: np.random.Generator, size: int, mean: float, cap: int) -> np.ndarray:
+    """Long-tailed list lengths (log-normal) with the given mean, capped at ``cap``."""
+
+    sigma = 0.8
+    values = rng.lognormal(np.log(mean) - sigma**2 / 2, sigma, size=size)
+    return np.minimum(values.astype(int), cap)
+
+
+def _split(values: np.ndarray, lengths: np.ndarray) -> list[np.ndarray]:
+    return np.split(values, np.cumsum(lengths)[:-1])
+
+
+def _credit_ids(rng: np.random.Generator, size: int) -> list[str]:
+    high = rng.integers(0, 1 << 48, size=size, dtype=np.int64)
+    low = rng.integers(0, 1 << 48, size=size, dtype=np.int64)
+    return [f"{a:012x}{b:012x}" for a, b in zip(high.tolist(), low.tolist())]
+
+
+def generate_chunk(start: int, rows: int, *, total_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Return generated rows ``start`` to ``start + rows`` of a ``total_rows``-row file."""
+
+    rng = np.random.default_rng([seed, start // CHUNK_ROWS])
+    people = max(5_000, 4 * total_rows)
+    companies = max(1_000, total_rows // 5)
+    keywords = max(2_000, total_rows // 2)
+
+    genre_names = list(GENRES)
+    genre_counts = np.clip(rng.poisson(1.5, rows) + 1, 1, 7)
+    genre_picks = _split(
+        rng.choice(len(GENRES), int(genre_counts.sum()), p=_probabilities(GENRES)), genre_counts
+    )
+    keyword_counts = _lengths(rng, rows, 9.0, 97)
+    keyword_ids = _split(_popular_ids(rng, int(keyword_counts.sum()), keywords), keyword_counts)
+    company_counts = _lengths(rng, rows, 3.0, 26)
+    company_ids = _split(_popular_ids(rng, int(company_counts.sum()), companies), company_counts)
+    languages = list(LANGUAGES)
+    countries = list(COUNTRIES)
+    country_counts = np.clip(rng.poisson(0.4, rows) + 1, 0, 12)
+    country_picks = _split(
+        rng.choice(len(countries), int(country_counts.sum()), p=_probabilities(COUNTRIES)),
+        country_counts,
+    )
+    language_counts = np.clip(rng.poisson(0.5, rows) + 1, 0, 9)
+    language_picks = _split(
+        rng.choice(len(languages), int(language_counts.sum()), p=_probabilities(LANGUAGES)),
+        language_counts,
+    )
+    cast_counts = _lengths(rng, rows, 22.0, 224)
+    cast_ids = _split(_popular_ids(rng, int(cast_counts.sum()), people), cast_counts)
+    cast_credits = _split(np.array(_credit_ids(rng, int(cast_counts.sum()))), cast_counts)
+    crew_counts = np.maximum(_lengths(rng, rows, 26.0, 435), 1)
+    crew_ids = _split(_popular_ids(rng, int(crew_counts.sum()), people), crew_counts)
+    crew_jobs = _split(rng.integers(0, len(CREW_JOBS), int(crew_counts.sum())), crew_counts)
+    crew_credits = _split(np.array(_credit_ids(rng, int(crew_counts.sum()))), crew_counts)
+    director_slot = (rng.random(rows) * crew_counts).astype(int)
+    genders = rng.integers(0, 3, int(max(cast_counts.max(), crew_counts.max())) + 1)
+
+    genres: list[str] = []
+    keyword_payloads: list[str] = []
+    company_payloads: list[str] = []
+    country_payloads: list[str] = []
+    language_payloads: list[str] = []
+    cast_payloads: list[str] = []
+    crew_payloads: list[str] = []
+    for row in range(rows):
+        genres.append(
+            "["
+            + ", ".join(
+                f'{{"id": {GENRE_IDS[g]}, "name": "{genre_names[g]}"}}'
+                for g in dict.fromkeys(genre_picks[row].tolist())
+            )
+            + "]"
+        )
+        keyword_payloads.append(
+            "["
+            + ", ".join(
+                f'{{"id": {k}, "name": "{WORDS[k % len(WORDS)]} {k}"}}'
+                for k in keyword_ids[row].tolist()
+            )
+            + "]"
+        )
+        company_payloads.append(
+            "["
+            + ", ".join(
+                f'{{"name": "{LAST_NAMES[c % len(LAST_NAMES)]} Pictures {c}", "id": {c}}}'
+                for c in company_ids[row].tolist()
+            )
+            + "]"
+        )
+        country_payloads.append(
+            "["
+            + ", ".join(
+                f'{{"iso_3166_1": "{countries[c]}", "name": "{countries[c]}"}}'
+                for c in dict.fromkeys(country_picks[row].tolist())
+            )
+            + "]"
+        )
+        language_payloads.append(
+            "["
+            + ", ".join(
+                f'{{"iso_639_1": "{languages[c]}", "name": "{languages[c]}"}}'
+                for c in dict.fromkeys(language_picks[row].tolist())
+            )
+            + "]"
+        )
+        cast_payloads.append(
+            "["
+            + ", ".join(
+                f'{{"cast_id": {order + 1}, "character": "{_person(person + 7)}", '
+                f'"credit_id": "{credit}", "gender": {genders[order]}, "id": {person}, '
+                f'"name": "{_person(person)}", "order": {order}}}'
+                for order, (person, credit) in enumerate(
+                    zip(cast_ids[row].tolist(), cast_credits[row].tolist())
+                )
+            )
+            + "]"
+        )
+        entries = []
+        for slot, (person, job, credit) in enumerate(
+            zip(crew_ids[row].tolist(), crew_jobs[row].tolist(), crew_credits[row].tolist())
+        ):
+            department, title = (
+                ("Directing", "Director") if slot == director_slot[row] else CREW_JOBS[job]
+            )
+            entries.append(
+                f'{{"credit_id": "{credit}", "department": "{department}", '
+                f'"gender": {genders[slot]}, "id": {person}, "job": "{title}", '
+                f'"name": "{_person(person)}"}}'
+            )
+        crew_payloads.append("[" + ", ".join(entries) + "]")
+
+    ids = np.arange(start, start + rows) + 1
+    budget = np.round(rng.lognormal(np.log(25e6), 1.1, rows), -3).clip(1_000)
+    revenue = np.round(budget * rng.lognormal(0.6, 1.2, rows), 0).clip(1)
+    vote_count = (50 + rng.lognormal(np.log(600), 1.3, rows)).astype(int)
+    popularity = rng.lognormal(np.log(25), 0.9, rows).round(6)
+    runtime = np.clip(rng.normal(110, 20, rows), 60, 240).round()
+    genre_effect = np.array([g[0] for g in genre_picks]) % 3 * 0.2
+    vote_average = np.clip(
+        5.2 + 0.25 * np.log10(vote_count) + genre_effect + rng.normal(0, 0.8, rows), 0, 10
+    ).round(1)
+    days = rng.integers(0, 365 * 100, rows)
+    release_date = (np.datetime64("1920-01-01") + days).astype(str)
+    titles = [f"{WORDS[i % len(WORDS)].title()} {i}" for i in ids.tolist()]
+
+    return pd.DataFrame(
+        {
+            "id": ids,
+            "title": titles,
+            "original_title": titles,
+            "original_language": np.array(languages)[
+                rng.choice(len(languages), rows, p=_probabilities(LANGUAGES))
+            ],
+            "status": "Released",
+            "release_date": release_date,
+            "budget": budget.astype(np.int64),
+            "revenue": revenue.astype(np.int64),
+            "runtime": runtime,
+            "vote_average": vote_average,
+            "vote_count": vote_count,
+            "popularity": popularity,
+            "genres": genres,
+            "keywords": keyword_payloads,
+            "production_companies": company_payloads,
+            "production_countries": country_payloads,
+            "spoken_languages": language_payloads,
+            "crew": crew_payloads,
+            "cast": cast_payloads,
+            "tagline": [f"The {WORDS[i % len(WORDS)]} begins." for i in ids.tolist()],
+            "overview": [
+                " ".join(WORDS[(i + k) % len(WORDS)] for k in range(40)) for i in ids.tolist()
+            ],
+            "homepage": np.where(rng.random(rows) < 0.35, "http://example.com/movie", ""),
+        }
+    )
+
+
+def _chunks(rows: int, seed: int, workers: int) -> Iterator[pd.DataFrame]:
+    starts = range(0, rows, CHUNK_ROWS)
+    if workers <= 1:
+        for start in starts:
+            yield generate_chunk(start, min(CHUNK_ROWS, rows - start), total_rows=rows, seed=seed)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque[Future[pd.DataFrame]] = deque()
+        for start in starts:
+            count = min(CHUNK_ROWS, rows - start)
+            pending.append(pool.submit(generate_chunk, start, count, total_rows=rows, seed=seed))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def write_synthetic_raw(path: Path, rows: int, *, seed: int = 0, workers: int = 1) -> Path:
+    """Write ``rows`` generated movies to ``path`` (atomically) and return it."""
+
+    if rows < 1:
+        raise ValueError("rows must be positive")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".partial")
+    with partial.open("w", encoding="utf-8", newline="") as handle:
+        for index, chunk in enumerate(_chunks(rows, seed, workers)):
+            chunk.to_csv(handle, index=False, header=index == 0)
+    os.replace(partial, path)
+    return path
+
+
+def parse_rows(value: str) -> int:
+    """Parse a row count such as ``100000``, ``100k`` or ``1m``."""
+
+    if value.lower() in SCALES:
+        return SCALES[value.lower()]
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1:].lower(), 1)
+    number = value[:-1] if multiplier > 1 else value
+    try:
+        return int(float(number) * multiplier)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Not a row count: {value!r}") from None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=parse_rows, default=SCALES["10k"])
+    parser.add_argument("--out", type=Path, default=Path("data/movies_raw_synthetic.csv"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Generator processes (0 = one per CPU core)."
+    )
+    args = parser.parse_args()
+
+    path = write_synthetic_raw(
+        args.out, args.rows, seed=args.seed, workers=args.workers or os.cpu_count() or 1
+    )
+    print(f"Wrote {args.rows:,} rows ({path.stat().st_size / 1e6:,.1f} MB) to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,72 +1,381 @@
-"""Utility script to refresh the curated TMDB subset used in the workshop."""
+"""Utility script to refresh the curated TMDB subset used in the workshop.
+
+The movies and credits dumps are downloaded concurrently into a local cache
+(``data/cache/`` by default) and the curated ``data/movies_raw.csv`` is built
+from the cached files. Each cached file keeps the ``ETag`` and
+``Last-Modified`` validators it was served with, so a refresh sends
+conditional requests and skips sources that have not changed upstream
+(``304 Not Modified``). An interrupted download is kept as ``<name>.csv.part``
+and resumed with a ``Range`` request (guarded by ``If-Range``, so a source
+that changed in the meantime is downloaded again from the start). Failed
+transfers are retried with exponential backoff.
+
+Usage:
+    uv run python scripts/00_refresh_raw.py            # fetch what changed, rebuild
+    uv run python scripts/00_refresh_raw.py --offline  # rebuild from the cache only
+    uv run python scripts/00_refresh_raw.py --offline --chunk-size 500 --max-rows 0
+"""
 
 from __future__ import annotations
 
+import argparse
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Callable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
 import pandas as pd
 
+from instrumentation import instrumented, step
+
 MOVIES_URL = "https://raw.githubusercontent.com/whoops88/TMDB_5000/master/tmdb_5000_movies.csv"
 CREDITS_URL = "https://raw.githubusercontent.com/whoops88/TMDB_5000/master/tmdb_5000_credits.csv"
+SOURCES = {"movies": MOVIES_URL, "credits": CREDITS_URL}
 OUTPUT_PATH = Path("data/movies_raw.csv")
+CACHE_DIR = Path("data/cache")
+DEFAULT_RETRIES = 3
+DEFAULT_TIMEOUT = 60.0
+CHUNK_BYTES = 1 << 20
+
+Opener = Callable[..., Any]
+
+
+@dataclass(frozen=True)
+class FetchResult:
+    """Outcome of fetching one source into the cache.
+
+    ``status`` is ``downloaded``, ``resumed``, ``not_modified`` (the cached
+    copy is current) or ``cached`` (used without contacting the server).
+    """
+
+    name: str
+    path: Path
+    status: str
+    bytes_received: int = 0
+
+
+def _read_json(path: Path) -> dict[str, Any]:
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+
+def _fetch_once(
+    name: str, url: str, cache_dir: Path, *, timeout: float, opener: Opener
+) -> FetchResult:
+    path = cache_dir / f"{name}.csv"
+    meta_path = cache_dir / f"{name}.meta.json"
+    part = cache_dir / f"{name}.csv.part"
+    part_meta_path = cache_dir / f"{name}.part.json"
+
+    headers: dict[str, str] = {}
+    meta = _read_json(meta_path)
+    if path.exists() and meta.get("url") == url:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    part_meta = _read_json(part_meta_path)
+    validator = part_meta.get("etag") or part_meta.get("last_modified")
+    if part.exists() and part_meta.get("url") == url and validator:
+        headers["Range"] = f"bytes={part.stat().st_size}-"
+        headers["If-Range"] = validator
+
+    try:
+        response = opener(urllib.request.Request(url, headers=headers), timeout=timeout)
+    except urllib.error.HTTPError as exc:
+        if exc.code == 304:
+            return FetchResult(name, path, "not_modified")
+        if exc.code == 416:
+            # The partial file no longer matches the source; start over next attempt.
+            part.unlink(missing_ok=True)
+            part_meta_path.unlink(missing_ok=True)
+        raise
+
+    with response:
+        validators = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        resumed = response.status == 206
+        part_meta_path.write_text(json.dumps(validators), encoding="utf-8")
+        expected = response.headers.get("Content-Length")
+        received = 0
+        with part.open("ab" if resumed else "wb") as handle:
+            while chunk := response.read(CHUNK_BYTES):
+                handle.write(chunk)
+                received += len(chunk)
+    if expected is not None and received < int(expected):
+        raise ConnectionError(f"{url}: connection closed after {received} of {expected} bytes")
+
+    os.replace(part, path)
+    meta_path.write_text(json.dumps(validators), encoding="utf-8")
+    part_meta_path.unlink(missing_ok=True)
+    return FetchResult(name, path, "resumed" if resumed else "downloaded", received)
+
+
+def fetch_source(
+    name: str,
+    url: str,
+    cache_dir: Path = CACHE_DIR,
+    *,
+    retries: int = DEFAULT_RETRIES,
+    timeout: float = DEFAULT_TIMEOUT,
+    backoff: float = 1.0,
+    opener: Opener = urllib.request.urlopen,
+) -> FetchResult:
+    """Bring ``cache_dir/<name>.csv`` up to date with ``url``.
+
+    Network errors and 5xx responses are retried up to ``retries`` times,
+    waiting ``backoff * 2**attempt`` seconds in between; every retry resumes
+    from the bytes already received.
+
+    Raises:
+        urllib.error.URLError: If the source cannot be fetched.
+    """
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    attempt = 0
+    while True:
+        try:
+            return _fetch_once(name, url, cache_dir, timeout=timeout, opener=opener)
+        except urllib.error.HTTPError as exc:
+            if (exc.code < 500 and exc.code != 416) or attempt >= retries:
+                raise
+        except (urllib.error.URLError, OSError):
+            if attempt >= retries:
+                raise
+        time.sleep(backoff * 2**attempt)
+        attempt += 1
+
+
+def fetch_sources(
+    sources: Mapping[str, str] = SOURCES,
+    cache_dir: Path = CACHE_DIR,
+    *,
+    offline: bool = False,
+    **kwargs: Any,
+) -> dict[str, FetchResult]:
+    """Fetch every source concurrently (or, with ``offline``, use the cache as is).
+
+    Extra keyword arguments go to ``fetch_source``.
+
+    Raises:
+        FileNotFoundError: If ``offline`` and a source has never been fetched.
+    """
+
+    if offline:
+        results = {}
+        for name in sources:
+            path = cache_dir / f"{name}.csv"
+            if not path.exists():
+                raise FileNotFoundError(f"{path} is not cached; run without --offline first")
+            results[name] = FetchResult(name, path, "cached")
+        return results
 
+    def fetch(name: str) -> FetchResult:
+        with step(f"fetch.{name}"):
+            return fetch_source(name, sources[name], cache_dir, **kwargs)
 
+    with ThreadPoolExecutor(max_workers=max(1, len(sources))) as pool:
+        return dict(zip(sources, pool.map(fetch, sources)))
+
+
+COLUMNS = [
+    "id",
+    "title",
+    "original_title",
+    "original_language",
+    "status",
+    "release_date",
+    "budget",
+    "revenue",
+    "runtime",
+    "vote_average",
+    "vote_count",
+    "popularity",
+    "genres",
+    "keywords",
+    "production_companies",
+    "production_countries",
+    "spoken_languages",
+    "crew",
+    "cast",
+    "tagline",
+    "overview",
+    "homepage",
+]
+CREDIT_COLUMNS = ["crew", "cast"]
+MOVIE_COLUMNS = [column for column in COLUMNS if column not in CREDIT_COLUMNS]
+DEFAULT_MAX_ROWS = 2000
+
+
+def _filter(frame: pd.DataFrame) -> pd.DataFrame:
+    frame = frame[frame["release_date"].notna()]
+    frame = frame[frame["budget"].fillna(0) > 0]
+    frame = frame[frame["revenue"].fillna(0) > 0]
+    frame = frame[frame["vote_count"].fillna(0) >= 50]
+    frame = frame[frame["runtime"].fillna(0) >= 60]
+    return frame[frame["popularity"].notna()]
+
+
+def _select(frame: pd.DataFrame, max_rows: int | None) -> pd.DataFrame:
+    frame = frame.copy()
+    frame["release_date"] = frame["release_date"].astype(str)
+    frame["runtime"] = frame["runtime"].fillna(0)
+    frame["vote_average"] = frame["vote_average"].fillna(0)
+
+    frame = frame.sort_values("popularity", ascending=False)
+    if max_rows is not None:
+        frame = frame.head(max_rows)
+    return frame.reset_index(drop=True)
+
+
+def _curate_in_memory(movies_path: Path, credits_path: Path, max_rows: int | None) -> pd.DataFrame:
+    with step("read_csv.movies") as record:
+        movies = pd.read_csv(movies_path)
+        record.rows = len(movies)
+    with step("read_csv.credits") as record:
+        credits = pd.read_csv(credits_path)
+        record.rows = len(credits)
+
+    with step("merge_credits") as record:
+        merged = movies.merge(
+            credits,
+            left_on="id",
+            right_on="movie_id",
+            how="inner",
+            suffixes=("", "_credits"),
+        )
+        record.rows = len(merged)
+
+    with step("filter", rows=len(merged)):
+        return _select(_filter(merged[COLUMNS]), max_rows)
+
+
+def _curate_streaming(
+    movies_path: Path, credits_path: Path, max_rows: int | None, chunk_size: int
+) -> pd.DataFrame:
+    with step("filter_movies") as record:
+        movies = pd.concat(
+            [
+                _filter(chunk)
+                for chunk in pd.read_csv(movies_path, usecols=MOVIE_COLUMNS, chunksize=chunk_size)
+            ],
+            ignore_index=True,
+        )
+        record.rows = len(movies)
+
+    # First pass over the credits reads only the id column, so the rows cut by
+    # ``max_rows`` are the same ones the in-memory inner merge would cut.
+    with step("scan_credit_ids") as record:
+        credit_ids: set[int] = set()
+        for chunk in pd.read_csv(credits_path, usecols=["movie_id"], chunksize=chunk_size):
+            credit_ids.update(chunk["movie_id"].tolist())
+        record.rows = len(credit_ids)
+    with step("filter", rows=len(movies)):
+        movies = _select(movies[movies["id"].isin(credit_ids)], max_rows)
+
+    with step("merge_credits") as record:
+        wanted = pd.Index(movies["id"])
+        credits = pd.concat(
+            [
+                chunk[chunk["movie_id"].isin(wanted)]
+                for chunk in pd.read_csv(
+                    credits_path, usecols=["movie_id", *CREDIT_COLUMNS], chunksize=chunk_size
+                )
+            ],
+            ignore_index=True,
+        )
+        merged = movies.merge(credits, left_on="id", right_on="movie_id", how="inner")
+        record.rows = len(merged)
+    return merged[COLUMNS]
+
+
+def curate(
+    movies_path: Path,
+    credits_path: Path,
+    *,
+    max_rows: int | None = DEFAULT_MAX_ROWS,
+    chunk_size: int | None = None,
+) -> pd.DataFrame:
+    """Merge the cached movies and credits dumps and apply the workshop filters.
+
+    The ``max_rows`` most popular movies are kept (``None`` keeps them all).
+    With ``chunk_size`` the movies are filtered before the merge and the
+    credits file is streamed in chunks, keeping only the ``cast``/``crew`` of
+    the surviving ids, so peak memory follows the curated output instead of
+    the raw dumps. Both modes return the same rows.
+    """
+
+    if max_rows is not None and max_rows < 0:
+        raise ValueError("max_rows must be None (no cap) or a non-negative number of rows")
+    if chunk_size is None:
+        return _curate_in_memory(movies_path, credits_path, max_rows)
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be a positive number of rows")
+    return _curate_streaming(movies_path, credits_path, max_rows, chunk_size)
+
+
+@instrumented("00_refresh_raw")
 def main() -> None:
-    movies = pd.read_csv(MOVIES_URL)
-    credits = pd.read_csv(CREDITS_URL)
-
-    merged = movies.merge(
-        credits,
-        left_on="id",
-        right_on="movie_id",
-        how="inner",
-        suffixes=("", "_credits"),
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR)
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH)
+    parser.add_argument(
+        "--offline", action="store_true", help="Build from the cached sources without fetching."
+    )
+    parser.add_argument(
+        "--max-rows",
+        type=int,
+        default=DEFAULT_MAX_ROWS,
+        help=(
+            f"Keep the N most popular movies (default: {DEFAULT_MAX_ROWS:,}; 0 = no cap, "
+            "keep every movie that passes the filters)."
+        ),
     )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Filter first and stream the credits in chunks of N rows to bound memory.",
+    )
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    args = parser.parse_args()
+    if args.max_rows < 0:
+        parser.error("--max-rows must be 0 (no cap) or a positive number of rows")
+
+    try:
+        fetched = fetch_sources(
+            SOURCES,
+            args.cache_dir,
+            offline=args.offline,
+            retries=args.retries,
+            timeout=args.timeout,
+        )
+    except FileNotFoundError as exc:
+        raise SystemExit(str(exc))
+    except urllib.error.URLError as exc:
+        raise SystemExit(f"Could not fetch the TMDB sources: {exc}. Retry, or use --offline.")
+    for result in fetched.values():
+        print(f"{result.name}: {result.status} ({result.bytes_received:,} bytes) -> {result.path}")
 
-    cols_keep = [
-        "id",
-        "title",
-        "original_title",
-        "original_language",
-        "status",
-        "release_date",
-        "budget",
-        "revenue",
-        "runtime",
-        "vote_average",
-        "vote_count",
-        "popularity",
-        "genres",
-        "keywords",
-        "production_companies",
-        "production_countries",
-        "spoken_languages",
-        "crew",
-        "cast",
-        "tagline",
-        "overview",
-        "homepage",
-    ]
-    merged = merged[cols_keep].copy()
-
-    merged = merged[merged["release_date"].notna()]
-    merged = merged[merged["budget"].fillna(0) > 0]
-    merged = merged[merged["revenue"].fillna(0) > 0]
-    merged = merged[merged["vote_count"].fillna(0) >= 50]
-    merged = merged[merged["runtime"].fillna(0) >= 60]
-    merged = merged[merged["popularity"].notna()]
-
-    merged["release_date"] = merged["release_date"].astype(str)
-    merged["runtime"] = merged["runtime"].fillna(0)
-    merged["vote_average"] = merged["vote_average"].fillna(0)
-
-    merged = merged.sort_values("popularity", ascending=False)
-    sample_size = min(len(merged), 2000)
-    curated = merged.head(sample_size).reset_index(drop=True)
-
-    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    curated.to_csv(OUTPUT_PATH, index=False)
-    print(f"Wrote {len(curated)} rows to {OUTPUT_PATH}")
+    curated = curate(
+        fetched["movies"].path,
+        fetched["credits"].path,
+        max_rows=args.max_rows or None,
+        chunk_size=args.chunk_size,
+    )
+    with step("write_csv", rows=len(curated)):
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        curated.to_csv(args.output, index=False)
+    print(f"Wrote {len(curated)} rows to {args.output}")
 
 
 if __name__ == "__main__":
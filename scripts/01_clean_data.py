@@ -7,243 +7,201 @@ language, profitability, etc.).
 
 from __future__ import annotations
 
+import argparse
+import hashlib
+import io
 import json
-from dataclasses import dataclass
+import os
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 from typing import cast
 
 import numpy as np
 import pandas as pd
 
+import movie_data
+from buckets import BUCKETS, bucketize, decade_labels
+from instrumentation import instrumented, step
+from movie_data import (
+    COLUMN_SCHEMA,
+    OUTPUT_FORMATS,
+    CleanDatasetWriter,
+    output_path,
+    read_clean_dataset,
+    write_clean_dataset,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
 DATA_IN = Path("data/movies_raw.csv")
-DATA_OUT = Path("results/movies_clean.csv")
-
-
-@dataclass(frozen=True)
-class ColumnSpec:
-    """Describe a cleaned-data column and whether it should be filled."""
-
-    kind: str
-    fill: bool = True
-
-
-COLUMN_SCHEMA: list[tuple[str, ColumnSpec]] = [
-    ("id", ColumnSpec(kind="numeric", fill=False)),
-    ("title", ColumnSpec(kind="string")),
-    ("original_title", ColumnSpec(kind="string")),
-    ("status", ColumnSpec(kind="string", fill=False)),
-    ("release_date", ColumnSpec(kind="string", fill=False)),
-    ("release_year", ColumnSpec(kind="numeric", fill=False)),
-    ("decade", ColumnSpec(kind="string")),
-    ("primary_genre", ColumnSpec(kind="string")),
-    ("genre_count", ColumnSpec(kind="numeric", fill=False)),
-    ("genres_list", ColumnSpec(kind="list")),
-    ("keywords_count", ColumnSpec(kind="numeric", fill=False)),
-    ("keywords_list", ColumnSpec(kind="list")),
-    ("top_keyword", ColumnSpec(kind="string")),
-    ("director", ColumnSpec(kind="string")),
-    ("production_companies_list", ColumnSpec(kind="list")),
-    ("primary_company", ColumnSpec(kind="string")),
-    ("top_cast", ColumnSpec(kind="list")),
-    ("cast_list", ColumnSpec(kind="list")),
-    ("lead_actor", ColumnSpec(kind="string")),
-    ("supporting_actor", ColumnSpec(kind="string")),
-    ("ensemble_size", ColumnSpec(kind="numeric", fill=False)),
-    ("production_countries_list", ColumnSpec(kind="list")),
-    ("primary_country", ColumnSpec(kind="string")),
-    ("spoken_languages_list", ColumnSpec(kind="list")),
-    ("primary_language", ColumnSpec(kind="string")),
-    ("budget", ColumnSpec(kind="numeric")),
-    ("revenue", ColumnSpec(kind="numeric")),
-    ("profit", ColumnSpec(kind="numeric")),
-    ("roi", ColumnSpec(kind="numeric")),
-    ("revenue_to_budget_ratio", ColumnSpec(kind="numeric", fill=False)),
-    ("budget_category", ColumnSpec(kind="string")),
-    ("budget_millions", ColumnSpec(kind="numeric", fill=False)),
-    ("revenue_millions", ColumnSpec(kind="numeric", fill=False)),
-    ("runtime", ColumnSpec(kind="numeric")),
-    ("runtime_bucket", ColumnSpec(kind="string")),
-    ("vote_average", ColumnSpec(kind="numeric")),
-    ("vote_count", ColumnSpec(kind="numeric")),
-    ("vote_count_bucket", ColumnSpec(kind="string")),
-    ("popularity", ColumnSpec(kind="numeric")),
-    ("budget_log", ColumnSpec(kind="numeric", fill=False)),
-    ("revenue_log", ColumnSpec(kind="numeric", fill=False)),
-    ("profit_log", ColumnSpec(kind="numeric", fill=False)),
-    ("vote_count_log", ColumnSpec(kind="numeric", fill=False)),
-    ("popularity_log", ColumnSpec(kind="numeric", fill=False)),
-    ("is_profitable", ColumnSpec(kind="numeric", fill=False)),
+DATA_OUT = output_path("csv")
+DEFAULT_SHARD_SIZE = 10_000
+
+NUMERIC_COLUMNS = [
+    "budget",
+    "revenue",
+    "runtime",
+    "vote_average",
+    "vote_count",
+    "popularity",
 ]
 
+JsonLoads = Callable[[str], object]
 
-def _parse_json_list(value: object) -> list[dict]:
-    """Return a parsed list of dicts for JSON-like columns."""
-    if isinstance(value, str) and value.strip():
-        loaded = json.loads(value)
-        if isinstance(loaded, list):
-            return [item for item in loaded if isinstance(item, dict)]
-    return []
-
+JSON_BACKENDS: dict[str, JsonLoads] = {"json": json.loads}
+if orjson is not None:
+    JSON_BACKENDS["orjson"] = orjson.loads
 
-def _names_from_json(value: object, *, key: str = "name") -> list[str]:
-    """Return all truthy string values for ``key`` from a JSON-like payload.
 
-    Args:
-        value: Raw JSON string, list of dicts, or other value to inspect.
-        key: Dictionary key whose values should be collected.
+def _json_loads(backend: str = "auto") -> JsonLoads:
+    """Return the ``loads`` callable for ``backend``.
 
-    Returns:
-        A list of strings extracted from the JSON structure. Missing or falsey
-        values are ignored.
+    ``"auto"`` prefers ``orjson`` when it is installed and falls back to the
+    standard library ``json`` module otherwise.
     """
 
-    return [item[key] for item in _parse_json_list(value) if key in item and item[key]]
+    if backend == "auto":
+        backend = "orjson" if "orjson" in JSON_BACKENDS else "json"
+    if backend not in JSON_BACKENDS:
+        available = ", ".join(sorted(JSON_BACKENDS))
+        raise ValueError(f"Unknown JSON backend {backend!r}; available: {available}")
+    return JSON_BACKENDS[backend]
 
 
-def _codes_from_json(key: str):
-    """Build an extractor that returns all truthy values for ``key``.
-
-    Args:
-        key: Dictionary key to read from each JSON object.
-
-    Returns:
-        A callable that accepts a JSON-like payload and returns a list of codes
-        associated with ``key``.
-    """
-
-    def extractor(value: object) -> list[str]:
-        """Extract values for the preconfigured key from ``value``."""
-        return [item[key] for item in _parse_json_list(value) if key in item and item[key]]
-
-    return extractor
-
-
-def _extract_director(crew_str: object) -> str:
-    """Return the first crew member whose job is ``Director``.
-
-    Returns:
-        The name of the first director found, or "Unknown" if no director exists.
-    """
-
-    for entry in _parse_json_list(crew_str):
-        if entry.get("job") == "Director" and entry.get("name"):
-            return entry["name"]
-    return "Unknown"
-
+def _parse_json_list(value: object, *, loads: JsonLoads = json.loads) -> list[dict]:
+    """Return a parsed list of dicts for JSON-like columns."""
+    if isinstance(value, str) and value.strip():
+        loaded = loads(value)
+        if isinstance(loaded, list):
+            return [item for item in loaded if isinstance(item, dict)]
+    return []
 
-def _pick_if_present(position: int, default: str = "Unknown"):
-    """Return a function that picks a position from a sequence if available.
 
-    Args:
-        position: The zero-based index to extract from the sequence.
-        default: Value to return if the position doesn't exist or is empty.
+def _json_values(value: object, key: str, loads: JsonLoads) -> list:
+    """Parse ``value`` once and return the truthy values stored under ``key``.
 
-    Returns:
-        A function that extracts the item at ``position`` or returns ``default``.
+    Equivalent to the legacy ``names_from_json(value, key=key)`` but filters
+    and extracts in a single walk over the parsed list, and avoids copying
+    large payloads just to check that they are not blank.
     """
 
-    def picker(seq: list[str]) -> str:
-        if isinstance(seq, list) and len(seq) > position:
-            value = seq[position]
-            if isinstance(value, str) and value:
-                return value
-        return default
-
-    return picker
-
-
-def _take_first(n: int):
-    """Return a function that returns the first ``n`` entries from a list.
+    if isinstance(value, str) and value and not value.isspace():
+        loaded = loads(value)
+        if isinstance(loaded, list):
+            return [item[key] for item in loaded if isinstance(item, dict) and item.get(key)]
+    return []
 
-    Args:
-        n: Number of elements to take from the beginning.
 
-    Returns:
-        A function that returns the first n elements of a list, or an empty
-        list if the input is not a list.
-    """
+def _first_or(seq: list, position: int, default: str = "Unknown") -> str:
+    """Inline equivalent of the legacy ``pick_if_present(position, default)(seq)``."""
 
-    def taker(seq: list[str]) -> list[str]:
-        if isinstance(seq, list):
-            return seq[:n]
-        return []
+    if len(seq) > position:
+        value = seq[position]
+        if isinstance(value, str) and value:
+            return value
+    return default
 
-    return taker
 
+def _decode_json_columns(df: pd.DataFrame, *, loads: JsonLoads = json.loads) -> pd.DataFrame:
+    """Parse each JSON cell once and derive every JSON-based feature in one pass.
 
-def _decade_label(year: int | None) -> str:
-    """Convert a release year into a decade label (e.g., ``1990s``).
+    Produces the same values as chaining the per-column helpers kept in
+    ``benchmarks/_legacy.py`` (``names_from_json``, ``codes_from_json``,
+    ``extract_director``, ``pick_if_present`` and ``take_first``), but walks
+    each row a single time instead of re-visiting the parsed lists through many
+    ``Series.apply`` calls.
 
     Args:
-        year: A release year (e.g., 1995).
-
-    Returns:
-        A decade string like "1990s", or "Unknown" if year is None or NaN.
-    """
-
-    if year is None or np.isnan(year):
-        return "Unknown"
-    return f"{int(year // 10 * 10)}s"
-
-
-def _budget_category(amount: float) -> str:
-    """Bucket budgets into low/medium/high tiers.
-
-    Returns:
-        - "low" if budget < $20M
-        - "medium" if $20M <= budget < $80M
-        - "high" if budget >= $80M
-        - "unknown" if budget is None or NaN
-    """
-
-    if amount is None or np.isnan(amount):
-        return "unknown"
-    if amount < 20_000_000:
-        return "low"
-    if amount < 80_000_000:
-        return "medium"
-    return "high"
-
-
-def _vote_count_bucket(votes: float) -> str:
-    """Classify vote counts into engagement buckets.
-
-    Returns:
-        - "emerging" if votes < 500
-        - "established" if 500 <= votes < 2000
-        - "blockbuster" if votes >= 2000
-        - "unknown" if votes is None or NaN
-    """
-
-    if votes is None or np.isnan(votes):
-        return "unknown"
-    if votes < 500:
-        return "emerging"
-    if votes < 2000:
-        return "established"
-    return "blockbuster"
-
-
-def _runtime_bucket(runtime: float) -> str:
-    """Categorise runtimes into short/standard/extended/epic.
+        df: Raw movie rows containing the TMDB JSON columns and
+            ``original_language``.
+        loads: JSON decoding callable (see ``JSON_BACKENDS``).
 
     Returns:
-        - "short" if runtime < 90 minutes
-        - "standard" if 90 <= runtime < 120 minutes
-        - "extended" if 120 <= runtime < 150 minutes
-        - "epic" if runtime >= 150 minutes
-        - "unknown" if runtime is None or NaN
+        A frame indexed like ``df`` holding the derived columns.
     """
 
-    if runtime is None or np.isnan(runtime):
-        return "unknown"
-    if runtime < 90:
-        return "short"
-    if runtime < 120:
-        return "standard"
-    if runtime < 150:
-        return "extended"
-    return "epic"
+    derived: dict[str, list] = {
+        name: []
+        for name in (
+            "genres_list",
+            "genre_count",
+            "primary_genre",
+            "keywords_list",
+            "keywords_count",
+            "top_keyword",
+            "production_companies_list",
+            "primary_company",
+            "production_countries_list",
+            "primary_country",
+            "spoken_languages_list",
+            "primary_language",
+            "director",
+            "cast_list",
+            "top_cast",
+            "lead_actor",
+            "supporting_actor",
+            "ensemble_size",
+        )
+    }
+    rows = zip(
+        df["genres"],
+        df["keywords"],
+        df["production_companies"],
+        df["production_countries"],
+        df["spoken_languages"],
+        df["original_language"],
+        df["crew"],
+        df["cast"],
+    )
+    for genres, keywords, companies, countries, languages, original, crew, cast_ in rows:
+        genre_names = _json_values(genres, "name", loads)
+        derived["genres_list"].append(genre_names)
+        derived["genre_count"].append(len(genre_names))
+        derived["primary_genre"].append(_first_or(genre_names, 0))
+
+        keyword_names = _json_values(keywords, "name", loads)
+        derived["keywords_list"].append(keyword_names)
+        derived["keywords_count"].append(len(keyword_names))
+        derived["top_keyword"].append(_first_or(keyword_names, 0, default="None"))
+
+        company_names = _json_values(companies, "name", loads)
+        derived["production_companies_list"].append(company_names)
+        derived["primary_company"].append(_first_or(company_names, 0))
+
+        country_codes = _json_values(countries, "iso_3166_1", loads)
+        derived["production_countries_list"].append(country_codes)
+        derived["primary_country"].append(_first_or(country_codes, 0))
+
+        language_codes = _json_values(languages, "iso_639_1", loads)
+        derived["spoken_languages_list"].append(language_codes)
+        if language_codes:
+            derived["primary_language"].append(_first_or(language_codes, 0))
+        else:
+            derived["primary_language"].append(
+                original if isinstance(original, str) and original else "Unknown"
+            )
+
+        director = "Unknown"
+        for entry in _parse_json_list(crew, loads=loads):
+            if entry.get("job") == "Director" and entry.get("name"):
+                director = entry["name"]
+                break
+        derived["director"].append(director)
+
+        cast_names = _json_values(cast_, "name", loads)
+        derived["cast_list"].append(cast_names)
+        derived["top_cast"].append(cast_names[:3])
+        derived["lead_actor"].append(_first_or(cast_names, 0))
+        derived["supporting_actor"].append(_first_or(cast_names, 1))
+        derived["ensemble_size"].append(len(cast_names))
+
+    return pd.DataFrame(derived, index=df.index)
 
 
 def _profit(df: pd.DataFrame) -> pd.Series:
@@ -299,109 +257,494 @@ def _log1p_nonnegative(series: pd.Series) -> pd.Series:
     return np.log1p(series.clip(lower=0))
 
 
-def clean_movie_data() -> pd.DataFrame:
-    if not DATA_IN.exists():
-        raise FileNotFoundError(f"Raw dataset not found at {DATA_IN}")
+def _derive_features(
+    df: pd.DataFrame,
+    *,
+    loads: JsonLoads = json.loads,
+    float_columns: frozenset[str] = frozenset(),
+) -> pd.DataFrame:
+    """Apply every per-row cleaning step to a frame of raw rows.
 
-    df = pd.read_csv(DATA_IN)
+    Args:
+        df: Raw rows as read from ``DATA_IN`` (the whole file or one chunk).
+        loads: JSON decoding callable (see ``JSON_BACKENDS``).
+        float_columns: Numeric columns to force to ``float64`` so a chunk is
+            written exactly like the same rows in a whole-file read.
+
+    Returns:
+        The cleaned frame with columns ordered by ``COLUMN_SCHEMA``.
+    """
 
     # ----- Basic type coercion -----
-    numeric_cols = [
-        "budget",
-        "revenue",
-        "runtime",
-        "vote_average",
-        "vote_count",
-        "popularity",
-    ]
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-
-    release_dates = cast(pd.Series, pd.to_datetime(df.get("release_date"), errors="coerce"))
-    df = df[~release_dates.isna()].copy()
-    df["release_date"] = release_dates.dt.strftime("%Y-%m-%d")
-    df["release_year"] = release_dates.dt.year
+    with step("derive.coerce_numeric", rows=len(df)):
+        for col in NUMERIC_COLUMNS:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors="coerce")
+        for col in float_columns:
+            if col in df.columns:
+                df[col] = df[col].astype("float64")
+
+    with step("derive.release_dates", rows=len(df)):
+        release_dates = cast(pd.Series, pd.to_datetime(df.get("release_date"), errors="coerce"))
+        release_years = release_dates.dt.year
+        keep = release_dates.notna()
+        df = df[keep].copy()
+        df["release_date"] = release_dates[keep].dt.strftime("%Y-%m-%d")
+        df["release_year"] = release_years[keep]
+        if "release_year" in float_columns:
+            df["release_year"] = df["release_year"].astype("float64")
 
     # ----- Derived categorical features -----
-    df["genres_list"] = df["genres"].apply(_names_from_json)
-    df["genre_count"] = df["genres_list"].apply(len)
-    df["primary_genre"] = df["genres_list"].apply(_pick_if_present(0))
-
-    df["keywords_list"] = df["keywords"].apply(_names_from_json)
-    df["keywords_count"] = df["keywords_list"].apply(len)
-    df["top_keyword"] = df["keywords_list"].apply(_pick_if_present(0, default="None"))
-
-    df["production_companies_list"] = df["production_companies"].apply(_names_from_json)
-    df["primary_company"] = df["production_companies_list"].apply(_pick_if_present(0))
-
-    country_codes = _codes_from_json("iso_3166_1")
-    df["production_countries_list"] = df["production_countries"].apply(country_codes)
-    df["primary_country"] = df["production_countries_list"].apply(_pick_if_present(0))
-
-    language_codes = _codes_from_json("iso_639_1")
-    df["spoken_languages_list"] = df["spoken_languages"].apply(language_codes)
-    df["primary_language"] = [
-        _pick_if_present(0)(lang_list)
-        if lang_list
-        else (orig if isinstance(orig, str) and orig else "Unknown")
-        for lang_list, orig in zip(df["spoken_languages_list"], df["original_language"])
-    ]
-
-    df["director"] = df["crew"].apply(_extract_director)
-    df["cast_list"] = df["cast"].apply(_names_from_json)
-    df["top_cast"] = df["cast_list"].apply(_take_first(3))
-    df["lead_actor"] = df["cast_list"].apply(_pick_if_present(0))
-    df["supporting_actor"] = df["cast_list"].apply(_pick_if_present(1))
-    df["ensemble_size"] = df["cast_list"].apply(len)
-
-    df["decade"] = df["release_year"].apply(_decade_label)
-    df["budget_category"] = df["budget"].apply(_budget_category)
-    df["vote_count_bucket"] = df["vote_count"].apply(_vote_count_bucket)
-    df["runtime_bucket"] = df["runtime"].apply(_runtime_bucket)
+    with step("derive.json_columns", rows=len(df)):
+        decoded = _decode_json_columns(df, loads=loads)
+        for col in decoded.columns:
+            df[col] = decoded[col]
+
+    with step("derive.buckets", rows=len(df)):
+        df["decade"] = decade_labels(df["release_year"])
+        for col, source in (
+            ("budget_category", "budget"),
+            ("vote_count_bucket", "vote_count"),
+            ("runtime_bucket", "runtime"),
+        ):
+            df[col] = bucketize(df[source], BUCKETS[col])
 
     # ----- Financial features -----
-    df["profit"] = _profit(df)
-    df["roi"] = _roi(df)
-    df["is_profitable"] = _is_profitable(df)
-    df["budget_millions"] = _to_millions(df["budget"])
-    df["revenue_millions"] = _to_millions(df["revenue"])
-    df["revenue_to_budget_ratio"] = _revenue_to_budget_ratio(df)
-
-    df["budget_log"] = _log1p_nonnegative(df["budget"])
-    df["revenue_log"] = _log1p_nonnegative(df["revenue"])
-    df["profit_log"] = _log1p_nonnegative(df["profit"])
-    df["vote_count_log"] = _log1p_nonnegative(df["vote_count"])
-    df["popularity_log"] = _log1p_nonnegative(df["popularity"])
+    with step("derive.financials", rows=len(df)):
+        df["profit"] = _profit(df)
+        df["roi"] = _roi(df)
+        df["is_profitable"] = _is_profitable(df)
+        df["budget_millions"] = _to_millions(df["budget"])
+        df["revenue_millions"] = _to_millions(df["revenue"])
+        df["revenue_to_budget_ratio"] = _revenue_to_budget_ratio(df)
+
+    with step("derive.log_transforms", rows=len(df)):
+        df["budget_log"] = _log1p_nonnegative(df["budget"])
+        df["revenue_log"] = _log1p_nonnegative(df["revenue"])
+        df["profit_log"] = _log1p_nonnegative(df["profit"])
+        df["vote_count_log"] = _log1p_nonnegative(df["vote_count"])
+        df["popularity_log"] = _log1p_nonnegative(df["popularity"])
 
     # Impute/standardize fields expected downstream
-    fill_strings = [name for name, spec in COLUMN_SCHEMA if spec.kind == "string" and spec.fill]
-    for col in fill_strings:
-        if col in df.columns:
-            df[col] = df[col].fillna("Unknown")
-
-    fill_numeric = [name for name, spec in COLUMN_SCHEMA if spec.kind == "numeric" and spec.fill]
-    for col in fill_numeric:
-        if col in df.columns:
-            df[col] = df[col].fillna(0)
-
-    list_columns = [name for name, spec in COLUMN_SCHEMA if spec.kind == "list" and spec.fill]
-    for col in list_columns:
-        if col in df.columns:
-            df[col] = df[col].apply(lambda x: x if isinstance(x, list) else [])
+    with step("derive.fill_missing", rows=len(df)):
+        fill_strings = [name for name, spec in COLUMN_SCHEMA if spec.kind == "string" and spec.fill]
+        for col in fill_strings:
+            if col in df.columns:
+                df[col] = df[col].fillna("Unknown")
+
+        fill_numeric = [
+            name for name, spec in COLUMN_SCHEMA if spec.kind == "numeric" and spec.fill
+        ]
+        for col in fill_numeric:
+            if col in df.columns:
+                df[col] = df[col].fillna(0)
+
+        list_columns = [name for name, spec in COLUMN_SCHEMA if spec.kind == "list" and spec.fill]
+        for col in list_columns:
+            if col in df.columns:
+                df[col] = df[col].apply(lambda x: x if isinstance(x, list) else [])
 
     # Ensure deterministic column order (derived features grouped together)
     preferred_order = [name for name, _ in COLUMN_SCHEMA]
 
     remaining_cols = [col for col in df.columns if col not in preferred_order]
     ordered_cols = preferred_order + remaining_cols
-    df = df[ordered_cols]
+    return df[ordered_cols]
+
+
+def _frame_float_columns(df: pd.DataFrame) -> set[str]:
+    """Return the numeric columns of ``df`` that ``_derive_features`` yields as floats."""
+
+    floats: set[str] = set()
+    if pd.to_datetime(df.get("release_date"), errors="coerce").isna().any():
+        floats.add("release_year")
+    for col in ("id", *NUMERIC_COLUMNS):
+        if col not in df.columns:
+            continue
+        values = df[col]
+        if col in NUMERIC_COLUMNS:
+            values = pd.to_numeric(values, errors="coerce")
+        if values.dtype.kind == "f":
+            floats.add(col)
+    return floats
+
+
+def _float_columns(path: Path, chunk_size: int) -> frozenset[str]:
+    """Return the numeric columns a whole-file read would hold as floats.
+
+    ``read_csv`` infers dtypes per chunk, so a chunk without missing values
+    would keep ``budget`` as integers while a whole-file read (or a chunk with
+    a gap) turns it into floats and writes ``100.0`` instead of ``100``. The
+    same applies to ``release_year`` when any release date fails to parse.
+    This cheap pre-pass reads only those columns to pin the dtypes up front.
+    """
+
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [col for col in ("id", *NUMERIC_COLUMNS, "release_date") if col in header]
+    floats: set[str] = set()
+    for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunk_size):
+        floats |= _frame_float_columns(chunk)
+    return frozenset(floats)
+
+
+def _shards(df: pd.DataFrame, shard_size: int) -> Iterator[pd.DataFrame]:
+    """Split ``df`` into consecutive row blocks of at most ``shard_size`` rows."""
+
+    for start in range(0, len(df), shard_size):
+        yield df.iloc[start : start + shard_size]
 
-    DATA_OUT.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(DATA_OUT, index=False)
-    print(f"Saved cleaned data to {DATA_OUT} with {len(df)} rows.")
+
+def _map_ordered(
+    func: Callable[[pd.DataFrame], pd.DataFrame],
+    frames: Iterable[pd.DataFrame],
+    *,
+    workers: int,
+) -> Iterator[pd.DataFrame]:
+    """Yield ``func(frame)`` for each frame, in input order.
+
+    With ``workers > 1`` the frames are processed by a process pool. At most
+    two frames per worker are in flight, so a lazy ``frames`` iterator (such
+    as a chunked CSV reader) is never pulled into memory all at once.
+    """
+
+    if workers <= 1:
+        yield from map(func, frames)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque[Future[pd.DataFrame]] = deque()
+        for frame in frames:
+            pending.append(pool.submit(func, frame))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def clean_movie_data(
+    *,
+    json_backend: str = "auto",
+    workers: int = 1,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    data_in: Path | None = None,
+    data_out: Path | None = None,
+) -> pd.DataFrame:
+    """Clean the whole raw dataset in memory and write ``DATA_OUT``.
+
+    Args:
+        json_backend: JSON parser name (see ``JSON_BACKENDS``).
+        workers: Number of worker processes. With more than one, the raw
+            frame is split into ``shard_size``-row shards that are cleaned in
+            parallel and reassembled in their original order.
+        shard_size: Rows per shard when ``workers > 1``.
+        data_in: Raw CSV to read (defaults to ``DATA_IN``).
+        data_out: Cleaned dataset to write (defaults to ``DATA_OUT``); a
+            ``.parquet`` suffix selects the typed columnar format.
+    """
+
+    data_in = data_in or DATA_IN
+    data_out = data_out or DATA_OUT
+    if not data_in.exists():
+        raise FileNotFoundError(f"Raw dataset not found at {data_in}")
+    if shard_size < 1:
+        raise ValueError("shard_size must be a positive number of rows")
+
+    with step("read_csv") as record:
+        raw = pd.read_csv(data_in)
+        record.rows = len(raw)
+    loads = _json_loads(json_backend)
+    if workers > 1:
+        derive = partial(
+            _derive_features, loads=loads, float_columns=frozenset(_frame_float_columns(raw))
+        )
+        df = pd.concat(list(_map_ordered(derive, _shards(raw, shard_size), workers=workers)))
+    else:
+        df = _derive_features(raw, loads=loads)
+
+    with step("write_output", rows=len(df)):
+        write_clean_dataset(df, data_out)
+    print(f"Saved cleaned data to {data_out} with {len(df)} rows.")
     return df
 
 
+def _read_chunks(path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yield ``chunk_size``-row frames of ``path``, timing each read as ``read_csv``."""
+
+    reader = iter(pd.read_csv(path, chunksize=chunk_size))
+    while True:
+        with step("read_csv") as record:
+            chunk = next(reader, None)
+            record.rows = 0 if chunk is None else len(chunk)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def clean_movie_data_streaming(
+    *,
+    chunk_size: int,
+    json_backend: str = "auto",
+    workers: int = 1,
+    data_in: Path | None = None,
+    data_out: Path | None = None,
+) -> int:
+    """Clean the raw dataset ``chunk_size`` rows at a time, appending to ``DATA_OUT``.
+
+    Peak memory is bounded by the chunk size (times the worker count) rather
+    than the input size, and the output is byte-identical to
+    ``clean_movie_data``.
+
+    Returns:
+        The number of cleaned rows written.
+    """
+
+    data_in = data_in or DATA_IN
+    data_out = data_out or DATA_OUT
+    if not data_in.exists():
+        raise FileNotFoundError(f"Raw dataset not found at {data_in}")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive number of rows")
+
+    with step("scan_float_columns"):
+        float_columns = _float_columns(data_in, chunk_size)
+    derive = partial(_derive_features, loads=_json_loads(json_backend), float_columns=float_columns)
+
+    with CleanDatasetWriter(data_out) as writer:
+        for cleaned in _map_ordered(derive, _read_chunks(data_in, chunk_size), workers=workers):
+            with step("write_output", rows=len(cleaned)):
+                writer.write(cleaned)
+    print(f"Saved cleaned data to {data_out} with {writer.rows} rows.")
+    return writer.rows
+
+
+def _code_version() -> str:
+    """Digest of the code that defines the derivations (this script and the schema)."""
+
+    digest = hashlib.sha256()
+    for path in (Path(__file__), Path(movie_data.__file__)):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _state_path(data_out: Path) -> Path:
+    return data_out.with_suffix(".state.json")
+
+
+def _output_stamp(path: Path) -> list[int]:
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _csv_cells(df: pd.DataFrame) -> pd.DataFrame:
+    """Return ``df`` as the exact strings ``to_csv`` writes for each cell."""
+
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False)
+    buffer.seek(0)
+    return pd.read_csv(buffer, dtype=str, keep_default_na=False)
+
+
+def clean_movie_data_incremental(
+    *,
+    json_backend: str = "auto",
+    workers: int = 1,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    data_in: Path | None = None,
+    data_out: Path | None = None,
+) -> dict[str, int]:
+    """Re-derive only inserted or modified rows, reusing the previous output.
+
+    Rows are keyed on ``id`` and compared through per-row content hashes
+    saved next to the output (``movies_clean.state.json``). Unchanged rows
+    are copied from the previous output, deleted ids are dropped and the
+    result is written in raw-file order, so it equals a full rebuild. A full
+    rebuild runs instead when there is no usable state: first run, changed
+    derivation code or raw columns, a dtype change that would re-format
+    existing rows, duplicate ids, or an output modified by another run.
+
+    Returns:
+        Row counts for ``inserted``, ``modified``, ``deleted`` and ``unchanged``.
+    """
+
+    data_in = data_in or DATA_IN
+    data_out = data_out or DATA_OUT
+    if not data_in.exists():
+        raise FileNotFoundError(f"Raw dataset not found at {data_in}")
+
+    with step("read_csv") as record:
+        raw = pd.read_csv(data_in)
+        record.rows = len(raw)
+    float_columns = frozenset(_frame_float_columns(raw))
+    row_hashes = pd.util.hash_pandas_object(raw, index=False).to_numpy()
+    ids = raw["id"].tolist()
+    state = {
+        "code_version": _code_version(),
+        "columns": raw.columns.tolist(),
+        "float_columns": sorted(float_columns),
+    }
+
+    state_path = _state_path(data_out)
+    previous = json.loads(state_path.read_text()) if state_path.exists() else None
+    usable = (
+        previous is not None
+        and data_out.exists()
+        and all(previous.get(key) == value for key, value in state.items())
+        and previous.get("output_stamp") == _output_stamp(data_out)
+        and raw["id"].notna().all()
+        and raw["id"].is_unique
+    )
+
+    loads = _json_loads(json_backend)
+    derive = partial(_derive_features, loads=loads, float_columns=float_columns)
+    if usable:
+        assert previous is not None
+        old_hashes = dict(zip(previous["ids"], previous["hashes"]))
+        known = [row_id in old_hashes for row_id in ids]
+        changed = np.array(
+            [
+                not seen or old_hashes[row_id] != int(row_hash)
+                for row_id, seen, row_hash in zip(ids, known, row_hashes)
+            ],
+            dtype=bool,
+        )
+        stats = {
+            "inserted": int(len(ids) - sum(known)),
+            "modified": int(changed.sum() - (len(ids) - sum(known))),
+            "deleted": len(set(old_hashes) - set(ids)),
+            "unchanged": int((~changed).sum()),
+        }
+        fresh = pd.concat(
+            list(_map_ordered(derive, _shards(raw[changed], shard_size), workers=workers))
+            or [derive(raw.iloc[:0])]
+        )
+        merged = _merge_incremental(data_out, fresh, raw["id"], changed)
+        if data_out.suffix == ".parquet":
+            write_clean_dataset(merged, data_out)
+        else:
+            data_out.parent.mkdir(parents=True, exist_ok=True)
+            merged.to_csv(data_out, index=False)
+    else:
+        df = derive(raw)
+        write_clean_dataset(df, data_out)
+        # Report what was written: rows without a usable release date are dropped.
+        stats = {"inserted": len(df), "modified": 0, "deleted": 0, "unchanged": 0}
+        merged = df
+
+    state.update(
+        ids=ids,
+        hashes=[int(value) for value in row_hashes],
+        output_stamp=_output_stamp(data_out),
+    )
+    state_path.write_text(json.dumps(state), encoding="utf-8")
+    mode = "incremental" if usable else "full rebuild"
+    print(
+        f"Saved cleaned data to {data_out} with {len(merged)} rows ({mode}: "
+        + ", ".join(f"{count} {label}" for label, count in stats.items())
+        + ")."
+    )
+    return stats
+
+
+def _merge_incremental(
+    data_out: Path,
+    fresh: pd.DataFrame,
+    raw_ids: pd.Series,
+    changed: np.ndarray,
+) -> pd.DataFrame:
+    """Combine previous output rows for unchanged ids with freshly derived rows.
+
+    CSV outputs are merged as the literal cell strings that were written, so
+    unchanged rows are reproduced byte for byte. Parquet outputs are merged as
+    typed frames.
+    """
+
+    if data_out.suffix == ".parquet":
+        old = read_clean_dataset(data_out)
+        new = fresh
+    else:
+        old = pd.read_csv(data_out, dtype=str, keep_default_na=False)
+        new = _csv_cells(fresh)
+        raw_ids = _csv_cells(raw_ids.to_frame())["id"]
+
+    keep_ids = set(raw_ids[~changed])
+    old = old[old["id"].isin(keep_ids)]
+    combined = pd.concat([old, new], ignore_index=True)
+    order = {row_id: position for position, row_id in enumerate(raw_ids)}
+    positions = combined["id"].map(order)
+    return combined.iloc[np.argsort(positions.to_numpy(), kind="stable")].reset_index(drop=True)
+
+
+@instrumented("01_clean_data")
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Stream the raw CSV in chunks of this many rows (default: load it all).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for feature engineering (0 = one per CPU core).",
+    )
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=DEFAULT_SHARD_SIZE,
+        help="Rows per shard handed to each worker in the in-memory mode.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-derive rows whose id is new or whose raw content changed.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(OUTPUT_FORMATS),
+        default="csv",
+        help="Output format: CSV (default) or typed, compressed Parquet.",
+    )
+    parser.add_argument(
+        "--json-backend",
+        choices=["auto", *sorted(JSON_BACKENDS)],
+        default="auto",
+        help="JSON parser for the TMDB payload columns.",
+    )
+    args = parser.parse_args()
+    if args.chunk_size is not None and args.chunk_size <= 0:
+        parser.error("--chunk-size must be a positive number of rows")
+    if args.workers < 0:
+        parser.error("--workers must be 0 (one per CPU core) or a positive number")
+    workers = args.workers or os.cpu_count() or 1
+    data_out = output_path(args.format)
+
+    if args.incremental and args.chunk_size is not None:
+        parser.error("--incremental cannot be combined with --chunk-size")
+
+    if args.incremental:
+        clean_movie_data_incremental(
+            json_backend=args.json_backend,
+            workers=workers,
+            shard_size=args.shard_size,
+            data_out=data_out,
+        )
+    elif args.chunk_size is not None:
+        clean_movie_data_streaming(
+            chunk_size=args.chunk_size,
+            json_backend=args.json_backend,
+            workers=workers,
+            data_out=data_out,
+        )
+    else:
+        clean_movie_data(
+            json_backend=args.json_backend,
+            workers=workers,
+            shard_size=args.shard_size,
+            data_out=data_out,
+        )
+
+
 if __name__ == "__main__":
-    clean_movie_data()
+    main()
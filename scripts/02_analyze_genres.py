@@ -1,19 +1,50 @@
-"""Genre mix analysis for the movie workshop pipeline."""
+"""Genre mix analysis for the movie workshop pipeline.
+
+Besides ``outputs/genres_by_decade.png`` the script draws the same chart for
+the most common languages and production countries under
+``outputs/genres_by_decade/``. Figures whose table and style are unchanged
+since the last run are not redrawn (see ``figures``).
+
+Usage:
+    uv run python scripts/02_analyze_genres.py
+    uv run python scripts/02_analyze_genres.py --workers 0 --redraw
+"""
 
 from __future__ import annotations
 
-from collections.abc import Iterable
+import argparse
+import os
+from collections.abc import Mapping
 from pathlib import Path
+from typing import Any
 
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 
-DATA_IN = Path("results/movies_clean.csv")
+from figures import FigureSpec, render_figures, slug
+from genre_analytics import DIMENSIONS, GenreAnalytics
+from instrumentation import instrumented, step
+from movie_cube import CUBE_DIR, MovieCube, load_cube
+from movie_data import OUTPUT_FORMATS, clean_data_path, dataset_columns, load_clean_columns
+
 PLOTS = Path("outputs")
 PLOTS.mkdir(exist_ok=True, parents=True)
+TABLES = Path("results/genres")
 
 REQUIRED_COLUMNS = {"primary_genre", "decade"}
+# Optional: every genre of every movie, for the multi-genre tables.
+ANALYTICS_COLUMNS = {"genres_list", *DIMENSIONS}
 TOP_N_GENRES = 8
+# Languages and countries that get their own genre-by-decade chart.
+TOP_N_VARIANTS = 6
+GENRE_STYLE = {
+    "title": "Share of releases by primary genre and decade",
+    "xlabel": "Decade",
+    "ylabel": "Share of decade releases",
+    "legend_title": "Genre",
+    "colormap": "tab20",
+    "figsize": (11, 6),
+}
 
 
 def _compute_genre_counts(
@@ -26,24 +57,43 @@ def _compute_genre_counts(
     if df.empty:
         return pd.DataFrame()
 
-    genre_order: Iterable[str] = (
-        df["primary_genre"].value_counts().head(top_n).index.tolist()
+    cube = MovieCube.build(df, dimensions=("decade", "primary_genre"), measures=())
+    return _genre_counts_from_cube(cube, top_n=top_n)
+
+
+def _genre_counts_from_cube(
+    cube: MovieCube,
+    *,
+    top_n: int = TOP_N_GENRES,
+    where: Mapping[str, Any] | None = None,
+) -> pd.DataFrame:
+    """Return the decade × genre count table of ``_compute_genre_counts`` from the cube.
+
+    ``where`` restricts the movies counted, as in ``MovieCube.rollup``.
+    """
+
+    if cube.cells.empty:
+        return pd.DataFrame()
+
+    totals = cube.rollup(["primary_genre"], where=where)["count"]
+    totals = totals[totals.index.notna()]
+    genre_order: list[str] = (
+        totals.sort_values(ascending=False, kind="stable").head(top_n).index.tolist()
     )
     if not genre_order:
         return pd.DataFrame()
 
-    filtered = df[df["primary_genre"].isin(genre_order)].copy()
-    if filtered.empty:
+    with step("genre_counts.rollup", rows=len(cube.cells)):
+        counts = cube.rollup(
+            ["decade", "primary_genre"],
+            where={**(where or {}), "primary_genre": genre_order},
+        )["count"].unstack(fill_value=0)
+    counts = counts[counts.index.notna()]
+    if counts.empty:
         return pd.DataFrame()
-
-    counts = (
-        filtered.groupby(["decade", "primary_genre"])
-        .size()
-        .unstack(fill_value=0)
-        .reindex(columns=list(genre_order), fill_value=0)
-        .sort_index()
-    )
-    counts.index.name = "decade"
+    counts.index = pd.Index(counts.index.astype(str), name="decade")
+    counts.columns = counts.columns.astype(str)
+    counts = counts.reindex(columns=list(genre_order), fill_value=0).sort_index()
     counts.columns.name = None
     return counts
 
@@ -60,10 +110,108 @@ def _compute_genre_shares(counts: pd.DataFrame) -> pd.DataFrame:
     return shares.fillna(0)
 
 
+def _write_genre_tables(engine: GenreAnalytics, out_dir: Path) -> dict[str, pd.DataFrame]:
+    """Write the all-genre count, share and co-occurrence tables as CSV."""
+
+    tables = {
+        "counts_by_decade": engine.counts(["decade"]),
+        "shares_by_decade": engine.shares(["decade"]),
+        "shares_by_budget_category": engine.shares(["budget_category"], normalize="movies"),
+        "counts_by_country": engine.counts(["primary_country"]),
+        "counts_by_language": engine.counts(["primary_language"]),
+        "cooccurrence": engine.cooccurrence(),
+    }
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name, table in tables.items():
+        table.to_csv(out_dir / f"{name}.csv")
+    return tables
+
+
+def _top_pairs(cooccurrence: pd.DataFrame, n: int = 5) -> pd.Series:
+    """Return the ``n`` genre pairs that appear together most often."""
+
+    values = cooccurrence.to_numpy()
+    first, second = np.triu_indices(len(values), k=1)
+    genres = cooccurrence.columns
+    labels = [f"{genres[a]} + {genres[b]}" for a, b in zip(first, second)]
+    counts = pd.Series(values[first, second], index=labels)
+    return counts.sort_values(ascending=False, kind="stable").head(n)
+
+
+def _language_variants(cube: MovieCube, *, top_n: int = TOP_N_VARIANTS) -> list[FigureSpec]:
+    """Genre-by-decade charts for the ``top_n`` most common primary languages."""
+
+    totals = cube.rollup(["primary_language"])["count"]
+    languages = totals[totals.index.notna()].sort_values(ascending=False, kind="stable")
+    specs = []
+    for language in languages.head(top_n).index:
+        counts = _genre_counts_from_cube(cube, where={"primary_language": language})
+        if counts.empty:
+            continue
+        specs.append(
+            FigureSpec(
+                PLOTS / "genres_by_decade" / f"language-{slug(language)}.png",
+                "stacked_area",
+                _compute_genre_shares(counts),
+                {**GENRE_STYLE, "title": f"{GENRE_STYLE['title']} ({language})"},
+            )
+        )
+    return specs
+
+
+def _country_variants(engine: GenreAnalytics, *, top_n: int = TOP_N_VARIANTS) -> list[FigureSpec]:
+    """All-genre charts by decade for the ``top_n`` most common production countries."""
+
+    movies = engine.movie_counts(["primary_country"]).sort_values(ascending=False, kind="stable")
+    counts = engine.counts(["primary_country", "decade"])
+    specs = []
+    for country in movies.head(top_n).index:
+        table = counts.xs(country, level="primary_country")
+        genres = table.sum().sort_values(ascending=False, kind="stable").head(TOP_N_GENRES)
+        table = table.loc[table.sum(axis=1) > 0, genres[genres > 0].index]
+        if table.empty:
+            continue
+        table.index = pd.Index(table.index.astype(str), name="decade")
+        specs.append(
+            FigureSpec(
+                PLOTS / "genres_by_decade" / f"country-{slug(country)}.png",
+                "stacked_area",
+                _compute_genre_shares(table),
+                {
+                    **GENRE_STYLE,
+                    "title": f"Share of genre tags by decade ({country})",
+                    "ylabel": "Share of decade genre tags",
+                },
+            )
+        )
+    return specs
+
+
+@instrumented("02_analyze_genres")
 def main() -> None:
-    df = pd.read_csv(DATA_IN)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Processes for rendering figures (0 = all cores)."
+    )
+    parser.add_argument(
+        "--redraw",
+        action="store_true",
+        help="Render every figure even if its inputs are unchanged.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(OUTPUT_FORMATS),
+        default=None,
+        help="Cleaned file to read (default: the only one present).",
+    )
+    args = parser.parse_args()
+    try:
+        data_in = clean_data_path(args.format)
+    except ValueError as exc:
+        raise SystemExit(str(exc))
 
-    missing = REQUIRED_COLUMNS - set(df.columns)
+    available = set(dataset_columns(data_in))
+    missing = REQUIRED_COLUMNS - available
     if missing:
         missing_list = ", ".join(sorted(missing))
         raise SystemExit(
@@ -72,20 +220,33 @@ def main() -> None:
             "`uv run python scripts/01_clean_data.py` first?"
         )
 
-    df = df.dropna(subset=REQUIRED_COLUMNS).copy()
-    if df.empty:
-        raise SystemExit(
-            "`results/movies_clean.csv` has no populated genre/decade data. "
-            "Regenerate it with `uv run python scripts/01_clean_data.py`."
-        )
+    with step("cube") as record:
+        try:
+            cube, built = load_cube(data_in)
+        except ValueError as exc:
+            raise SystemExit(f"{exc}. Did you run `uv run python scripts/01_clean_data.py` first?")
+        record.rows = len(cube.cells)
+    action = "Built" if built else "Reused"
+    print(f"{action} aggregate cube ({len(cube.cells):,} cells) in {CUBE_DIR}/")
 
-    df["decade"] = df["decade"].astype(str)
+    variants = _language_variants(cube)
+    if ANALYTICS_COLUMNS <= available:
+        df, load_report = load_clean_columns(data_in, ANALYTICS_COLUMNS)
+        print(load_report.describe())
+        with step("genre_analytics", rows=len(df)):
+            engine = GenreAnalytics.from_frame(df)
+            tables = _write_genre_tables(engine, TABLES)
+        print(f"Saved all-genre tables ({len(engine.genres)} genres) to {TABLES}/")
+        print("Most frequent genre pairs:")
+        for pair, count in _top_pairs(tables["cooccurrence"]).items():
+            print(f"  • {pair}: {int(count)} films")
+        variants += _country_variants(engine)
 
-    counts = _compute_genre_counts(df, top_n=TOP_N_GENRES)
+    counts = _genre_counts_from_cube(cube, top_n=TOP_N_GENRES)
     if counts.empty:
         raise SystemExit(
-            "No rows remain after filtering to top genres. "
-            "Check the cleaned dataset output from step 01."
+            "`results/movies_clean.csv` has no populated genre/decade data. "
+            "Regenerate it with `uv run python scripts/01_clean_data.py`."
         )
 
     shares = _compute_genre_shares(counts)
@@ -95,15 +256,17 @@ def main() -> None:
             "`primary_genre` were derived in scripts/01_clean_data.py."
         )
 
-    plt.figure(figsize=(11, 6))
-    shares.plot(kind="area", stacked=True, colormap="tab20", ax=plt.gca())
-    plt.title("Share of releases by primary genre and decade")
-    plt.ylabel("Share of decade releases")
-    plt.xlabel("Decade")
-    plt.legend(title="Genre", loc="upper left", bbox_to_anchor=(1.02, 1))
-    plt.tight_layout()
-    plt.savefig(PLOTS / "genres_by_decade.png", dpi=150)
-    print("Saved plot: outputs/genres_by_decade.png")
+    specs = [FigureSpec(PLOTS / "genres_by_decade.png", "stacked_area", shares, GENRE_STYLE)]
+    with step("plot", rows=len(specs) + len(variants)):
+        status = render_figures(
+            [*specs, *variants], workers=args.workers or os.cpu_count() or 1, force=args.redraw
+        )
+    rendered = sum(value == "rendered" for value in status.values())
+    print(f"Saved plot: outputs/genres_by_decade.png ({status[specs[0].path]})")
+    print(
+        f"Saved {len(variants)} per-language/country charts to {PLOTS / 'genres_by_decade'}/ "
+        f"({rendered} of {len(status)} figures redrawn)"
+    )
 
     latest_decade = counts.index.max()
     if isinstance(latest_decade, str):
@@ -2,18 +2,33 @@
 
 from __future__ import annotations
 
+import argparse
+import copy
+import itertools
+import os
+from collections.abc import Iterable, Mapping
 from pathlib import Path
+from typing import Any
 
+import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
 from sklearn.compose import ColumnTransformer
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
 from sklearn.impute import SimpleImputer
+from sklearn.inspection import permutation_importance
 from sklearn.metrics import mean_absolute_error, r2_score
-from sklearn.model_selection import KFold, cross_val_score, train_test_split
+from sklearn.model_selection import KFold, train_test_split
 from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.preprocessing import OrdinalEncoder, StandardScaler
 
-DATA_IN = Path("results/movies_clean.csv")
+from encoders import ENCODINGS, base_feature_names, categorical_encoder
+from fold_cache import FOLD_CACHE_DIR, FoldCache, fit_and_score
+from instrumentation import StepRecord, emit, instrumented, step
+from model_artifact import MODEL_DIR, ModelMetadata, data_fingerprint, save_model_artifact
+from movie_data import OUTPUT_FORMATS, clean_data_path, load_clean_columns
+from tuning import TUNING_DIR, TrialStore, successive_halving
 
 NUM_FEATURES: list[str] = [
     "budget_log",
@@ -43,63 +58,139 @@ CAT_FEATURES: list[str] = [
 ]
 
 
-def _build_pipeline() -> Pipeline:
-    """Construct the preprocessing + model pipeline used for vote prediction."""
+HIGH_CARDINALITY_FEATURES: list[str] = ["director", "lead_actor", "top_keyword"]
+
+
+ENGINES: tuple[str, ...] = ("forest", "hgb")
+# Native categorical splits in HistGradientBoosting need codes below ``max_bins``
+# (255); rarer categories beyond that share one "infrequent" code.
+HGB_MAX_CATEGORIES = 255
+
+
+def _build_pipeline(
+    encodings: Mapping[str, str] | None = None, *, engine: str = "forest"
+) -> Pipeline:
+    """Construct the preprocessing + model pipeline used for vote prediction.
+
+    Args:
+        encodings: Optional ``{column: mode}`` overrides for ``CAT_FEATURES``
+            (modes from ``encoders.ENCODINGS``). Columns not listed are
+            one-hot encoded by the ``cat`` transformer; every other mode gets
+            its own transformer named after the mode, and the preprocessed
+            matrix is then kept dense.
+        engine: ``forest`` (400-tree random forest) or ``hgb`` (histogram
+            gradient boosting). With ``hgb`` the ``cat`` columns are ordinal
+            coded and split on natively instead of one-hot encoded, and
+            missing numeric values are left for the model to route.
+    """
+
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; choose from {', '.join(ENGINES)}")
+    encodings = dict(encodings or {})
+    unknown = set(encodings) - set(CAT_FEATURES)
+    if unknown:
+        raise ValueError(f"Not categorical features: {', '.join(sorted(unknown))}")
+
+    if engine == "hgb":
+        numeric: Pipeline | str = "passthrough"
+    else:
+        numeric = Pipeline(
+            steps=[
+                ("imputer", SimpleImputer(strategy="median")),
+                ("scaler", StandardScaler()),
+            ]
+        )
 
-    numeric = Pipeline(
-        steps=[
-            ("imputer", SimpleImputer(strategy="median")),
-            ("scaler", StandardScaler()),
-        ]
-    )
-    categorical = Pipeline(
-        steps=[
-            ("imputer", SimpleImputer(strategy="most_frequent")),
-            (
-                "encoder",
-                OneHotEncoder(handle_unknown="ignore"),
-            ),
-        ]
-    )
+    columns_by_mode: dict[str, list[str]] = {}
+    for name in CAT_FEATURES:
+        columns_by_mode.setdefault(encodings.get(name, "onehot"), []).append(name)
+
+    transformers: list[tuple[str, Any, list[str]]] = [("num", numeric, NUM_FEATURES)]
+    for mode, columns in sorted(columns_by_mode.items(), key=lambda item: item[0] != "onehot"):
+        if engine == "hgb" and mode == "onehot":
+            encoder = OrdinalEncoder(
+                handle_unknown="use_encoded_value",
+                unknown_value=np.nan,
+                encoded_missing_value=np.nan,
+                max_categories=HGB_MAX_CATEGORIES,
+            )
+            transformers.append(("cat", encoder, columns))
+            continue
+        categorical = Pipeline(
+            steps=[
+                ("imputer", SimpleImputer(strategy="most_frequent")),
+                ("encoder", categorical_encoder(mode)),
+            ]
+        )
+        transformers.append(("cat" if mode == "onehot" else mode, categorical, columns))
 
+    # The compact encodings exist to keep the matrix narrow, so keep it dense too.
+    compact = engine == "hgb" or set(columns_by_mode) != {"onehot"}
     preprocessor = ColumnTransformer(
-        transformers=[
-            ("num", numeric, NUM_FEATURES),
-            ("cat", categorical, CAT_FEATURES),
-        ]
+        transformers=transformers, sparse_threshold=0.0 if compact else 0.3
     )
 
-    model = RandomForestRegressor(
-        n_estimators=400,
-        min_samples_leaf=5,
-        random_state=42,
-        n_jobs=-1,
-    )
+    if engine == "hgb":
+        # ``num`` comes first, so the natively categorical ``cat`` columns follow it.
+        native = columns_by_mode.get("onehot", [])
+        model: RandomForestRegressor | HistGradientBoostingRegressor = (
+            HistGradientBoostingRegressor(
+                max_iter=300,
+                learning_rate=0.05,
+                min_samples_leaf=20,
+                categorical_features=list(
+                    range(len(NUM_FEATURES), len(NUM_FEATURES) + len(native))
+                ),
+                random_state=42,
+            )
+        )
+    else:
+        model = RandomForestRegressor(
+            n_estimators=400,
+            min_samples_leaf=5,
+            random_state=42,
+            n_jobs=-1,
+        )
 
     return Pipeline(steps=[("pre", preprocessor), ("model", model)])
 
 
-def aggregated_feature_importance(pipeline: Pipeline) -> pd.Series:
-    """Aggregate tree-based feature importances back to their base feature names."""
+def _set_model_jobs(pipeline: Pipeline, n_jobs: int) -> Pipeline:
+    """Set the model's ``n_jobs`` when the engine has one (HGB uses OpenMP threads)."""
+
+    if "n_jobs" in pipeline.named_steps["model"].get_params():
+        pipeline.set_params(model__n_jobs=n_jobs)
+    return pipeline
+
+
+def aggregated_feature_importance(
+    pipeline: Pipeline, X: pd.DataFrame | None = None, y: pd.Series | None = None
+) -> pd.Series:
+    """Aggregate feature importances back to their base feature names.
+
+    Tree ensembles with ``feature_importances_`` (the forest) need only the
+    fitted pipeline. Other engines (``hgb``) are scored by permutation
+    importance of each input column on ``X``/``y``, which is already per
+    base feature.
+    """
     pre = pipeline.named_steps["pre"]
     model = pipeline.named_steps["model"]
 
-    feature_names = pre.get_feature_names_out()
-    importances = model.feature_importances_
-
-    def base_name(name: str) -> str:
-        if name.startswith("num__"):
-            return name.split("__", 1)[1]
-        if name.startswith("cat__"):
-            remainder = name.split("__", 1)[1]
-            if "_" in remainder:
-                return remainder.rsplit("_", 1)[0]
-            return remainder
-        return name
+    if not hasattr(model, "feature_importances_"):
+        if X is None or y is None:
+            raise ValueError("This engine needs X and y for permutation importance")
+        result = permutation_importance(pipeline, X, y, n_repeats=5, random_state=42)
+        return pd.Series(
+            result.importances_mean, index=pd.Index(X.columns, name="base_feature")
+        ).sort_values(ascending=False)
 
     grouped = (
-        pd.DataFrame({"feature": feature_names, "importance": importances})
-        .assign(base_feature=lambda df_: df_["feature"].apply(base_name))
+        pd.DataFrame(
+            {
+                "base_feature": base_feature_names(pre),
+                "importance": model.feature_importances_,
+            }
+        )
         .groupby("base_feature")["importance"]
         .sum()
         .sort_values(ascending=False)
@@ -107,22 +198,101 @@ def aggregated_feature_importance(pipeline: Pipeline) -> pd.Series:
     return grouped
 
 
-def _evaluate_model(
+def _parallel_budget(n_splits: int, n_jobs: int | None = None) -> tuple[int, int]:
+    """Split a core budget between concurrent CV folds and each fold's forest.
+
+    Args:
+        n_splits: Number of CV folds that could run at once.
+        n_jobs: Total cores to use (``None`` or ``-1`` for all cores).
+
+    Returns:
+        ``(fold_jobs, model_jobs)`` whose product never exceeds the budget, so
+        the fold processes and the forest threads do not oversubscribe cores.
+    """
+
+    cores = n_jobs if n_jobs and n_jobs > 0 else (os.cpu_count() or 1)
+    fold_jobs = max(1, min(n_splits, cores))
+    return fold_jobs, max(1, cores // fold_jobs)
+
+
+def _cross_validate_folds(
     pipeline: Pipeline,
     X: pd.DataFrame,
     y: pd.Series,
     *,
     n_splits: int = 5,
-    test_size: float = 0.2,
     random_state: int = 42,
-) -> dict[str, float]:
-    """Run cross-validation and holdout evaluation, returning summary metrics."""
+    n_jobs: int | None = None,
+    cache: FoldCache | None = None,
+) -> pd.DataFrame:
+    """Fit each CV fold once, scoring R² and MAE, with folds running concurrently.
+
+    The preprocessing of each fold comes from ``cache`` (a fresh in-memory
+    ``FoldCache`` by default), so only the model is fitted per fold when the
+    same folds were preprocessed before.
+
+    Each fold is logged as an instrumentation step ``cv_fold_<n>``.
+
+    Returns:
+        One row per fold with ``r2``, ``mae``, ``fit_seconds`` and
+        ``score_seconds`` (model fit and predict time), plus the CPU time and
+        peak RSS of the process that fitted it.
+    """
 
     cv = KFold(n_splits=n_splits, shuffle=True, random_state=random_state)
-    cv_r2_scores = cross_val_score(pipeline, X, y, cv=cv, scoring="r2")
-    cv_mae_scores = -cross_val_score(
-        pipeline, X, y, cv=cv, scoring="neg_mean_absolute_error"
+    fold_jobs, model_jobs = _parallel_budget(n_splits, n_jobs)
+    cache = cache if cache is not None else FoldCache()
+    pre = pipeline.named_steps["pre"]
+    model = _set_model_jobs(clone(pipeline), model_jobs).named_steps["model"]
+    with step("preprocess_folds", rows=len(X)):
+        splits = [cache.get(pre, X, y, train, test) for train, test in cv.split(X)]
+    results = Parallel(n_jobs=fold_jobs)(
+        delayed(fit_and_score)(clone(model), data.X_train, data.y_train, data.X_test, data.y_test)
+        for data in splits
     )
+    folds = pd.DataFrame(results, index=pd.RangeIndex(1, n_splits + 1, name="fold"))
+    for (fold, row), data in zip(folds.iterrows(), splits):
+        emit(
+            StepRecord(
+                step=f"cv_fold_{fold}",
+                rows=len(data.y_train) + len(data.y_test),
+                wall_seconds=row["fit_seconds"] + row["score_seconds"],
+                cpu_seconds=row["cpu_seconds"],
+                peak_rss_mb=row["peak_rss_mb"],
+            )
+        )
+    folds.attrs["fold_jobs"] = fold_jobs
+    folds.attrs["model_jobs"] = model_jobs
+    return folds
+
+
+def _evaluate_model(
+    pipeline: Pipeline,
+    X: pd.DataFrame,
+    y: pd.Series,
+    *,
+    n_splits: int = 5,
+    test_size: float = 0.2,
+    random_state: int = 42,
+    folds: pd.DataFrame | None = None,
+    cache: FoldCache | None = None,
+) -> dict[str, float]:
+    """Run cross-validation and holdout evaluation, returning summary metrics.
+
+    Pass ``folds`` from ``_cross_validate_folds`` to reuse fold scores that
+    were already computed (e.g. to report their timings). The holdout split's
+    preprocessing also comes from ``cache``; ``pipeline`` is left fitted on
+    the holdout training rows, with its own copy of the cached preprocessor
+    so refitting ``pipeline`` never changes the cache entry.
+    """
+
+    cache = cache if cache is not None else FoldCache()
+    if folds is None:
+        folds = _cross_validate_folds(
+            pipeline, X, y, n_splits=n_splits, random_state=random_state, cache=cache
+        )
+    cv_r2_scores = folds["r2"].to_numpy()
+    cv_mae_scores = folds["mae"].to_numpy()
 
     metrics = {
         "cv_r2_mean": float(cv_r2_scores.mean()),
@@ -131,23 +301,190 @@ def _evaluate_model(
         "cv_mae_std": float(cv_mae_scores.std()),
     }
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=test_size, random_state=random_state
+    train, test = train_test_split(
+        np.arange(len(X)), test_size=test_size, random_state=random_state
     )
-    pipeline.fit(X_train, y_train)
+    with step("holdout", rows=len(X)):
+        holdout = cache.get(pipeline.named_steps["pre"], X, y, train, test)
+        pipeline.steps[0] = ("pre", copy.deepcopy(holdout.pre))
+        pipeline.named_steps["model"].fit(holdout.X_train, holdout.y_train)
 
-    y_pred = pipeline.predict(X_test)
-    metrics["holdout_r2"] = float(r2_score(y_test, y_pred))
-    metrics["holdout_mae"] = float(mean_absolute_error(y_test, y_pred))
-    metrics["holdout_size"] = int(len(y_test))
+        y_pred = pipeline.named_steps["model"].predict(holdout.X_test)
+    metrics["holdout_r2"] = float(r2_score(holdout.y_test, y_pred))
+    metrics["holdout_mae"] = float(mean_absolute_error(holdout.y_test, y_pred))
+    metrics["holdout_size"] = int(len(test))
 
     return metrics
 
 
+def _print_fold_timings(folds: pd.DataFrame) -> None:
+    print(
+        f"CV folds ({folds.attrs['fold_jobs']} concurrent x "
+        f"{folds.attrs['model_jobs']} model job(s) each):"
+    )
+    for fold, row in folds.iterrows():
+        print(
+            f"  fold {fold}: fit {row['fit_seconds']:.2f}s, score {row['score_seconds']:.2f}s, "
+            f"R^2 {row['r2']:.3f}, MAE {row['mae']:.3f}"
+        )
+
+
+# Tuning grid per engine: ``encoding`` applies to HIGH_CARDINALITY_FEATURES and
+# ``model__*`` entries are model parameters (see tuning.py).
+SEARCH_SPACE: dict[str, dict[str, list[Any]]] = {
+    "forest": {
+        "encoding": ["onehot", "target"],
+        "model__n_estimators": [200, 400],
+        "model__min_samples_leaf": [1, 5, 10],
+        "model__max_features": [1.0, 0.5],
+    },
+    "hgb": {
+        "encoding": ["onehot", "target"],
+        "model__learning_rate": [0.03, 0.1],
+        "model__max_leaf_nodes": [15, 31],
+        "model__min_samples_leaf": [10, 20],
+    },
+}
+
+
+def _search_candidates(engines: Iterable[str] = ENGINES) -> list[dict[str, Any]]:
+    """Expand ``SEARCH_SPACE`` into one settings dict per grid point."""
+
+    candidates = []
+    for engine in engines:
+        grid = SEARCH_SPACE[engine]
+        for values in itertools.product(*grid.values()):
+            candidates.append({"engine": engine, **dict(zip(grid, values))})
+    return candidates
+
+
+def _pipeline_for(params: Mapping[str, Any]) -> Pipeline:
+    """Build the (unfitted) pipeline for a tuning candidate's settings."""
+
+    encodings = dict.fromkeys(HIGH_CARDINALITY_FEATURES, params.get("encoding", "onehot"))
+    pipeline = _build_pipeline(encodings, engine=params.get("engine", "forest"))
+    return pipeline.set_params(
+        **{name: value for name, value in params.items() if name.startswith("model__")}
+    )
+
+
+def _tune(
+    X: pd.DataFrame,
+    y: pd.Series,
+    *,
+    data_path: Path,
+    n_jobs: int | None,
+    eta: int,
+    cache: FoldCache,
+    engines: Iterable[str] = ENGINES,
+) -> pd.DataFrame:
+    """Run the resumable successive-halving search over ``engines`` and return its leaderboard."""
+
+    store = TrialStore.load(TUNING_DIR / f"trials-{data_fingerprint(data_path)[:12]}.jsonl")
+    if store.records:
+        print(f"Resuming: {len(store.records)} fold score(s) already in {store.path}")
+    return successive_halving(
+        _search_candidates(engines),
+        X,
+        y,
+        _pipeline_for,
+        store=store,
+        eta=eta,
+        n_jobs=n_jobs,
+        cache=cache,
+    )
+
+
+def _parse_encodings(specs: list[str]) -> dict[str, str]:
+    """Parse ``--encode`` values: ``MODE`` for all high-cardinality columns or ``COLUMN=MODE``."""
+
+    encodings: dict[str, str] = {}
+    for spec in specs:
+        column, _, mode = spec.rpartition("=")
+        if mode not in ENCODINGS:
+            raise ValueError(f"Unknown encoding {mode!r}; choose from {', '.join(ENCODINGS)}")
+        for name in [column] if column else HIGH_CARDINALITY_FEATURES:
+            if name not in CAT_FEATURES:
+                raise ValueError(f"{name!r} is not one of the categorical features")
+            encodings[name] = mode
+    return encodings
+
+
+@instrumented("04_build_model")
 def main() -> None:
-    df = pd.read_csv(DATA_IN)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--n-jobs",
+        type=int,
+        default=None,
+        help="Total cores shared by the CV folds and the forest (default: all).",
+    )
+    parser.add_argument(
+        "--artifact-dir",
+        type=Path,
+        default=MODEL_DIR,
+        help=f"Where to save the fitted model (default: {MODEL_DIR}).",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default=None,
+        help=(
+            "Model engine: random forest or histogram gradient boosting (default: forest). "
+            "With --tune, search only this engine's grid (default: every engine)."
+        ),
+    )
+    parser.add_argument(
+        "--encode",
+        action="append",
+        default=[],
+        metavar="[COLUMN=]MODE",
+        help=(
+            f"Categorical encoding ({', '.join(ENCODINGS)}) for one column, or for "
+            f"{', '.join(HIGH_CARDINALITY_FEATURES)} when no column is given. Repeatable."
+        ),
+    )
+    parser.add_argument(
+        "--no-fold-cache",
+        action="store_true",
+        help=f"Keep preprocessed fold matrices in memory only (not in {FOLD_CACHE_DIR}/).",
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help=f"Delete the cached fold matrices in {FOLD_CACHE_DIR}/ before running.",
+    )
+    parser.add_argument(
+        "--tune",
+        action="store_true",
+        help=f"Search SEARCH_SPACE with successive halving (trials kept in {TUNING_DIR}/).",
+    )
+    parser.add_argument(
+        "--tune-eta", type=int, default=3, help="Keep the best 1/ETA per tuning rung."
+    )
+    parser.add_argument(
+        "--no-save", action="store_true", help="Evaluate only; do not refit and save the model."
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(OUTPUT_FORMATS),
+        default=None,
+        help="Cleaned file to read (default: the only one present).",
+    )
+    args = parser.parse_args()
+    try:
+        data_in = clean_data_path(args.format)
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+    try:
+        encodings = _parse_encodings(args.encode)
+    except ValueError as exc:
+        raise SystemExit(str(exc))
 
     required_cols = set(NUM_FEATURES + CAT_FEATURES + ["vote_average"])
+    df, load_report = load_clean_columns(data_in, required_cols)
+    print(load_report.describe())
+
     missing = required_cols - set(df.columns)
     if missing:
         raise SystemExit(
@@ -159,26 +496,64 @@ def main() -> None:
     X = df[NUM_FEATURES + CAT_FEATURES]
     y = df["vote_average"].astype(float)
 
-    pipeline = _build_pipeline()
-    metrics = _evaluate_model(pipeline, X, y)
-
-    print(
-        f"5-fold CV R^2: {metrics['cv_r2_mean']:.3f} ± {metrics['cv_r2_std']:.3f}"
-    )
-    print(
-        f"5-fold CV MAE: {metrics['cv_mae_mean']:.3f} ± {metrics['cv_mae_std']:.3f}"
-    )
-    print(
-        f"Holdout R^2: {metrics['holdout_r2']:.3f} "
-        f"(test size: {metrics['holdout_size']})"
-    )
+    if args.clear_cache:
+        FoldCache(FOLD_CACHE_DIR).clear()
+    cache = FoldCache(None if args.no_fold_cache else FOLD_CACHE_DIR)
+    if args.tune:
+        with step("tune", rows=len(X)):
+            leaderboard = _tune(
+                X,
+                y,
+                data_path=data_in,
+                n_jobs=args.n_jobs,
+                eta=args.tune_eta,
+                cache=cache,
+                engines=[args.engine] if args.engine else ENGINES,
+            )
+        print("\nTop candidates (by CV MAE over all folds scored):")
+        with pd.option_context("display.width", 120, "display.max_columns", None):
+            print(leaderboard.head(10).to_string(index=False))
+        return
+
+    engine = args.engine or "forest"
+    pipeline = _build_pipeline(encodings, engine=engine)
+    if args.n_jobs:
+        _set_model_jobs(pipeline, args.n_jobs)
+    folds = _cross_validate_folds(pipeline, X, y, n_jobs=args.n_jobs, cache=cache)
+    metrics = _evaluate_model(pipeline, X, y, folds=folds, cache=cache)
+
+    print(f"5-fold CV R^2: {metrics['cv_r2_mean']:.3f} ± {metrics['cv_r2_std']:.3f}")
+    print(f"5-fold CV MAE: {metrics['cv_mae_mean']:.3f} ± {metrics['cv_mae_std']:.3f}")
+    print(f"Holdout R^2: {metrics['holdout_r2']:.3f} (test size: {metrics['holdout_size']})")
     print(f"Holdout MAE: {metrics['holdout_mae']:.3f}")
+    _print_fold_timings(folds)
+    print(f"Preprocessing cache: {cache.hits} reused, {cache.misses} fitted")
 
-    importance = aggregated_feature_importance(pipeline).head(10)
+    with step("feature_importance", rows=len(X)):
+        importance = aggregated_feature_importance(pipeline, X, y).head(10)
     print("\nTop feature importances (aggregated):")
     for feature, score in importance.items():
         print(f"  • {feature}: {score:.3f}")
 
+    if args.no_save:
+        return
+    with step("refit", rows=len(X)):
+        final = clone(pipeline).fit(X, y)
+    meta = ModelMetadata(
+        num_features=NUM_FEATURES,
+        cat_features=CAT_FEATURES,
+        encodings=encodings,
+        engine=engine,
+        target="vote_average",
+        data_path=str(data_in),
+        data_sha256=data_fingerprint(data_in),
+        training_rows=len(X),
+        metrics=metrics,
+    )
+    with step("save_artifact"):
+        model_path = save_model_artifact(final, meta, args.artifact_dir)
+    print(f"\nSaved model trained on all {len(X)} rows to {model_path}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,140 @@
+"""Score candidate movies with the model saved by 04_build_model.py.
+
+The input is any cleaned-format file (CSV or Parquet, as written by
+``01_clean_data.py``) holding the model's feature columns. The model is
+loaded once, memory-mapped, and the input is streamed in batches so files
+much larger than memory can be scored. Predictions are appended to a CSV
+one batch at a time.
+
+Usage:
+    uv run python scripts/05_score_movies.py candidates.parquet --output predictions.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from model_artifact import MODEL_DIR, ModelMetadata, load_model_artifact
+from movie_data import CleanDatasetWriter, dataset_columns, iter_clean_batches
+
+ID_COLUMNS = ("id", "title")
+PREDICTION_COLUMN = "predicted_vote_average"
+DEFAULT_BATCH_SIZE = 50_000
+DATA_OUT = Path("results/predictions.csv")
+
+
+@dataclass(frozen=True)
+class ScoringReport:
+    """Rows scored and where the time went."""
+
+    rows: int
+    batches: int
+    load_seconds: float
+    predict_seconds: float
+    total_seconds: float
+
+    def describe(self) -> str:
+        per_batch = self.predict_seconds / self.batches * 1000 if self.batches else 0.0
+        return (
+            f"Scored {self.rows} rows in {self.batches} batch(es): model load "
+            f"{self.load_seconds:.2f}s, {per_batch:.1f} ms predict per batch, "
+            f"{self.total_seconds:.2f}s total"
+        )
+
+
+def score_batch(pipeline: Any, meta: ModelMetadata, batch: pd.DataFrame) -> pd.DataFrame:
+    """Return the identifying columns of ``batch`` plus the model's prediction."""
+
+    scored = batch[[name for name in ID_COLUMNS if name in batch.columns]].copy()
+    scored[PREDICTION_COLUMN] = pipeline.predict(batch[meta.features])
+    return scored
+
+
+def score_file(
+    data_in: Path,
+    data_out: Path,
+    *,
+    artifact_dir: Path = MODEL_DIR,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    mmap: bool = True,
+) -> ScoringReport:
+    """Stream ``data_in`` through the saved model, writing predictions to ``data_out``.
+
+    Raises:
+        ValueError: If ``data_in`` lacks any of the model's feature columns.
+    """
+
+    start = time.perf_counter()
+    pipeline, meta = load_model_artifact(artifact_dir, mmap=mmap)
+    load_seconds = time.perf_counter() - start
+
+    missing = set(meta.features) - set(dataset_columns(data_in))
+    if missing:
+        raise ValueError(f"{data_in} is missing model features: {', '.join(sorted(missing))}")
+
+    rows = batches = 0
+    predict_seconds = 0.0
+    columns = [*ID_COLUMNS, *meta.features]
+    with CleanDatasetWriter(data_out) as writer:
+        for batch in iter_clean_batches(data_in, columns, batch_size=batch_size):
+            batch_start = time.perf_counter()
+            scored = score_batch(pipeline, meta, batch)
+            predict_seconds += time.perf_counter() - batch_start
+            writer.write(scored)
+            rows += len(scored)
+            batches += 1
+
+    return ScoringReport(
+        rows=rows,
+        batches=batches,
+        load_seconds=load_seconds,
+        predict_seconds=predict_seconds,
+        total_seconds=time.perf_counter() - start,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("data_in", type=Path, help="Cleaned-format CSV or Parquet file to score.")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=DATA_OUT,
+        help=f"Predictions CSV (default: {DATA_OUT}).",
+    )
+    parser.add_argument("--artifact-dir", type=Path, default=MODEL_DIR)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument(
+        "--no-mmap", action="store_true", help="Read the model into memory instead."
+    )
+    args = parser.parse_args()
+
+    if args.output.suffix != ".csv":
+        raise SystemExit("Predictions are written as CSV; use a .csv --output path.")
+    if not args.data_in.exists():
+        raise SystemExit(f"Input file not found: {args.data_in}")
+    try:
+        report = score_file(
+            args.data_in,
+            args.output,
+            artifact_dir=args.artifact_dir,
+            batch_size=args.batch_size,
+            mmap=not args.no_mmap,
+        )
+    except FileNotFoundError as exc:
+        raise SystemExit(f"{exc}. Run 04_build_model.py first to train and save the model.")
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+
+    print(report.describe())
+    print(f"Predictions written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
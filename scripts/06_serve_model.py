@@ -0,0 +1,297 @@
+"""Serve vote-average predictions from the saved model over local HTTP.
+
+The model written by ``04_build_model.py`` is loaded once and kept warm.
+Concurrent requests are coalesced: a single worker thread waits up to
+``--max-wait-ms`` after the first queued request for more rows (up to
+``--max-batch`` rows) and scores them with one vectorised ``predict`` call.
+If that call fails, each request in the batch is scored on its own, so only
+the request that caused the failure gets the error.
+
+Endpoints:
+    POST /predict  ``{"rows": [{feature: value, ...}, ...]}`` or a single row
+                   object; returns ``{"predictions": [...]}``.
+    GET  /stats    request/row counts, p50/p99 latency and throughput.
+    GET  /health   ``{"status": "ok"}`` once the model is loaded.
+
+Usage:
+    uv run python scripts/06_serve_model.py --port 8000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from collections.abc import Sequence
+from concurrent.futures import Future
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from model_artifact import MODEL_DIR, ModelMetadata, load_model_artifact
+
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_WAIT_MS = 2.0
+LATENCY_WINDOW = 10_000
+
+
+class LatencyStats:
+    """Thread-safe request counters with a sliding window of latencies."""
+
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._started = time.perf_counter()
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+
+    def record_request(self, seconds: float, rows: int) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+            self.requests += 1
+            self.rows += rows
+
+    def record_batch(self) -> None:
+        with self._lock:
+            self.batches += 1
+
+    def snapshot(self) -> dict[str, float]:
+        """Return counters, p50/p99 latency (ms) and throughput since start."""
+
+        with self._lock:
+            latencies = np.array(self._latencies, dtype="float64")
+            elapsed = time.perf_counter() - self._started
+            requests, rows, batches = self.requests, self.rows, self.batches
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000 if latencies.size else (0.0, 0.0)
+        return {
+            "requests": requests,
+            "rows": rows,
+            "batches": batches,
+            "rows_per_batch": rows / batches if batches else 0.0,
+            "p50_ms": float(p50),
+            "p99_ms": float(p99),
+            "requests_per_second": requests / elapsed if elapsed else 0.0,
+            "rows_per_second": rows / elapsed if elapsed else 0.0,
+        }
+
+
+class MicroBatcher:
+    """Coalesce concurrent prediction requests into vectorised ``predict`` calls."""
+
+    def __init__(
+        self,
+        pipeline: Any,
+        meta: ModelMetadata,
+        *,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        stats: LatencyStats | None = None,
+    ) -> None:
+        self.pipeline = pipeline
+        self.meta = meta
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.stats = stats or LatencyStats()
+        self._queue: queue.Queue[tuple[pd.DataFrame, Future] | None] = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def frame(self, rows: Sequence[dict[str, Any]]) -> pd.DataFrame:
+        """Build a feature frame from request rows, typed like the training data.
+
+        Raises:
+            ValueError: If any row lacks one of the model's features or gives
+                one a value that is not a scalar (string, number, bool or null).
+        """
+
+        for row in rows:
+            missing = set(self.meta.features) - row.keys()
+            if missing:
+                raise ValueError(f"Row is missing features: {', '.join(sorted(missing))}")
+            nested = [
+                name
+                for name in self.meta.features
+                if row[name] is not None and not isinstance(row[name], (str, int, float))
+            ]
+            if nested:
+                raise ValueError(f"Features must be scalars: {', '.join(nested)}")
+        frame = pd.DataFrame.from_records(rows, columns=self.meta.features)
+        for name in self.meta.num_features:
+            frame[name] = pd.to_numeric(frame[name], errors="coerce")
+        return frame
+
+    def predict(self, rows: Sequence[dict[str, Any]]) -> list[float]:
+        """Queue ``rows`` for the next batch and block until they are scored."""
+
+        start = time.perf_counter()
+        future: Future = Future()
+        self._queue.put((self.frame(rows), future))
+        predictions = future.result()
+        self.stats.record_request(time.perf_counter() - start, len(rows))
+        return predictions
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._worker.join()
+
+    def _collect(self, first: tuple[pd.DataFrame, Future]) -> list[tuple[pd.DataFrame, Future]]:
+        pending = [first]
+        size = len(first[0])
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Shut down after this batch.
+                self._queue.put(None)
+                break
+            pending.append(item)
+            size += len(item[0])
+        return pending
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            pending = self._collect(first)
+            frames = [frame for frame, _ in pending]
+            try:
+                predictions = self.pipeline.predict(pd.concat(frames, ignore_index=True))
+            except Exception:
+                self._predict_each(pending)
+                continue
+            self.stats.record_batch()
+            offset = 0
+            for frame, future in pending:
+                future.set_result(predictions[offset : offset + len(frame)].tolist())
+                offset += len(frame)
+
+    def _predict_each(self, pending: list[tuple[pd.DataFrame, Future]]) -> None:
+        """Score each request on its own so a failure reaches only its own request."""
+
+        for frame, future in pending:
+            try:
+                predictions = self.pipeline.predict(frame)
+            except Exception as exc:  # handed back to the waiting request
+                future.set_exception(exc)
+                continue
+            self.stats.record_batch()
+            future.set_result(predictions.tolist())
+
+
+def make_handler(batcher: MicroBatcher) -> type[BaseHTTPRequestHandler]:
+    """Return a request handler class bound to ``batcher``."""
+
+    class PredictionHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:
+            """Keep the console quiet; use ``/stats`` instead of access logs."""
+
+        def _send_json(self, status: HTTPStatus, payload: dict[str, Any]) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            if self.path == "/health":
+                self._send_json(HTTPStatus.OK, {"status": "ok"})
+            elif self.path == "/stats":
+                self._send_json(HTTPStatus.OK, batcher.stats.snapshot())
+            else:
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path {self.path}"})
+
+        def do_POST(self) -> None:
+            if self.path != "/predict":
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path {self.path}"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length))
+                rows = payload["rows"] if "rows" in payload else [payload]
+                predictions = batcher.predict(rows)
+            except (ValueError, KeyError, TypeError, AttributeError) as exc:
+                self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+                return
+            except Exception as exc:  # keep the connection; report the failure
+                self._send_json(
+                    HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(exc).__name__}: {exc}"}
+                )
+                return
+            self._send_json(HTTPStatus.OK, {"predictions": predictions})
+
+    return PredictionHandler
+
+
+class PredictionServer(ThreadingHTTPServer):
+    """Thread-per-connection server with a listen backlog sized for bursts."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def create_server(
+    batcher: MicroBatcher, host: str = "127.0.0.1", port: int = 8000
+) -> PredictionServer:
+    """Create (but do not start) a threaded HTTP server around ``batcher``."""
+
+    return PredictionServer((host, port), make_handler(batcher))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--artifact-dir", type=Path, default=MODEL_DIR)
+    parser.add_argument(
+        "--max-batch",
+        type=int,
+        default=DEFAULT_MAX_BATCH,
+        help="Rows per coalesced predict call.",
+    )
+    parser.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=DEFAULT_MAX_WAIT_MS,
+        help="How long to wait for more requests before predicting.",
+    )
+    args = parser.parse_args()
+
+    try:
+        pipeline, meta = load_model_artifact(args.artifact_dir)
+    except FileNotFoundError as exc:
+        raise SystemExit(f"{exc}. Run 04_build_model.py first to train and save the model.")
+
+    batcher = MicroBatcher(pipeline, meta, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    server = create_server(batcher, args.host, args.port)
+    print(f"Serving predictions on http://{args.host}:{server.server_port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.close()
+        print(json.dumps(batcher.stats.snapshot(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
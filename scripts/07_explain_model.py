@@ -0,0 +1,301 @@
+"""Explain the saved vote-average model: grouped permutation importance and per-row contributions.
+
+Both explanations work on the preprocessed matrix, computed once:
+
+- Permutation importance is measured per base feature. All output columns
+  of a feature (e.g. every one-hot column of ``director``) are shuffled
+  together, which is the same as shuffling the raw column because every
+  encoder works column by column. Features are scored in parallel threads,
+  with the forest itself predicting on one core meanwhile.
+- Per-row contributions decompose each forest prediction into a bias (the
+  training mean) plus one additive contribution per base feature, by
+  attributing the change in node value along every decision path to the
+  feature split on (the tree interpreter / "Saabas" method). Trees are
+  processed in parallel chunks, each accumulating ``rows × base features``
+  directly (never one column per one-hot output), and
+  ``bias + sum(contributions)`` equals the prediction.
+
+Rows can be subsampled with ``--sample-rows``. Results are written as
+Parquet files under ``results/explanations/`` (needs the ``columnar`` extra).
+
+Usage:
+    uv run python scripts/07_explain_model.py --sample-rows 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from joblib import Parallel, delayed
+from sklearn.metrics import r2_score
+
+from encoders import base_feature_names
+from model_artifact import MODEL_DIR, load_model_artifact
+from movie_data import PARQUET_COMPRESSION, clean_data_path, load_clean_columns
+
+OUTPUT_DIR = Path("results/explanations")
+ID_COLUMNS = ["id", "title"]
+DEFAULT_SAMPLE_ROWS = 10_000
+DEFAULT_REPEATS = 5
+
+
+def _column_groups(groups: list[str]) -> dict[str, np.ndarray]:
+    """Return ``{base feature: output column indices}`` in first-seen order."""
+
+    indices: dict[str, list[int]] = {}
+    for index, name in enumerate(groups):
+        indices.setdefault(name, []).append(index)
+    return {name: np.array(columns) for name, columns in indices.items()}
+
+
+def _permute_columns(matrix: Any, columns: np.ndarray, order: np.ndarray) -> Any:
+    """Return ``matrix`` with the rows of ``columns`` (together) put in ``order``."""
+
+    if sp.issparse(matrix):
+        mask = np.zeros(matrix.shape[1])
+        mask[columns] = 1.0
+        csr = sp.csr_matrix(matrix)
+        return csr @ sp.diags(1.0 - mask) + csr[order] @ sp.diags(mask)
+    permuted = np.array(matrix, copy=True)
+    permuted[:, columns] = permuted[order][:, columns]
+    return permuted
+
+
+def _permutation_scores(
+    model: Any, matrix: Any, y: np.ndarray, columns: np.ndarray, repeats: int, seed: int
+) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.array(
+        [
+            r2_score(y, model.predict(_permute_columns(matrix, columns, rng.permutation(len(y)))))
+            for _ in range(repeats)
+        ]
+    )
+
+
+def grouped_permutation_importance(
+    model: Any,
+    matrix: Any,
+    y: np.ndarray,
+    groups: list[str],
+    *,
+    repeats: int = DEFAULT_REPEATS,
+    seed: int = 42,
+    n_jobs: int | None = None,
+) -> pd.DataFrame:
+    """Return the R² drop from shuffling each base feature's columns together.
+
+    Args:
+        model: Fitted model that consumes ``matrix``.
+        matrix: Preprocessed rows (dense or sparse).
+        y: Targets for ``matrix``.
+        groups: Base feature name of every column of ``matrix``.
+        repeats: Shuffles per feature.
+        seed: Seed for the shuffles; feature ``i`` uses ``seed + i``.
+        n_jobs: Features scored concurrently (default: all cores).
+
+    Returns:
+        ``base_feature``, ``importance_mean`` and ``importance_std``, most
+        important first.
+    """
+
+    baseline = r2_score(y, model.predict(matrix))
+    column_groups = _column_groups(groups)
+    # Features are already scored in parallel; a forest predicting with all
+    # cores inside every thread would oversubscribe them.
+    params = model.get_params()
+    if "n_jobs" in params:
+        model.set_params(n_jobs=1)
+    try:
+        scores = Parallel(n_jobs=n_jobs or -1, prefer="threads")(
+            delayed(_permutation_scores)(model, matrix, y, columns, repeats, seed + index)
+            for index, columns in enumerate(column_groups.values())
+        )
+    finally:
+        if "n_jobs" in params:
+            model.set_params(n_jobs=params["n_jobs"])
+    drops = baseline - np.vstack(scores)
+    return (
+        pd.DataFrame(
+            {
+                "base_feature": list(column_groups),
+                "importance_mean": drops.mean(axis=1),
+                "importance_std": drops.std(axis=1),
+            }
+        )
+        .sort_values("importance_mean", ascending=False)
+        .reset_index(drop=True)
+    )
+
+
+def _tree_contributions(trees: list[Any], matrix: Any, indicator: sp.csr_matrix) -> np.ndarray:
+    """Sum the per-feature path contributions of ``trees`` for every row.
+
+    ``indicator`` maps each matrix column to its base feature, so the result
+    is ``rows × base features`` rather than one column per one-hot output.
+    """
+
+    total = np.zeros((matrix.shape[0], indicator.shape[1]))
+    for estimator in trees:
+        tree = estimator.tree_
+        values = tree.value[:, 0, 0]
+        parents = np.full(tree.node_count, -1)
+        for children in (tree.children_left, tree.children_right):
+            split = children >= 0
+            parents[children[split]] = np.flatnonzero(split)
+        nodes = np.flatnonzero(parents >= 0)
+        # Moving from a parent to a child changes the prediction by the
+        # difference in node values; charge it to the parent's split feature.
+        attribution = sp.csr_matrix(
+            (values[nodes] - values[parents[nodes]], (nodes, tree.feature[parents[nodes]])),
+            shape=(tree.node_count, indicator.shape[0]),
+        )
+        total += (estimator.decision_path(matrix) @ (attribution @ indicator)).toarray()
+    return total
+
+
+def tree_contributions(
+    model: Any, matrix: Any, groups: list[str], *, n_jobs: int | None = None
+) -> pd.DataFrame:
+    """Decompose a forest's predictions into a bias plus one term per base feature.
+
+    Returns:
+        ``prediction``, ``bias`` and one contribution column per base feature
+        for every row of ``matrix``; each row sums to its prediction.
+
+    Raises:
+        ValueError: If ``model`` is not an ensemble of decision trees.
+    """
+
+    trees = getattr(model, "estimators_", None)
+    if trees is None or not hasattr(np.ravel(trees)[0], "tree_"):
+        raise ValueError("Per-row contributions need a tree ensemble such as the forest engine")
+    trees = list(np.ravel(trees))
+    matrix = sp.csr_matrix(matrix, dtype=np.float32) if sp.issparse(matrix) else matrix
+    matrix = matrix if sp.issparse(matrix) else np.asarray(matrix, dtype=np.float32)
+
+    column_groups = _column_groups(groups)
+    indicator = sp.csr_matrix(
+        (
+            np.ones(len(groups)),
+            (
+                np.concatenate(list(column_groups.values())),
+                np.repeat(
+                    np.arange(len(column_groups)),
+                    [len(columns) for columns in column_groups.values()],
+                ),
+            ),
+        ),
+        shape=(len(groups), len(column_groups)),
+    )
+
+    workers = n_jobs if n_jobs and n_jobs > 0 else (os.cpu_count() or 1)
+    chunks = [chunk.tolist() for chunk in np.array_split(np.arange(len(trees)), workers)]
+    partials = Parallel(n_jobs=workers, prefer="threads")(
+        delayed(_tree_contributions)([trees[i] for i in chunk], matrix, indicator)
+        for chunk in chunks
+        if chunk
+    )
+    per_feature = np.sum(partials, axis=0) / len(trees)
+    bias = float(np.mean([tree.tree_.value[0, 0, 0] for tree in trees]))
+
+    contributions = pd.DataFrame(per_feature, columns=list(column_groups))
+    contributions.insert(0, "bias", bias)
+    contributions.insert(0, "prediction", bias + per_feature.sum(axis=1))
+    return contributions
+
+
+def _write_parquet(df: pd.DataFrame, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(path, index=False, compression=PARQUET_COMPRESSION)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", type=Path, default=None, help="Cleaned dataset to explain.")
+    parser.add_argument("--artifact-dir", type=Path, default=MODEL_DIR)
+    parser.add_argument(
+        "--sample-rows",
+        type=int,
+        default=DEFAULT_SAMPLE_ROWS,
+        help="Explain a random sample of this many rows (0 = all rows).",
+    )
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--n-jobs", type=int, default=None)
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR)
+    parser.add_argument(
+        "--no-contributions", action="store_true", help="Only compute permutation importance."
+    )
+    args = parser.parse_args()
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise SystemExit("Explanations are written as Parquet: install the `columnar` extra.")
+    try:
+        pipeline, meta = load_model_artifact(args.artifact_dir)
+    except FileNotFoundError as exc:
+        raise SystemExit(f"{exc}. Run 04_build_model.py first to train and save the model.")
+
+    try:
+        data_path = args.data or clean_data_path()
+    except ValueError as exc:
+        raise SystemExit(f"{exc}. Or pass --data.")
+    df, report = load_clean_columns(data_path, [*ID_COLUMNS, *meta.features, meta.target])
+    print(report.describe())
+    missing = {*meta.features, meta.target} - set(df.columns)
+    if missing:
+        raise SystemExit(f"{data_path} is missing columns: {', '.join(sorted(missing))}")
+    df = df.dropna(subset=[meta.target])
+    if 0 < args.sample_rows < len(df):
+        df = df.sample(n=args.sample_rows, random_state=args.seed).reset_index(drop=True)
+
+    start = time.perf_counter()
+    pre = pipeline.named_steps["pre"]
+    model = pipeline.named_steps["model"]
+    matrix = pre.transform(df[meta.features])
+    groups = base_feature_names(pre)
+    y = df[meta.target].to_numpy(dtype="float64")
+    print(
+        f"Preprocessed {len(df)} rows into {matrix.shape[1]} columns in "
+        f"{time.perf_counter() - start:.2f}s"
+    )
+
+    start = time.perf_counter()
+    importance = grouped_permutation_importance(
+        model, matrix, y, groups, repeats=args.repeats, seed=args.seed, n_jobs=args.n_jobs
+    )
+    _write_parquet(importance, args.output_dir / "permutation_importance.parquet")
+    print(f"Permutation importance ({args.repeats} repeats): {time.perf_counter() - start:.2f}s")
+    for row in importance.head(10).itertuples():
+        print(f"  • {row.base_feature}: {row.importance_mean:.3f} ± {row.importance_std:.3f}")
+
+    if args.no_contributions:
+        return
+    start = time.perf_counter()
+    try:
+        contributions = tree_contributions(model, matrix, groups, n_jobs=args.n_jobs)
+    except ValueError as exc:
+        print(f"Skipping per-row contributions: {exc}")
+        return
+    ids = df[[name for name in ID_COLUMNS if name in df.columns]].reset_index(drop=True)
+    _write_parquet(
+        pd.concat([ids, contributions], axis=1),
+        args.output_dir / "contributions.parquet",
+    )
+    print(
+        f"Per-row contributions for {len(contributions)} rows: {time.perf_counter() - start:.2f}s"
+    )
+    print(f"Explanations written to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Shared bucket definitions for the categorical features.
+
+``BUCKETS`` is the single source of truth for the budget, vote-count and
+runtime tiers. The cleaning step uses it to bucket whole columns at once,
+and the analysis steps use the same ordered ``CategoricalDtype`` when they
+load or order the buckets.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+UNKNOWN_DECADE = "Unknown"
+
+
+@dataclass(frozen=True)
+class BucketSpec:
+    """Half-open numeric buckets: ``labels[i]`` covers ``edges[i-1] <= x < edges[i]``.
+
+    Missing values map to ``unknown``.
+    """
+
+    edges: tuple[float, ...]
+    labels: tuple[str, ...]
+    unknown: str = "unknown"
+
+    def __post_init__(self) -> None:
+        if len(self.labels) != len(self.edges) + 1:
+            raise ValueError("A bucket table needs exactly one more label than edges")
+
+    @property
+    def dtype(self) -> pd.CategoricalDtype:
+        """Ordered categorical dtype with the known labels followed by ``unknown``."""
+
+        return pd.CategoricalDtype([*self.labels, self.unknown], ordered=True)
+
+    def label(self, value: float | None) -> str:
+        """Return the bucket label for a single value."""
+
+        if value is None or np.isnan(value):
+            return self.unknown
+        return self.labels[bisect_right(self.edges, value)]
+
+
+BUCKETS: dict[str, BucketSpec] = {
+    "budget_category": BucketSpec(
+        edges=(20_000_000, 80_000_000),
+        labels=("low", "medium", "high"),
+    ),
+    "vote_count_bucket": BucketSpec(
+        edges=(500, 2_000),
+        labels=("emerging", "established", "blockbuster"),
+    ),
+    "runtime_bucket": BucketSpec(
+        edges=(90, 120, 150),
+        labels=("short", "standard", "extended", "epic"),
+    ),
+}
+
+
+def bucketize(values: object, spec: BucketSpec) -> pd.Categorical:
+    """Bucket a whole array of numbers into ``spec``'s categorical dtype."""
+
+    numbers = np.asarray(values, dtype="float64")
+    codes = np.searchsorted(np.asarray(spec.edges, dtype="float64"), numbers, side="right")
+    codes[np.isnan(numbers)] = len(spec.labels)
+    return pd.Categorical.from_codes(codes, dtype=spec.dtype)
+
+
+def decade_labels(years: object) -> pd.Categorical:
+    """Label release years with their decade (``1990s``), or ``Unknown`` when missing.
+
+    Categories are the decades present, in chronological order, followed by
+    ``Unknown``.
+    """
+
+    numbers = np.asarray(years, dtype="float64")
+    known = ~np.isnan(numbers)
+    decades, inverse = np.unique((numbers[known] // 10 * 10).astype("int64"), return_inverse=True)
+    codes = np.full(len(numbers), len(decades), dtype="int64")
+    codes[known] = inverse
+    categories = [f"{decade}s" for decade in decades] + [UNKNOWN_DECADE]
+    return pd.Categorical.from_codes(codes, categories=categories, ordered=True)
@@ -0,0 +1,119 @@
+"""Categorical encoders for the model's high-cardinality columns.
+
+``director``, ``lead_actor`` and ``top_keyword`` have thousands of distinct
+values in a full catalogue, which one-hot encoding turns into thousands of
+sparse columns for the forest to scan. ``categorical_encoder`` returns a
+narrower alternative per encoding mode:
+
+- ``onehot``: one column per category (the default).
+- ``rare``: one-hot, but categories seen fewer than ``RARE_MIN_COUNT`` times
+  share a single ``infrequent`` column.
+- ``target``: one column holding the category's mean target, fitted out of
+  fold (``sklearn.preprocessing.TargetEncoder``) so a row never sees its own
+  target.
+- ``hash``: ``HASH_FEATURES`` hashed indicator columns per input column.
+
+Encoders live here rather than in ``04_build_model.py`` so a pickled
+pipeline can be loaded by the scoring and serving scripts.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+import sklearn
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.model_selection import KFold
+from sklearn.preprocessing import OneHotEncoder, TargetEncoder
+from sklearn.utils.fixes import parse_version
+
+ENCODINGS = ("onehot", "rare", "target", "hash")
+# Bump when an encoder changes its output, so cached fold matrices are rebuilt.
+ENCODERS_VERSION = 1
+RARE_MIN_COUNT = 5
+HASH_FEATURES = 32
+
+
+def _release(version: str) -> tuple[int, ...]:
+    """Return the ``(major, minor)`` release of a version, ignoring rc/dev suffixes."""
+
+    return tuple(parse_version(version).release or ())[:2]
+
+
+_SKLEARN_VERSION = _release(sklearn.__version__)
+
+
+class HashingEncoder(TransformerMixin, BaseEstimator):
+    """Hash each categorical column into ``n_features`` dense indicator columns."""
+
+    def __init__(self, n_features: int = HASH_FEATURES) -> None:
+        self.n_features = n_features
+
+    def fit(self, X: object, y: object = None) -> HashingEncoder:
+        self.n_features_in_ = np.asarray(X).shape[1]
+        return self
+
+    def transform(self, X: object) -> np.ndarray:
+        values = np.asarray(X, dtype=object)
+        hasher = FeatureHasher(
+            n_features=self.n_features, input_type="string", alternate_sign=False
+        )
+        blocks = [
+            hasher.transform([[str(value)] for value in values[:, index]]).toarray()
+            for index in range(values.shape[1])
+        ]
+        return np.hstack(blocks) if blocks else np.empty((len(values), 0))
+
+    def get_feature_names_out(self, input_features: Sequence[str] | None = None) -> np.ndarray:
+        if input_features is None:
+            input_features = [f"x{index}" for index in range(self.n_features_in_)]
+        return np.array(
+            [
+                f"{name}_hash{bucket}"
+                for name in input_features
+                for bucket in range(self.n_features)
+            ],
+            dtype=object,
+        )
+
+
+def categorical_encoder(mode: str, *, random_state: int = 42) -> Any:
+    """Return an unfitted encoder for ``mode`` (one of ``ENCODINGS``)."""
+
+    if mode == "onehot":
+        return OneHotEncoder(handle_unknown="ignore")
+    if mode == "rare":
+        return OneHotEncoder(handle_unknown="infrequent_if_exist", min_frequency=RARE_MIN_COUNT)
+    if mode == "target":
+        if _SKLEARN_VERSION >= (1, 9):
+            folds = KFold(n_splits=5, shuffle=True, random_state=random_state)
+            return TargetEncoder(target_type="continuous", cv=folds)
+        # Older releases only take an integer ``cv`` and shuffle via ``random_state``.
+        return TargetEncoder(target_type="continuous", random_state=random_state)
+    if mode == "hash":
+        return HashingEncoder()
+    raise ValueError(f"Unknown encoding {mode!r}; choose from {', '.join(ENCODINGS)}")
+
+
+def base_feature_names(pre: Any) -> list[str]:
+    """Map each output column of a fitted ``ColumnTransformer`` to its input column.
+
+    Encoders name their outputs ``<transformer>__<column>[_<suffix>]``; each is
+    mapped to the longest input column it starts with, so one-hot columns
+    (including category values that contain underscores) and the
+    rare/target/hash encodings all resolve to the feature they came from.
+    """
+
+    inputs = sorted(map(str, pre.feature_names_in_), key=len, reverse=True)
+
+    def base_name(name: str) -> str:
+        remainder = name.split("__", 1)[-1]
+        for column in inputs:
+            if remainder == column or remainder.startswith(f"{column}_"):
+                return column
+        return remainder
+
+    return [base_name(str(name)) for name in pre.get_feature_names_out()]
@@ -0,0 +1,195 @@
+"""Headless figure rendering that skips figures whose inputs are unchanged.
+
+Figures are drawn on ``matplotlib.figure.Figure`` objects attached to an Agg
+canvas, without importing ``pyplot``, so nothing depends on a display and no
+global figure state is shared between renders. A ``FigureSpec`` names a chart
+kind from ``RENDERERS``, the aggregate table it plots and its style options.
+The SHA-256 digest of those (plus the matplotlib version) is written into the
+PNG's metadata. ``render_figures`` reads that digest back from each existing
+file, renders only the figures whose digest changed, and spreads them over
+worker processes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import struct
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import matplotlib
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+# Bump when a renderer changes how it draws, so existing files are redrawn.
+FIGURES_VERSION = 1
+DPI = 150
+DIGEST_KEY = "Digest"
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+@dataclass(frozen=True)
+class FigureSpec:
+    """One figure to render: where to write it, what to draw and how."""
+
+    path: Path
+    kind: str
+    data: pd.DataFrame
+    style: Mapping[str, Any] = field(default_factory=dict)
+
+    def digest(self) -> str:
+        """Return the digest of the table, chart kind and style behind this figure."""
+
+        digest = hashlib.sha256()
+        layout = {
+            "version": FIGURES_VERSION,
+            "matplotlib": matplotlib.__version__,
+            "dpi": DPI,
+            "kind": self.kind,
+            "style": dict(self.style),
+            "index": [str(name) for name in self.data.index.names],
+            "columns": [str(name) for name in self.data.columns],
+            "dtypes": [str(dtype) for dtype in self.data.dtypes],
+        }
+        digest.update(json.dumps(layout, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(self.data, index=True).to_numpy().tobytes())
+        return digest.hexdigest()
+
+
+def _stacked_area(fig: Figure, data: pd.DataFrame, style: Mapping[str, Any]) -> None:
+    """Rows along x, one stacked band per column (e.g. genre shares per decade)."""
+
+    ax = fig.subplots()
+    x = np.arange(len(data))
+    colors = matplotlib.colormaps[style.get("colormap", "tab20")](
+        np.linspace(0, 1, max(len(data.columns), 1))
+    )
+    labels = [str(column) for column in data.columns]
+    ax.stackplot(x, data.to_numpy(dtype=float).T, labels=labels, colors=colors)
+    ax.set_xticks(x, labels=[str(value) for value in data.index])
+    if len(x) > 1:
+        ax.set_xlim(x[0], x[-1])
+    ax.set_ylim(bottom=0)
+    ax.set_title(style.get("title", ""))
+    ax.set_xlabel(style.get("xlabel", ""))
+    ax.set_ylabel(style.get("ylabel", ""))
+    ax.legend(title=style.get("legend_title"), loc="upper left", bbox_to_anchor=(1.02, 1))
+
+
+def _roi_bars(fig: Figure, data: pd.DataFrame, style: Mapping[str, Any]) -> None:
+    """Mean ROI and share profitable per row, as two horizontal bar panels."""
+
+    axes = fig.subplots(1, 2, sharey=True)
+    labels = [str(value) for value in data.index]
+
+    axes[0].barh(labels, data["mean_roi"], color="#4c72b0")
+    axes[0].set_title(style.get("title", "Average ROI by budget tier"))
+    axes[0].set_xlabel("Mean ROI ((revenue - budget) / budget)")
+    axes[0].axvline(0, color="black", linewidth=0.8)
+
+    axes[1].barh(labels, data["share_profitable"], color="#55a868")
+    axes[1].set_title("Share of profitable releases")
+    axes[1].set_xlabel("Proportion of titles with profit > 0")
+    axes[1].set_xlim(0, 1)
+
+    for ax in axes:
+        ax.grid(axis="x", linestyle="--", alpha=0.3)
+
+
+RENDERERS: dict[str, Callable[[Figure, pd.DataFrame, Mapping[str, Any]], None]] = {
+    "stacked_area": _stacked_area,
+    "roi_bars": _roi_bars,
+}
+
+
+def slug(value: object) -> str:
+    """Return a file-name friendly form of a label (``"United States"`` -> ``united-states``)."""
+
+    return re.sub(r"[^0-9a-z]+", "-", str(value).lower()).strip("-") or "none"
+
+
+def stored_digest(path: Path) -> str | None:
+    """Return the digest recorded in a PNG written by ``render_figures``, if any.
+
+    Only the chunks before the image data are read.
+    """
+
+    try:
+        with path.open("rb") as handle:
+            if handle.read(8) != _PNG_SIGNATURE:
+                return None
+            while header := handle.read(8):
+                if len(header) < 8:
+                    return None
+                length, chunk = struct.unpack(">I4s", header)
+                if chunk in (b"IDAT", b"IEND"):
+                    return None
+                body = handle.read(length)
+                handle.seek(4, 1)  # CRC
+                if chunk == b"tEXt":
+                    key, _, value = body.partition(b"\x00")
+                    if key == DIGEST_KEY.encode("latin-1"):
+                        return value.decode("latin-1")
+    except (FileNotFoundError, struct.error):
+        return None
+    return None
+
+
+def _render(spec: FigureSpec, digest: str) -> Path:
+    fig = Figure(figsize=spec.style.get("figsize", (11, 6)), layout="tight")
+    FigureCanvasAgg(fig)
+    RENDERERS[spec.kind](fig, spec.data, spec.style)
+    spec.path.parent.mkdir(parents=True, exist_ok=True)
+    # Write next to the target and rename, so a partial file never looks current.
+    partial = spec.path.with_name(spec.path.name + ".part")
+    fig.savefig(partial, format="png", dpi=DPI, metadata={DIGEST_KEY: digest})
+    partial.replace(spec.path)
+    return spec.path
+
+
+def render_figures(
+    specs: Iterable[FigureSpec], *, workers: int = 1, force: bool = False
+) -> dict[Path, str]:
+    """Render every figure whose file is missing or was drawn from other inputs.
+
+    Args:
+        specs: Figures to render; each needs a distinct ``path``.
+        workers: Worker processes for the figures to render; 1 renders here.
+        force: Render every figure even if its digest matches.
+
+    Returns:
+        ``"rendered"`` or ``"unchanged"`` for each figure path.
+    """
+
+    specs = list(specs)
+    paths = [spec.path for spec in specs]
+    if len(set(paths)) != len(paths):
+        raise ValueError("Figure paths must be unique")
+    unknown = sorted({spec.kind for spec in specs} - set(RENDERERS))
+    if unknown:
+        raise ValueError(f"Unknown figure kinds {unknown}; choose from {sorted(RENDERERS)}")
+
+    status = {}
+    stale = []
+    for spec in specs:
+        digest = spec.digest()
+        if not force and stored_digest(spec.path) == digest:
+            status[spec.path] = "unchanged"
+        else:
+            stale.append((spec, digest))
+            status[spec.path] = "rendered"
+
+    if workers > 1 and len(stale) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(stale))) as pool:
+            list(pool.map(_render, *zip(*stale)))
+    else:
+        for spec, digest in stale:
+            _render(spec, digest)
+    return status
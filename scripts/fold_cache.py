@@ -0,0 +1,293 @@
+"""Cache of fitted preprocessing and transformed matrices per train/test split.
+
+Fitting the ``ColumnTransformer`` and transforming a fold is identical work
+for every model fitted on that fold: each CV fold, the holdout split, every
+tuning candidate and every rerun of ``04_build_model.py``. ``FoldCache``
+does it once per ``(preprocessor settings, data, train indices, test
+indices)`` (plus the scikit-learn and ``ENCODERS_VERSION`` versions, so an
+upgrade never reuses matrices from older code), keeps the result in memory
+and, when given a directory, on disk:
+
+    <directory>/<key>/pre.joblib         fitted preprocessor
+    <directory>/<key>/X_train.npy ...    dense matrices, or
+    <directory>/<key>/X_train.data.npy   CSR components of sparse ones
+                      X_train.indices.npy, X_train.indptr.npy, X_train.shape.npy
+
+Arrays are loaded with ``mmap_mode="r"``, so a warm cache costs a few page
+faults instead of a refit, and joblib hands the memory maps to worker
+processes by file name rather than copying them. Past ``max_bytes`` on disk
+the least recently used entries are deleted.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import time
+import warnings
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import sklearn
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import mean_absolute_error, r2_score
+
+from encoders import ENCODERS_VERSION
+from instrumentation import peak_rss_mb
+
+FOLD_CACHE_DIR = Path("results/cache/folds")
+FOLD_CACHE_MAX_BYTES = 2 * 1024**3
+# Bump when the stored layout changes.
+FOLD_CACHE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class FoldData:
+    """A fitted preprocessor with its transformed train and test matrices."""
+
+    pre: Any
+    X_train: Any
+    y_train: np.ndarray
+    X_test: Any
+    y_test: np.ndarray
+
+
+def _save_matrix(directory: Path, name: str, matrix: Any) -> None:
+    if sp.issparse(matrix):
+        csr = sp.csr_matrix(matrix)
+        np.save(directory / f"{name}.data.npy", csr.data)
+        np.save(directory / f"{name}.indices.npy", csr.indices)
+        np.save(directory / f"{name}.indptr.npy", csr.indptr)
+        np.save(directory / f"{name}.shape.npy", np.array(csr.shape))
+    else:
+        np.save(directory / f"{name}.npy", np.asarray(matrix))
+
+
+def _load_matrix(directory: Path, name: str) -> Any:
+    dense = directory / f"{name}.npy"
+    if dense.exists():
+        return np.load(dense, mmap_mode="r")
+    parts = [
+        np.load(directory / f"{name}.{part}.npy", mmap_mode="r")
+        for part in ("data", "indices", "indptr")
+    ]
+    shape = tuple(np.load(directory / f"{name}.shape.npy"))
+    return sp.csr_matrix(tuple(parts), shape=shape, copy=False)
+
+
+class FoldCache:
+    """Memory (and optionally disk) cache of ``FoldData`` per split."""
+
+    def __init__(
+        self, directory: Path | None = None, *, max_bytes: int = FOLD_CACHE_MAX_BYTES
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._memory: dict[str, FoldData] = {}
+        # (id(X), id(y)) -> weak references to X and y, and their hash.
+        self._data_keys: dict[
+            tuple[int, int], tuple[weakref.ref[pd.DataFrame], weakref.ref[pd.Series], str]
+        ] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _data_key(self, X: pd.DataFrame, y: pd.Series) -> str:
+        # Hashing the frame is the expensive part of a lookup; do it once per object.
+        # Weak references keep the cache from holding frames alive, and the identity
+        # check guards against a new object reusing a collected one's id.
+        ids = (id(X), id(y))
+        known = self._data_keys.get(ids)
+        if known is not None and known[0]() is X and known[1]() is y:
+            return known[2]
+        self._data_keys = {
+            key: refs
+            for key, refs in self._data_keys.items()
+            if refs[0]() is not None and refs[1]() is not None
+        }
+        key = joblib.hash((X, y))
+        self._data_keys[ids] = (weakref.ref(X), weakref.ref(y), key)
+        return key
+
+    def key(
+        self, pre: Any, X: pd.DataFrame, y: pd.Series, train: np.ndarray, test: np.ndarray
+    ) -> str:
+        """Return the cache key for fitting ``pre`` on ``train`` and transforming ``test``."""
+
+        return joblib.hash(
+            (
+                FOLD_CACHE_VERSION,
+                ENCODERS_VERSION,
+                sklearn.__version__,
+                joblib.hash(clone(pre)),
+                self._data_key(X, y),
+                np.asarray(train),
+                np.asarray(test),
+            )
+        )
+
+    def clear(self) -> None:
+        """Forget every entry, in memory and on disk."""
+
+        self._memory.clear()
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def get(
+        self, pre: Any, X: pd.DataFrame, y: pd.Series, train: np.ndarray, test: np.ndarray
+    ) -> FoldData:
+        """Return the fitted ``pre`` and transformed matrices for one split.
+
+        ``pre`` is cloned before fitting, so the caller's object is untouched.
+        """
+
+        key = self.key(pre, X, y, train, test)
+        if key in self._memory:
+            self.hits += 1
+            return self._memory[key]
+
+        fold, fitted = self._load_or_fit(key, pre, X, y, train, test)
+        if fitted:
+            self.misses += 1
+        else:
+            self.hits += 1
+        self._memory[key] = fold
+        return fold
+
+    def get_many(
+        self,
+        requests: list[tuple[Any, pd.DataFrame, pd.Series, np.ndarray, np.ndarray]],
+        *,
+        n_jobs: int | None = None,
+    ) -> list[FoldData]:
+        """Return ``get(*request)`` for each request, preparing the misses in parallel.
+
+        Each distinct split that is not in memory is read from disk or fitted
+        once, in a worker process, so a batch never fits the same split twice.
+        """
+
+        keys = [self.key(*request) for request in requests]
+        pending = {key: request for key, request in zip(keys, requests) if key not in self._memory}
+        # Workers get an empty cache on the same directory rather than this one's memory.
+        worker = FoldCache(self.directory, max_bytes=self.max_bytes)
+        loaded = Parallel(n_jobs=n_jobs)(
+            delayed(worker._load_or_fit)(key, *request) for key, request in pending.items()
+        )
+        for key, (fold, fitted) in zip(pending, loaded):
+            self._memory[key] = fold
+            self.misses += fitted
+        self.hits += len(keys) - sum(fitted for _, fitted in loaded)
+        return [self._memory[key] for key in keys]
+
+    def _load_or_fit(
+        self,
+        key: str,
+        pre: Any,
+        X: pd.DataFrame,
+        y: pd.Series,
+        train: np.ndarray,
+        test: np.ndarray,
+    ) -> tuple[FoldData, bool]:
+        """Read entry ``key`` from disk, or fit and store it; say whether it was fitted."""
+
+        fold = self._read(key)
+        if fold is not None:
+            return fold, False
+        fitted = clone(pre)
+        y_values = np.asarray(y, dtype="float64")
+        X_train = fitted.fit_transform(X.iloc[train], y_values[train])
+        X_test = fitted.transform(X.iloc[test])
+        fold = FoldData(fitted, X_train, y_values[train], X_test, y_values[test])
+        self._write(key, fold)
+        return fold, True
+
+    def _read(self, key: str) -> FoldData | None:
+        if self.directory is None or not (self.directory / key).is_dir():
+            return None
+        entry = self.directory / key
+        os.utime(entry)  # Mark as recently used for eviction.
+        return FoldData(
+            pre=joblib.load(entry / "pre.joblib"),
+            X_train=_load_matrix(entry, "X_train"),
+            y_train=np.load(entry / "y_train.npy", mmap_mode="r"),
+            X_test=_load_matrix(entry, "X_test"),
+            y_test=np.load(entry / "y_test.npy", mmap_mode="r"),
+        )
+
+    def _write(self, key: str, fold: FoldData) -> None:
+        if self.directory is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=self.directory, prefix=".tmp-"))
+        try:
+            joblib.dump(fold.pre, staging / "pre.joblib")
+            _save_matrix(staging, "X_train", fold.X_train)
+            _save_matrix(staging, "X_test", fold.X_test)
+            np.save(staging / "y_train.npy", fold.y_train)
+            np.save(staging / "y_test.npy", fold.y_test)
+            os.replace(staging, self.directory / key)
+        except OSError as exc:
+            shutil.rmtree(staging, ignore_errors=True)
+            # Another process storing the same entry first is expected: theirs is
+            # identical. Anything else (a full disk, permissions) is worth a warning.
+            if not (self.directory / key).is_dir():
+                warnings.warn(
+                    f"Could not store fold cache entry {key}: {exc}", RuntimeWarning, stacklevel=2
+                )
+        self._evict(keep=key)
+
+    def _evict(self, keep: str) -> None:
+        """Delete the least recently used entries until the cache fits ``max_bytes``."""
+
+        assert self.directory is not None
+        entries = []
+        for entry in self.directory.iterdir():
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            try:
+                size = sum(path.stat().st_size for path in entry.iterdir())
+                entries.append((entry.stat().st_mtime, size, entry))
+            except FileNotFoundError:
+                continue  # Evicted by another process meanwhile.
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if entry.name == keep:
+                continue
+            # Open memory maps of the entry stay valid after the files are unlinked.
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+
+def fit_and_score(
+    model: Any, X_train: Any, y_train: np.ndarray, X_test: Any, y_test: np.ndarray
+) -> dict[str, Any]:
+    """Fit ``model`` on one preprocessed split and return R², MAE and timings.
+
+    ``cpu_seconds`` and ``peak_rss_mb`` describe the process that ran the fit,
+    so callers can report them for work done in a worker.
+    """
+
+    cpu = time.process_time()
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    predictions = model.predict(X_test)
+    score_seconds = time.perf_counter() - start
+    return {
+        "r2": float(r2_score(y_test, predictions)),
+        "mae": float(mean_absolute_error(y_test, predictions)),
+        "fit_seconds": fit_seconds,
+        "score_seconds": score_seconds,
+        "cpu_seconds": time.process_time() - cpu,
+        "peak_rss_mb": peak_rss_mb(),
+    }
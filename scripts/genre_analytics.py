@@ -0,0 +1,186 @@
+"""Genre counts, shares and co-occurrence over every genre of every movie.
+
+``GenreAnalytics`` explodes ``genres_list`` once into a movie × genre
+incidence structure in CSR form (``indptr``/``indices`` arrays, genres
+integer coded by overall frequency) and integer codes each grouping
+dimension once. Every view is then a single vectorised pass over the
+incidence entries: counts are a ``bincount`` over ``group × genre`` keys and
+co-occurrence is one sparse product, so adding a view (by country, by budget
+tier, by decade and language, ...) never regroups the frame.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+DIMENSIONS = ("decade", "primary_country", "primary_language", "budget_category")
+NORMALIZE = ("tags", "movies")
+
+
+def _as_list(value: object) -> list:
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return list(value)
+    return []
+
+
+def _dimension_codes(values: pd.Series) -> tuple[np.ndarray, pd.Index]:
+    """Return integer codes (``-1`` for missing) and the labels they index."""
+
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype("category")
+    return values.cat.codes.to_numpy(dtype=np.int64), values.cat.categories
+
+
+class GenreAnalytics:
+    """Movie × genre incidence with integer-coded grouping dimensions.
+
+    Args:
+        genres_lists: One list of genre names per movie.
+        dimensions: Grouping columns aligned with ``genres_lists``.
+    """
+
+    def __init__(self, genres_lists: Iterable[object], dimensions: pd.DataFrame) -> None:
+        lists = [_as_list(value) for value in genres_lists]
+        if len(lists) != len(dimensions):
+            raise ValueError(
+                f"Got {len(lists)} genre lists for {len(dimensions)} rows of dimensions"
+            )
+        lengths = np.fromiter(map(len, lists), dtype=np.int64, count=len(lists))
+        flat = np.asarray(list(chain.from_iterable(lists)), dtype=object)
+        codes, uniques = pd.factorize(flat)
+        frequency = np.bincount(codes, minlength=len(uniques))
+        order = np.lexsort((uniques.astype(str), -frequency))
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+
+        self.genres = pd.Index(uniques[order].astype(str), name="genre")
+        self.indptr = np.concatenate([[0], np.cumsum(lengths)])
+        self.indices = rank[codes].astype(np.int32)
+        self._entry_movie = np.repeat(np.arange(len(lists)), lengths)
+        self._dimensions = {
+            str(name): _dimension_codes(dimensions[name]) for name in dimensions.columns
+        }
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, dimensions: Sequence[str] = DIMENSIONS) -> GenreAnalytics:
+        """Build the engine from a cleaned frame's ``genres_list`` and ``dimensions``."""
+
+        missing = [name for name in ("genres_list", *dimensions) if name not in df.columns]
+        if missing:
+            raise ValueError(f"Frame is missing columns: {', '.join(missing)}")
+        return cls(df["genres_list"], df[list(dimensions)])
+
+    @property
+    def n_movies(self) -> int:
+        return len(self.indptr) - 1
+
+    def matrix(self) -> sp.csr_matrix:
+        """Return the incidence as a sparse ``n_movies × n_genres`` 0/1 matrix."""
+
+        data = np.ones(len(self.indices), dtype=np.int64)
+        shape = (self.n_movies, len(self.genres))
+        return sp.csr_matrix((data, self.indices, self.indptr), shape=shape)
+
+    def _groups(self, by: Sequence[str]) -> tuple[np.ndarray, pd.Index]:
+        """Return each movie's group number (``-1`` if any key is missing) and the groups."""
+
+        if not by:
+            return np.zeros(self.n_movies, dtype=np.int64), pd.Index(["all"])
+        unknown = [name for name in by if name not in self._dimensions]
+        if unknown:
+            raise ValueError(
+                f"Unknown dimensions {unknown}; choose from {sorted(self._dimensions)}"
+            )
+        codes = [self._dimensions[name][0] for name in by]
+        labels = [self._dimensions[name][1] for name in by]
+        valid = np.logical_and.reduce([code >= 0 for code in codes])
+        sizes = tuple(max(len(level), 1) for level in labels)
+        keys = np.ravel_multi_index([code[valid] for code in codes], sizes)
+        observed, inverse = np.unique(keys, return_inverse=True)
+
+        groups = np.full(self.n_movies, -1, dtype=np.int64)
+        groups[valid] = inverse
+        positions = np.unravel_index(observed, sizes)
+        index = pd.MultiIndex.from_arrays(
+            [level.take(position) for level, position in zip(labels, positions)],
+            names=list(by),
+        )
+        return groups, index.get_level_values(0) if len(by) == 1 else index
+
+    def _entries(self, by: Sequence[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray, pd.Index]:
+        """Return the group, movie and genre of every incidence entry in a known group."""
+
+        groups, index = self._groups(by)
+        entry_groups = groups[self._entry_movie]
+        keep = entry_groups >= 0
+        return entry_groups[keep], self._entry_movie[keep], self.indices[keep], index
+
+    def movie_counts(self, by: Sequence[str] = ()) -> pd.Series:
+        """Return the number of movies in each group."""
+
+        groups, index = self._groups(list(by))
+        counts = np.bincount(groups[groups >= 0], minlength=len(index))
+        return pd.Series(counts, index=index, name="movies")
+
+    def counts(self, by: Sequence[str] = ()) -> pd.DataFrame:
+        """Return a group × genre table of how many movies carry each genre."""
+
+        entry_groups, _, entry_genres, index = self._entries(list(by))
+        n_genres = len(self.genres)
+        counts = np.bincount(
+            entry_groups * n_genres + entry_genres, minlength=len(index) * n_genres
+        )
+        return pd.DataFrame(counts.reshape(len(index), n_genres), index=index, columns=self.genres)
+
+    def shares(self, by: Sequence[str] = (), *, normalize: str = "tags") -> pd.DataFrame:
+        """Return genre shares within each group.
+
+        ``normalize="tags"`` divides by the group's genre tags, so each row sums
+        to one; ``"movies"`` divides by the group's movies, giving the fraction
+        of its movies that carry each genre.
+        """
+
+        if normalize not in NORMALIZE:
+            raise ValueError(f"normalize must be one of {NORMALIZE}, got {normalize!r}")
+        counts = self.counts(by)
+        if normalize == "tags":
+            totals = counts.sum(axis=1).to_numpy()
+        else:
+            totals = self.movie_counts(by).to_numpy()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            shares = counts.to_numpy() / totals[:, None]
+        return pd.DataFrame(np.nan_to_num(shares), index=counts.index, columns=counts.columns)
+
+    def cooccurrence(self, by: Sequence[str] = ()) -> pd.DataFrame:
+        """Return how many movies carry each pair of genres, per group.
+
+        Without ``by`` this is a genre × genre table whose diagonal holds the
+        genre counts. With ``by`` the rows gain the group levels in front of
+        ``genre``. Every group is computed in one sparse product.
+        """
+
+        by = list(by)
+        entry_groups, entry_movies, entry_genres, index = self._entries(by)
+        n_genres = len(self.genres)
+        rows = entry_groups * n_genres + entry_genres
+        stacked = sp.csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (rows, entry_movies)),
+            shape=(len(index) * n_genres, self.n_movies),
+        )
+        pairs = (stacked @ self.matrix()).toarray()
+        if by:
+            group_rows = index.repeat(n_genres)
+            if isinstance(group_rows, pd.MultiIndex):
+                arrays = [group_rows.get_level_values(level) for level in range(len(by))]
+            else:
+                arrays = [group_rows]
+            genre_rows = np.tile(self.genres.to_numpy(), len(index))
+            row_index = pd.MultiIndex.from_arrays([*arrays, genre_rows], names=[*by, "genre"])
+        else:
+            row_index = self.genres
+        return pd.DataFrame(pairs, index=row_index, columns=self.genres)
@@ -0,0 +1,282 @@
+"""Per-step timing, CPU, memory and row-count instrumentation for the pipeline scripts.
+
+A script decorates its ``main`` with ``instrumented(<script name>)`` and wraps
+named sub-steps in ``step``::
+
+    with step("read_csv") as record:
+        raw = pd.read_csv(path)
+        record.rows = len(raw)
+
+Every finished step is appended as one JSON line to ``METRICS_FILE`` (or the
+path in ``$MOVIE_METRICS_FILE``) with the run id (``<script>-<time>-<pid>``),
+wall and CPU seconds, the process's peak RSS so far and the rows it handled, and a
+summary table of the run is printed when ``main`` returns. The run is
+handed to child processes through the environment, so steps inside a
+process pool land in the same log. Outside an instrumented run ``step``
+only measures.
+
+The summary is built from the steps the script recorded in memory plus the
+lines its worker processes appended during the run, so it never re-reads
+the log's history. A log larger than ``MAX_METRICS_BYTES`` is rotated to
+``<name>.1`` when the next run starts, replacing the previous rotation.
+
+Set ``MOVIE_PROFILE=1`` to also sample the stacks of every thread of the
+script every ``PROFILE_INTERVAL`` seconds; they are written in the collapsed
+format read by ``flamegraph.pl`` and speedscope to
+``<metrics dir>/<run id>.folded``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Generator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+METRICS_FILE = Path("results/metrics/steps.jsonl")
+METRICS_ENV = "MOVIE_METRICS_FILE"
+RUN_ENV = "MOVIE_METRICS_RUN"
+PROFILE_ENV = "MOVIE_PROFILE"
+PROFILE_INTERVAL = 0.005
+MAX_METRICS_BYTES = 10 * 1024 * 1024
+
+# Steps logged by this process, per instrumented run id.
+_recorded: dict[str, list[dict[str, Any]]] = {}
+
+
+def peak_rss_mb() -> float | None:
+    """Return this process's peak resident set size in MiB (``None`` if unknown)."""
+
+    try:
+        # ``ru_maxrss`` survives fork and exec on Linux, so a script started by a
+        # large parent would report the parent's peak; ``VmHWM`` is per process.
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak / (1 << 20 if sys.platform == "darwin" else 1 << 10)
+
+
+@dataclass
+class StepRecord:
+    """Measurements for one execution of a named step."""
+
+    step: str
+    rows: int | None = None
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_mb: float | None = None
+    pid: int = field(default_factory=os.getpid)
+
+
+def _active_run() -> tuple[str, Path] | None:
+    run = os.environ.get(RUN_ENV)
+    path = os.environ.get(METRICS_ENV)
+    return (run, Path(path)) if run and path else None
+
+
+def emit(record: StepRecord) -> None:
+    """Append ``record`` to the active run's log (no-op outside a run).
+
+    Use this for steps measured elsewhere, e.g. in a worker process.
+    """
+
+    active = _active_run()
+    if active is None:
+        return
+    run, path = active
+    payload = {"run": run, "time": time.time(), **asdict(record)}
+    line = json.dumps(payload) + "\n"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # One O_APPEND write per line keeps lines from concurrent processes whole.
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        os.write(fd, line.encode("utf-8"))
+    finally:
+        os.close(fd)
+    if run in _recorded:
+        _recorded[run].append(payload)
+
+
+@contextmanager
+def step(name: str, *, rows: int | None = None) -> Generator[StepRecord]:
+    """Measure the enclosed block as step ``name``; set ``rows`` on the record if known later."""
+
+    record = StepRecord(step=name, rows=rows)
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        yield record
+    finally:
+        record.wall_seconds = time.perf_counter() - wall
+        record.cpu_seconds = time.process_time() - cpu
+        record.peak_rss_mb = peak_rss_mb()
+        emit(record)
+
+
+def read_steps(path: Path, run: str | None = None, *, start: int = 0) -> list[dict[str, Any]]:
+    """Return the logged steps in ``path``, optionally only those of ``run``.
+
+    ``start`` is a byte offset to read from, e.g. the log's size when a run began.
+    """
+
+    if not path.exists():
+        return []
+    with path.open("rb") as handle:
+        handle.seek(start)
+        text = handle.read().decode("utf-8")
+    records = []
+    for line in text.splitlines():
+        if line.strip():
+            record = json.loads(line)
+            if run is None or record["run"] == run:
+                records.append(record)
+    return records
+
+
+def summarize(records: list[dict[str, Any]]) -> pd.DataFrame:
+    """Total each step over its executions (e.g. one per chunk or worker).
+
+    Returns:
+        One row per step in first-seen order with ``calls``, ``rows``,
+        ``wall_s``, ``cpu_s`` and the largest ``peak_rss_mb``.
+    """
+
+    if not records:
+        return pd.DataFrame(columns=["calls", "rows", "wall_s", "cpu_s", "peak_rss_mb"])
+    frame = pd.DataFrame(records)
+    summary = frame.groupby("step", sort=False).agg(
+        calls=("step", "size"),
+        rows=("rows", lambda rows: rows.sum(min_count=1)),
+        wall_s=("wall_seconds", "sum"),
+        cpu_s=("cpu_seconds", "sum"),
+        peak_rss_mb=("peak_rss_mb", "max"),
+    )
+    summary["rows"] = summary["rows"].astype("Int64")
+    return summary
+
+
+class SamplingProfiler:
+    """Count the call stacks of every other thread at a fixed interval."""
+
+    def __init__(self, interval: float = PROFILE_INTERVAL) -> None:
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def start(self) -> SamplingProfiler:
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                frames = []
+                current: Any = frame
+                while current is not None:
+                    code = current.f_code
+                    frames.append(
+                        f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+                    )
+                    current = current.f_back
+                frames.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(frames))] += 1
+
+    def write(self, path: Path) -> None:
+        """Write the samples as ``frame;frame;... count`` lines."""
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lines = [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def rotate_log(path: Path, max_bytes: int | None = None) -> bool:
+    """Move ``path`` to ``<name>.1`` if it is larger than ``max_bytes``; return whether it moved.
+
+    ``max_bytes`` defaults to ``MAX_METRICS_BYTES``.
+    """
+
+    limit = MAX_METRICS_BYTES if max_bytes is None else max_bytes
+    try:
+        if path.stat().st_size <= limit:
+            return False
+    except FileNotFoundError:
+        return False
+    os.replace(path, path.with_name(path.name + ".1"))
+    return True
+
+
+def _profiling_enabled() -> bool:
+    return os.environ.get(PROFILE_ENV, "").lower() not in {"", "0", "false", "no"}
+
+
+@contextmanager
+def instrumented(script: str, *, path: Path | None = None) -> Generator[str]:
+    """Log the steps of one script run and print their summary at the end.
+
+    Usable as a decorator on a script's ``main``. Yields the run id.
+    """
+
+    path = (path or Path(os.environ.get(METRICS_ENV) or METRICS_FILE)).resolve()
+    run = f"{script}-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+    previous = {key: os.environ.get(key) for key in (METRICS_ENV, RUN_ENV)}
+    rotate_log(path)
+    start = path.stat().st_size if path.exists() else 0
+    _recorded[run] = []
+    os.environ[METRICS_ENV] = str(path)
+    os.environ[RUN_ENV] = run
+    profiler = SamplingProfiler().start() if _profiling_enabled() else None
+    try:
+        with step("total"):
+            yield run
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        if profiler is not None:
+            profiler.stop()
+            profile_path = path.parent / f"{run}.folded"
+            profiler.write(profile_path)
+            print(f"Sampled {sum(profiler.stacks.values())} stack(s) into {profile_path}")
+        own = _recorded.pop(run, [])
+        if path.exists() and path.stat().st_size < start:
+            start = 0  # rotated by a concurrent run
+        workers = [
+            record for record in read_steps(path, run, start=start) if record["pid"] != os.getpid()
+        ]
+        records = sorted([*own, *workers], key=lambda record: record["time"])
+        summary = summarize(records)
+        print(f"\nStep timings ({run}, logged to {path}):")
+        with pd.option_context("display.width", 120, "display.float_format", "{:.3f}".format):
+            print(summary.to_string())
@@ -0,0 +1,155 @@
+"""Versioned on-disk artifact for the fitted vote-average model.
+
+``04_build_model.py`` saves the fitted pipeline (preprocessing plus forest)
+to ``results/model/`` next to a ``metadata.json`` that records the artifact
+format version, the feature lists the pipeline expects, a fingerprint of the
+training data and the evaluation metrics. The pipeline is stored as an
+uncompressed joblib file so its large numpy arrays (the tree node tables)
+can be memory-mapped on load instead of copied, which keeps cold starts
+cheap for the scoring command.
+
+Every save writes both files into a fresh ``versions/<name>/`` directory and
+then atomically replaces the one-line ``CURRENT`` pointer file with that
+name. A reader resolves the pointer once and loads both files from the same
+version, so it can never pair a model with another save's metadata. The
+newest ``KEEP_VERSIONS`` versions are kept.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+import joblib
+
+ARTIFACT_VERSION = 1
+MODEL_DIR = Path("results/model")
+MODEL_FILE = "model.joblib"
+METADATA_FILE = "metadata.json"
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+KEEP_VERSIONS = 3
+
+
+@dataclass(frozen=True)
+class ModelMetadata:
+    """Everything needed to check that a saved model fits the data it scores."""
+
+    num_features: list[str]
+    cat_features: list[str]
+    target: str
+    data_path: str
+    data_sha256: str
+    training_rows: int
+    metrics: dict[str, float] = field(default_factory=dict)
+    encodings: dict[str, str] = field(default_factory=dict)
+    engine: str = "forest"
+    version: int = ARTIFACT_VERSION
+    sklearn_version: str = field(default_factory=lambda: metadata.version("scikit-learn"))
+    created_at: str = field(
+        default_factory=lambda: time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    )
+
+    @property
+    def features(self) -> list[str]:
+        """All input columns, in the order the pipeline was fitted on."""
+
+        return [*self.num_features, *self.cat_features]
+
+
+def data_fingerprint(path: Path) -> str:
+    """Return the SHA-256 of the file the model was trained on."""
+
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def artifact_path(directory: Path = MODEL_DIR) -> Path:
+    """Return the directory holding the current model and metadata files.
+
+    Artifacts saved before versioning kept both files in ``directory`` itself.
+    """
+
+    pointer = directory / CURRENT_FILE
+    if pointer.exists():
+        return directory / VERSIONS_DIR / pointer.read_text(encoding="utf-8").strip()
+    return directory
+
+
+def _prune_versions(versions: Path, current: str, keep: int) -> None:
+    """Remove all but the ``keep`` newest versions, never the current one."""
+
+    candidates = sorted(
+        (path for path in versions.iterdir() if path.is_dir()),
+        key=lambda path: (path.name == current, path.stat().st_mtime_ns),
+        reverse=True,
+    )
+    for path in candidates[max(keep, 1) :]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def save_model_artifact(pipeline: Any, meta: ModelMetadata, directory: Path = MODEL_DIR) -> Path:
+    """Write ``pipeline`` and ``meta`` as a new version in ``directory``; return the model path.
+
+    The version becomes current only once both files are complete, by
+    atomically replacing the ``CURRENT`` pointer.
+    """
+
+    versions = directory / VERSIONS_DIR
+    versions.mkdir(parents=True, exist_ok=True)
+    target = Path(tempfile.mkdtemp(prefix=time.strftime("%Y%m%dT%H%M%S-"), dir=versions))
+    joblib.dump(pipeline, target / MODEL_FILE)
+    (target / METADATA_FILE).write_text(json.dumps(asdict(meta), indent=2), encoding="utf-8")
+
+    pointer = directory / CURRENT_FILE
+    tmp_pointer = pointer.with_name(f".{CURRENT_FILE}.{os.getpid()}.tmp")
+    tmp_pointer.write_text(target.name + "\n", encoding="utf-8")
+    os.replace(tmp_pointer, pointer)
+    _prune_versions(versions, target.name, KEEP_VERSIONS)
+    return target / MODEL_FILE
+
+
+def load_model_metadata(directory: Path = MODEL_DIR) -> ModelMetadata:
+    """Read and validate the metadata of a saved model."""
+
+    metadata_path = artifact_path(directory) / METADATA_FILE
+    if not metadata_path.exists():
+        raise FileNotFoundError(f"No model artifact in {directory}")
+    data = json.loads(metadata_path.read_text(encoding="utf-8"))
+    if data.get("version") != ARTIFACT_VERSION:
+        raise ValueError(
+            f"Model artifact version {data.get('version')} is not supported "
+            f"(expected {ARTIFACT_VERSION}); re-run 04_build_model.py"
+        )
+    return ModelMetadata(**data)
+
+
+def load_model_artifact(
+    directory: Path = MODEL_DIR, *, mmap: bool = True
+) -> tuple[Any, ModelMetadata]:
+    """Load a saved pipeline and its metadata.
+
+    Args:
+        directory: Artifact directory written by ``save_model_artifact``.
+        mmap: Memory-map the pipeline's numpy arrays read-only instead of
+            reading them into memory.
+
+    Returns:
+        The fitted pipeline and its ``ModelMetadata``.
+    """
+
+    version = artifact_path(directory)
+    meta = load_model_metadata(version)
+    pipeline = joblib.load(version / MODEL_FILE, mmap_mode="r" if mmap else None)
+    return pipeline, meta
@@ -0,0 +1,427 @@
+"""Materialised aggregate cube over the cleaned movie dataset.
+
+``MovieCube.build`` makes one pass over the cleaned rows and keeps, for
+every observed combination of ``CUBE_DIMENSIONS`` (a *cell*), the row count
+and the count, sum and sum of squares of each measure, plus a quantile
+sketch (``quantile_sketch``) of ROI, profit and budget. Any roll-up to a
+subset of the dimensions, optionally filtered, then aggregates the few
+thousand cells instead of the rows: means, standard deviations and shares
+are exact, quantiles are within the sketch's relative accuracy.
+
+The cube is saved under ``results/cube/`` next to the fingerprint of the
+cleaned file it was built from, so the analysis steps share one build.
+
+Cubes are mergeable: ``stream_cube`` builds one chunk by chunk, and cubes of
+different shards of the data (built on different machines with ``--save``)
+combine with ``merge_cubes`` into the cube of all of them.
+
+Ad-hoc queries:
+    uv run python scripts/movie_cube.py --by decade primary_genre --measure roi
+    uv run python scripts/movie_cube.py --by primary_language --where budget_category=high
+    uv run python scripts/movie_cube.py --data shard-3.csv --chunk-size 50000 --save shard-3.cube
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Iterable, Mapping, Sequence
+from pathlib import Path
+from typing import Any
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from movie_data import clean_data_path, dataset_columns, iter_clean_batches, load_clean_columns
+from quantile_sketch import DEFAULT_ACCURACY, grouped_quantiles, sketch_keys
+
+CUBE_VERSION = 2
+CUBE_DIR = Path("results/cube")
+CUBE_FILE = "cube.joblib"
+CUBE_DIMENSIONS = (
+    "decade",
+    "primary_genre",
+    "budget_category",
+    "primary_language",
+    "runtime_bucket",
+)
+ROI_CAP = (-1, 10)
+# Measure -> the cleaned column it is computed from. Only the count of ``id``
+# is used: the number of movies with an id, as the budget summary counts them.
+CUBE_MEASURES = {
+    "roi": "roi",
+    "roi_capped": "roi",
+    "profit": "profit",
+    "budget_millions": "budget_millions",
+    "is_profitable": "is_profitable",
+    "id": "id",
+}
+SKETCHED_MEASURES = ("roi", "profit", "budget_millions")
+
+
+def _measure(df: pd.DataFrame, name: str) -> np.ndarray:
+    """Return a measure as floats, with infinities treated as missing."""
+
+    values = pd.to_numeric(df[CUBE_MEASURES[name]], errors="coerce").to_numpy(dtype="float64")
+    values = np.where(np.isfinite(values), values, np.nan)
+    if name == "roi_capped":
+        values = np.clip(values, *ROI_CAP)
+    return values
+
+
+def _as_list(value: object) -> list:
+    return list(value) if isinstance(value, (list, tuple, set, pd.Index)) else [value]
+
+
+class MovieCube:
+    """Per-cell counts, sums, sums of squares and quantile sketches.
+
+    Args:
+        cells: One row per cell: the dimension columns, ``count`` and
+            ``<measure>_count``/``_sum``/``_sumsq`` columns.
+        sketches: ``cell``, ``measure``, ``key`` and ``count`` columns; ``cell``
+            is the row position in ``cells``.
+        dimensions: The dimension columns of ``cells``.
+        measures: The measures summarised in ``cells``.
+        accuracy: Relative accuracy of the sketches.
+    """
+
+    def __init__(
+        self,
+        cells: pd.DataFrame,
+        sketches: pd.DataFrame,
+        *,
+        dimensions: Sequence[str],
+        measures: Sequence[str],
+        accuracy: float = DEFAULT_ACCURACY,
+    ) -> None:
+        self.cells = cells
+        self.sketches = sketches
+        self.dimensions = tuple(dimensions)
+        self.measures = tuple(measures)
+        self.accuracy = accuracy
+
+    @classmethod
+    def build(
+        cls,
+        df: pd.DataFrame,
+        *,
+        dimensions: Sequence[str] = CUBE_DIMENSIONS,
+        measures: Sequence[str] = tuple(CUBE_MEASURES),
+        accuracy: float = DEFAULT_ACCURACY,
+    ) -> MovieCube:
+        """Aggregate ``df`` into a cube in one grouped pass over its rows.
+
+        Missing dimension values form their own cells (labelled ``NaN``).
+        """
+
+        unknown = [name for name in measures if name not in CUBE_MEASURES]
+        if unknown:
+            raise ValueError(f"Unknown measures {unknown}; choose from {list(CUBE_MEASURES)}")
+        frame = pd.DataFrame(
+            {
+                name: df[name]
+                if isinstance(df[name].dtype, pd.CategoricalDtype)
+                else df[name].astype("category")
+                for name in dimensions
+            }
+        )
+        frame["count"] = 1
+        values = {name: _measure(df, name) for name in measures}
+        for name, column in values.items():
+            present = ~np.isnan(column)
+            frame[f"{name}_count"] = present.astype(np.int64)
+            frame[f"{name}_sum"] = np.where(present, column, 0.0)
+            frame[f"{name}_sumsq"] = np.where(present, column * column, 0.0)
+
+        grouped = frame.groupby(list(dimensions), observed=True, dropna=False, sort=True)
+        cells = grouped.sum().reset_index()
+        cell = grouped.ngroup().to_numpy()
+
+        parts = []
+        for name in SKETCHED_MEASURES:
+            if name not in values:
+                continue
+            present = ~np.isnan(values[name])
+            keys = sketch_keys(values[name][present], accuracy)
+            pairs = pd.DataFrame({"cell": cell[present], "key": keys})
+            counted = pairs.value_counts(sort=False).sort_index().reset_index(name="count")
+            counted.insert(1, "measure", name)
+            parts.append(counted)
+        columns = ["cell", "measure", "key", "count"]
+        sketches = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=columns)
+        return cls(
+            cells, sketches[columns], dimensions=dimensions, measures=measures, accuracy=accuracy
+        )
+
+    def merge(self, other: MovieCube) -> MovieCube:
+        """Return the cube of both cubes' rows (for example two chunks of a file)."""
+
+        if (self.dimensions, self.measures, self.accuracy) != (
+            other.dimensions,
+            other.measures,
+            other.accuracy,
+        ):
+            raise ValueError("Only cubes with the same dimensions, measures and accuracy merge")
+        dims = list(self.dimensions)
+        both = pd.concat([self.cells, other.cells], ignore_index=True)
+        for name in dims:
+            both[name] = both[name].astype("category")
+        grouped = both.groupby(dims, observed=True, dropna=False, sort=True)
+        cells = grouped.sum().reset_index()
+        remap = grouped.ngroup().to_numpy()
+        sketches = pd.concat(
+            [
+                self.sketches.assign(cell=remap[self.sketches["cell"].to_numpy()]),
+                other.sketches.assign(
+                    cell=remap[len(self.cells) + other.sketches["cell"].to_numpy()]
+                ),
+            ],
+            ignore_index=True,
+        )
+        sketches = sketches.groupby(["cell", "measure", "key"], sort=True)["count"].sum()
+        return MovieCube(
+            cells,
+            sketches.reset_index(),
+            dimensions=self.dimensions,
+            measures=self.measures,
+            accuracy=self.accuracy,
+        )
+
+    def _select(
+        self, by: Sequence[str], where: Mapping[str, Any] | None
+    ) -> tuple[pd.DataFrame, np.ndarray, pd.Index]:
+        """Return the matching cells, their group numbers and the group labels."""
+
+        unknown = [name for name in (*by, *(where or {})) if name not in self.dimensions]
+        if unknown:
+            raise ValueError(f"Unknown dimensions {unknown}; choose from {list(self.dimensions)}")
+        mask = np.ones(len(self.cells), dtype=bool)
+        for name, wanted in (where or {}).items():
+            mask &= self.cells[name].isin(_as_list(wanted)).to_numpy()
+        cells = self.cells[mask]
+        if not by:
+            return cells, np.zeros(len(cells), dtype=np.int64), pd.Index(["all"])
+        grouped = cells.groupby(list(by), observed=True, dropna=False, sort=True)
+        return cells, grouped.ngroup().to_numpy(), grouped.size().index
+
+    def rollup(
+        self, by: Sequence[str] = (), *, where: Mapping[str, Any] | None = None
+    ) -> pd.DataFrame:
+        """Return the cell totals rolled up to ``by``, keeping cells matching ``where``.
+
+        ``where`` maps a dimension to one value or a list of values.
+        """
+
+        cells, groups, index = self._select(list(by), where)
+        totals = cells.drop(columns=list(self.dimensions)).groupby(groups).sum()
+        totals = totals.reindex(range(len(index)), fill_value=0)
+        totals.index = index
+        return totals
+
+    def quantiles(
+        self,
+        measure: str,
+        by: Sequence[str] = (),
+        *,
+        q: Sequence[float] = (0.5,),
+        where: Mapping[str, Any] | None = None,
+    ) -> pd.DataFrame:
+        """Return quantiles of a sketched measure per group, merged from the cell sketches."""
+
+        if measure not in SKETCHED_MEASURES:
+            raise ValueError(f"Quantiles are kept for {list(SKETCHED_MEASURES)}, not {measure!r}")
+        cells, groups, index = self._select(list(by), where)
+        group_of_cell = np.full(len(self.cells), -1, dtype=np.int64)
+        group_of_cell[self.cells.index.get_indexer(cells.index)] = groups
+        sketch = self.sketches[self.sketches["measure"] == measure]
+        sketch_groups = group_of_cell[sketch["cell"].to_numpy()]
+        keep = sketch_groups >= 0
+        values = grouped_quantiles(
+            sketch_groups[keep],
+            sketch["key"].to_numpy()[keep],
+            sketch["count"].to_numpy()[keep],
+            len(index),
+            q,
+            self.accuracy,
+        )
+        return pd.DataFrame(values, index=index, columns=[f"q{value:g}" for value in q])
+
+    def summary(
+        self,
+        measure: str,
+        by: Sequence[str] = (),
+        *,
+        where: Mapping[str, Any] | None = None,
+    ) -> pd.DataFrame:
+        """Return ``count``, ``mean``, ``std`` (and ``median`` if sketched) of a measure."""
+
+        if measure not in self.measures:
+            raise ValueError(f"Measure {measure!r} is not in the cube {list(self.measures)}")
+        totals = self.rollup(by, where=where)
+        n = totals[f"{measure}_count"]
+        total = totals[f"{measure}_sum"]
+        mean = total / n.where(n > 0)
+        variance = (totals[f"{measure}_sumsq"] - total * mean) / (n - 1).where(n > 1)
+        result = pd.DataFrame(
+            {"count": n, "mean": mean, "std": np.sqrt(variance.clip(lower=0))},
+            index=totals.index,
+        )
+        if measure in SKETCHED_MEASURES:
+            result["median"] = self.quantiles(measure, by, where=where)["q0.5"].to_numpy()
+        return result
+
+    def save(self, path: Path, *, source: dict[str, Any] | None = None) -> None:
+        """Write the cube (and the fingerprint of its source) to ``path``."""
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump({"version": CUBE_VERSION, "source": source, "cube": self}, path)
+
+
+def source_fingerprint(path: Path, dimensions: Sequence[str], measures: Iterable[str]) -> dict:
+    """Identify a cleaned file and cube layout cheaply (path, size, mtime, layout)."""
+
+    stat = path.stat()
+    return {
+        "path": str(path.resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "dimensions": list(dimensions),
+        "measures": list(measures),
+    }
+
+
+def read_cube(path: Path) -> MovieCube:
+    """Read a cube written by ``MovieCube.save`` (for example on another machine)."""
+
+    stored = joblib.load(path)
+    if not isinstance(stored, dict) or stored.get("version") != CUBE_VERSION:
+        raise ValueError(f"{path} is not a version {CUBE_VERSION} movie cube")
+    return stored["cube"]
+
+
+def merge_cubes(cubes: Iterable[MovieCube]) -> MovieCube:
+    """Merge partial cubes, for example one per shard of the cleaned data."""
+
+    merged: MovieCube | None = None
+    for cube in cubes:
+        merged = cube if merged is None else merged.merge(cube)
+    if merged is None:
+        raise ValueError("No cubes to merge")
+    return merged
+
+
+def stream_cube(
+    path: Path,
+    *,
+    chunk_size: int,
+    dimensions: Sequence[str] = CUBE_DIMENSIONS,
+    measures: Sequence[str] = tuple(CUBE_MEASURES),
+) -> MovieCube:
+    """Build the cube of a cleaned file ``chunk_size`` rows at a time.
+
+    Only one chunk and the running cube are in memory; the result equals
+    ``MovieCube.build`` on the whole file up to floating-point summation order.
+    """
+
+    needed = [*dimensions, *sorted({CUBE_MEASURES[name] for name in measures})]
+    return merge_cubes(
+        MovieCube.build(chunk, dimensions=dimensions, measures=measures)
+        for chunk in iter_clean_batches(path, needed, batch_size=chunk_size)
+    )
+
+
+def load_cube(
+    path: Path,
+    *,
+    directory: Path | None = CUBE_DIR,
+    dimensions: Sequence[str] = CUBE_DIMENSIONS,
+    measures: Sequence[str] = tuple(CUBE_MEASURES),
+    chunk_size: int | None = None,
+) -> tuple[MovieCube, bool]:
+    """Return the cube for the cleaned file ``path``, building it if needed.
+
+    The cube saved in ``directory`` is reused while ``path`` is unchanged;
+    pass ``directory=None`` to build without saving. With ``chunk_size`` a
+    build streams the file (``stream_cube``) instead of loading it whole.
+
+    Returns:
+        The cube and whether it was built now (``False`` if it was reused).
+
+    Raises:
+        ValueError: If ``path`` lacks a column the cube needs.
+    """
+
+    needed = [*dimensions, *sorted({CUBE_MEASURES[name] for name in measures})]
+    missing = sorted(set(needed) - set(dataset_columns(path)))
+    if missing:
+        raise ValueError(f"Dataset missing required columns: {', '.join(missing)}")
+    source = source_fingerprint(path, dimensions, measures)
+    target = directory / CUBE_FILE if directory is not None else None
+    if target is not None and target.exists():
+        stored = joblib.load(target)
+        if stored.get("version") == CUBE_VERSION and stored.get("source") == source:
+            return stored["cube"], False
+
+    if chunk_size is None:
+        df, _ = load_clean_columns(path, needed)
+        cube = MovieCube.build(df, dimensions=dimensions, measures=measures)
+    else:
+        cube = stream_cube(path, chunk_size=chunk_size, dimensions=dimensions, measures=measures)
+    if target is not None:
+        cube.save(target, source=source)
+    return cube, True
+
+
+def _parse_where(items: Iterable[str]) -> dict[str, list[str]]:
+    where: dict[str, list[str]] = {}
+    for item in items:
+        name, _, value = item.partition("=")
+        if not value:
+            raise SystemExit(f"--where expects dimension=value, got {item!r}")
+        where.setdefault(name, []).append(value)
+    return where
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query the aggregate cube of the cleaned data.")
+    parser.add_argument("--by", nargs="*", default=[], choices=CUBE_DIMENSIONS)
+    parser.add_argument("--measure", default="roi", choices=list(CUBE_MEASURES))
+    parser.add_argument(
+        "--where", nargs="*", default=[], help="Filters such as budget_category=high."
+    )
+    parser.add_argument(
+        "--data", type=Path, default=None, help="Cleaned file (or shard) to aggregate."
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=None, help="Stream the data in chunks of N rows."
+    )
+    parser.add_argument(
+        "--save", type=Path, default=None, help="Write the cube here, e.g. a shard's partial."
+    )
+    args = parser.parse_args()
+
+    try:
+        data = args.data or clean_data_path()
+    except ValueError as exc:
+        raise SystemExit(f"{exc}. Or pass --data.")
+    # Only the pipeline's own cleaned file shares the cached cube.
+    directory = CUBE_DIR if args.data is None else None
+    try:
+        cube, built = load_cube(data, directory=directory, chunk_size=args.chunk_size)
+    except (FileNotFoundError, ValueError) as exc:
+        raise SystemExit(f"{exc}. Run `uv run python scripts/01_clean_data.py` first.")
+    print(f"{'Built' if built else 'Loaded'} cube of {data} with {len(cube.cells):,} cells")
+    if args.save is not None:
+        cube.save(args.save, source=source_fingerprint(data, cube.dimensions, cube.measures))
+        print(f"Saved cube: {args.save}")
+    try:
+        summary = cube.summary(args.measure, args.by, where=_parse_where(args.where))
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+    with pd.option_context("display.max_rows", 200, "display.width", 120):
+        print(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+"""Schema and storage helpers for the cleaned movie dataset.
+
+``COLUMN_SCHEMA`` describes every derived column produced by
+``01_clean_data.py``. The same schema drives the typed columnar (Parquet)
+output: list columns are stored as real ``list<string>`` columns, string
+columns are dictionary encoded, and the file is compressed. The CSV output
+is kept for the workshop and for tools that cannot read Parquet.
+"""
+
+from __future__ import annotations
+
+import ast
+import os
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+import pandas as pd
+
+from buckets import BUCKETS
+from instrumentation import step
+
+CLEAN_CSV = Path("results/movies_clean.csv")
+CLEAN_PARQUET = Path("results/movies_clean.parquet")
+OUTPUT_FORMATS = {"csv": CLEAN_CSV, "parquet": CLEAN_PARQUET}
+CLEAN_FORMAT_ENV = "MOVIE_CLEAN_FORMAT"
+PARQUET_COMPRESSION = "zstd"
+
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    """Describe a cleaned-data column and whether it should be filled."""
+
+    kind: str
+    fill: bool = True
+
+
+COLUMN_SCHEMA: list[tuple[str, ColumnSpec]] = [
+    ("id", ColumnSpec(kind="numeric", fill=False)),
+    ("title", ColumnSpec(kind="string")),
+    ("original_title", ColumnSpec(kind="string")),
+    ("status", ColumnSpec(kind="string", fill=False)),
+    ("release_date", ColumnSpec(kind="string", fill=False)),
+    ("release_year", ColumnSpec(kind="numeric", fill=False)),
+    ("decade", ColumnSpec(kind="string")),
+    ("primary_genre", ColumnSpec(kind="string")),
+    ("genre_count", ColumnSpec(kind="numeric", fill=False)),
+    ("genres_list", ColumnSpec(kind="list")),
+    ("keywords_count", ColumnSpec(kind="numeric", fill=False)),
+    ("keywords_list", ColumnSpec(kind="list")),
+    ("top_keyword", ColumnSpec(kind="string")),
+    ("director", ColumnSpec(kind="string")),
+    ("production_companies_list", ColumnSpec(kind="list")),
+    ("primary_company", ColumnSpec(kind="string")),
+    ("top_cast", ColumnSpec(kind="list")),
+    ("cast_list", ColumnSpec(kind="list")),
+    ("lead_actor", ColumnSpec(kind="string")),
+    ("supporting_actor", ColumnSpec(kind="string")),
+    ("ensemble_size", ColumnSpec(kind="numeric", fill=False)),
+    ("production_countries_list", ColumnSpec(kind="list")),
+    ("primary_country", ColumnSpec(kind="string")),
+    ("spoken_languages_list", ColumnSpec(kind="list")),
+    ("primary_language", ColumnSpec(kind="string")),
+    ("budget", ColumnSpec(kind="numeric")),
+    ("revenue", ColumnSpec(kind="numeric")),
+    ("profit", ColumnSpec(kind="numeric")),
+    ("roi", ColumnSpec(kind="numeric")),
+    ("revenue_to_budget_ratio", ColumnSpec(kind="numeric", fill=False)),
+    ("budget_category", ColumnSpec(kind="string")),
+    ("budget_millions", ColumnSpec(kind="numeric", fill=False)),
+    ("revenue_millions", ColumnSpec(kind="numeric", fill=False)),
+    ("runtime", ColumnSpec(kind="numeric")),
+    ("runtime_bucket", ColumnSpec(kind="string")),
+    ("vote_average", ColumnSpec(kind="numeric")),
+    ("vote_count", ColumnSpec(kind="numeric")),
+    ("vote_count_bucket", ColumnSpec(kind="string")),
+    ("popularity", ColumnSpec(kind="numeric")),
+    ("budget_log", ColumnSpec(kind="numeric", fill=False)),
+    ("revenue_log", ColumnSpec(kind="numeric", fill=False)),
+    ("profit_log", ColumnSpec(kind="numeric", fill=False)),
+    ("vote_count_log", ColumnSpec(kind="numeric", fill=False)),
+    ("popularity_log", ColumnSpec(kind="numeric", fill=False)),
+    ("is_profitable", ColumnSpec(kind="numeric", fill=False)),
+]
+
+SCHEMA_BY_NAME: dict[str, ColumnSpec] = dict(COLUMN_SCHEMA)
+
+
+def _require_pyarrow() -> None:
+    """Fail with installation instructions when ``pyarrow`` is missing."""
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as exc:  # pragma: no cover - depends on the environment
+        raise ImportError(
+            "The Parquet format needs pyarrow. Install it with `uv sync --extra columnar`."
+        ) from exc
+
+
+def output_path(fmt: str) -> Path:
+    """Return the cleaned-dataset path for an output format (``csv``/``parquet``)."""
+
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format {fmt!r}; choose from {sorted(OUTPUT_FORMATS)}")
+    return OUTPUT_FORMATS[fmt]
+
+
+def clean_data_path(fmt: str | None = None) -> Path:
+    """Return the cleaned dataset the analysis steps should read.
+
+    ``fmt`` (or the ``MOVIE_CLEAN_FORMAT`` environment variable) picks the
+    format explicitly. Without one, the only cleaned file present is used,
+    and having both ``CLEAN_CSV`` and ``CLEAN_PARQUET`` is an error rather
+    than a guess.
+    """
+
+    fmt = fmt or os.environ.get(CLEAN_FORMAT_ENV) or None
+    if fmt is not None:
+        return output_path(fmt)
+    existing = [path for path in OUTPUT_FORMATS.values() if path.exists()]
+    if len(existing) > 1:
+        raise ValueError(
+            f"Both {CLEAN_CSV} and {CLEAN_PARQUET} exist: pick one with --format or "
+            f"{CLEAN_FORMAT_ENV}=csv|parquet, or delete the stale file"
+        )
+    return existing[0] if existing else CLEAN_CSV
+
+
+def arrow_table(df: pd.DataFrame) -> Any:
+    """Convert a cleaned frame into a typed Arrow table driven by ``COLUMN_SCHEMA``.
+
+    - ``list`` columns become ``list<string>``.
+    - ``string`` columns become ``dictionary<int32, string>``.
+    - ``numeric`` columns keep their pandas dtype.
+    - Pass-through raw columns (overview, JSON payloads, ...) are plain text.
+    """
+
+    _require_pyarrow()
+    import pyarrow as pa
+
+    arrays = []
+    for name in df.columns:
+        spec = SCHEMA_BY_NAME.get(name)
+        values = df[name]
+        if spec is None:
+            arrays.append(pa.array(values, type=pa.string(), from_pandas=True))
+        elif spec.kind == "list":
+            arrays.append(pa.array(values, type=pa.list_(pa.string()), from_pandas=True))
+        elif spec.kind == "string":
+            encoded = pa.array(values.astype(object), type=pa.string(), from_pandas=True)
+            arrays.append(encoded.dictionary_encode().cast(pa.dictionary(pa.int32(), pa.string())))
+        else:
+            arrays.append(pa.array(values.to_numpy(), from_pandas=True))
+    return pa.Table.from_arrays(arrays, names=[str(name) for name in df.columns])
+
+
+class CleanDatasetWriter:
+    """Write cleaned frames to CSV or Parquet, one frame (chunk) at a time.
+
+    The format is chosen from the path suffix. CSV chunks are appended with a
+    single header; Parquet chunks become row groups of one file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.rows = 0
+        self._started = False
+        self._parquet = path.suffix == ".parquet"
+        self._writer: Any = None
+        self._handle: Any = None
+        self._pending: Any = None
+
+    def __enter__(self) -> CleanDatasetWriter:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self._parquet:
+            self._handle = self.path.open("w", newline="", encoding="utf-8")
+        return self
+
+    def write(self, df: pd.DataFrame) -> None:
+        """Append ``df`` to the output file."""
+
+        if self._parquet:
+            self._write_parquet(arrow_table(df))
+        else:
+            df.to_csv(self._handle, index=False, header=not self._started)
+        self._started = True
+        self.rows += len(df)
+
+    def _write_parquet(self, table: Any) -> None:
+        import pyarrow.parquet as pq
+
+        if self._writer is None:
+            if table.num_rows == 0:
+                # Empty chunks cannot fix the column types; wait for real rows.
+                self._pending = table
+                return
+            self._writer = pq.ParquetWriter(
+                self.path, table.schema, compression=PARQUET_COMPRESSION
+            )
+        self._writer.write_table(table.cast(self._writer.schema))
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        if self._writer is None and self._pending is not None:
+            import pyarrow.parquet as pq
+
+            pq.write_table(self._pending, self.path, compression=PARQUET_COMPRESSION)
+        if self._writer is not None:
+            self._writer.close()
+        if self._handle is not None:
+            self._handle.close()
+
+
+def write_clean_dataset(df: pd.DataFrame, path: Path) -> None:
+    """Write a complete cleaned frame to ``path`` (CSV or Parquet by suffix)."""
+
+    with CleanDatasetWriter(path) as writer:
+        writer.write(df)
+
+
+def read_clean_dataset(path: Path, *, columns: list[str] | None = None) -> pd.DataFrame:
+    """Read a cleaned dataset written by ``01_clean_data.py``.
+
+    Parquet files are read natively: list columns come back as Python lists,
+    dictionary-encoded strings as ``category`` columns and the bucket columns
+    with their shared ordered dtype from ``buckets.BUCKETS``.
+    """
+
+    if path.suffix != ".parquet":
+        return pd.read_csv(path, usecols=columns)
+
+    _require_pyarrow()
+    return _typed_parquet_frame(pd.read_parquet(path, columns=columns))
+
+
+@dataclass(frozen=True)
+class LoadReport:
+    """What a projected load read, and what it skipped."""
+
+    path: Path
+    columns_loaded: int
+    columns_total: int
+    memory_bytes: int
+    seconds: float
+    disk_bytes_read: int | None = None
+    disk_bytes_total: int | None = None
+
+    def describe(self) -> str:
+        """Return a one-line human summary of the load."""
+
+        summary = (
+            f"Loaded {self.columns_loaded} of {self.columns_total} columns from {self.path} "
+            f"({_format_bytes(self.memory_bytes)} in memory, {self.seconds:.2f}s"
+        )
+        if self.disk_bytes_read is not None and self.disk_bytes_total:
+            skipped = self.disk_bytes_total - self.disk_bytes_read
+            if skipped:
+                summary += (
+                    f", skipped {_format_bytes(skipped)} of {_format_bytes(self.disk_bytes_total)}"
+                    " on disk"
+                )
+            else:
+                summary += f", read all {_format_bytes(self.disk_bytes_total)} on disk"
+        summary += ")"
+        if self.path.suffix != ".parquet":
+            summary += (
+                "; CSV is row-oriented, so column pruning saves no I/O"
+                " (write Parquet with `01_clean_data.py --format parquet`)"
+            )
+        return summary
+
+
+def _format_bytes(size: int) -> str:
+    scaled = float(size)
+    for unit in ("B", "KB", "MB", "GB"):
+        if scaled < 1024 or unit == "GB":
+            return f"{scaled:.0f} {unit}" if unit == "B" else f"{scaled:.1f} {unit}"
+        scaled /= 1024
+    return f"{scaled:.1f} GB"
+
+
+def _parse_list_repr(value: str) -> list:
+    """Parse a list column that ``to_csv`` wrote as a Python repr (``"['a', 'b']"``)."""
+
+    if not value:
+        return []
+    parsed = ast.literal_eval(value)
+    return parsed if isinstance(parsed, list) else []
+
+
+def _csv_read_options(columns: Iterable[str]) -> dict[str, Any]:
+    """Return ``read_csv`` dtypes/converters that type ``columns`` via ``COLUMN_SCHEMA``."""
+
+    dtypes: dict[str, object] = {}
+    converters: dict[str, object] = {}
+    for name in columns:
+        spec = SCHEMA_BY_NAME.get(name)
+        if name in BUCKETS:
+            dtypes[name] = BUCKETS[name].dtype
+        elif spec is not None and spec.kind == "string":
+            dtypes[name] = "category"
+        elif spec is not None and spec.kind == "list":
+            converters[name] = _parse_list_repr
+    return {"dtype": dtypes, "converters": converters}
+
+
+def _typed_parquet_frame(df: pd.DataFrame) -> pd.DataFrame:
+    for name in df.columns:
+        spec = SCHEMA_BY_NAME.get(name)
+        if spec is not None and spec.kind == "list":
+            df[name] = [list(values) if values is not None else [] for values in df[name]]
+        elif name in BUCKETS:
+            df[name] = df[name].astype(BUCKETS[name].dtype)
+    return df
+
+
+def iter_clean_batches(
+    path: Path, columns: Iterable[str], *, batch_size: int = 50_000
+) -> Iterator[pd.DataFrame]:
+    """Stream ``columns`` of a cleaned-format file in batches of ``batch_size`` rows.
+
+    Batches are typed like ``load_clean_columns`` so a model fitted on a full
+    load sees the same dtypes. Only one batch is held in memory at a time;
+    Parquet files are read one record batch at a time from a memory map.
+    Columns missing from the file are skipped.
+    """
+
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    available = dataset_columns(path)
+    wanted = set(columns)
+    selected = [name for name in available if name in wanted]
+
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(path, memory_map=True)
+        for batch in parquet.iter_batches(batch_size=batch_size, columns=selected):
+            yield _typed_parquet_frame(batch.to_pandas())
+        return
+
+    options = _csv_read_options(selected)
+    with pd.read_csv(path, usecols=selected, chunksize=batch_size, **options) as reader:
+        for chunk in reader:
+            yield chunk[selected]
+
+
+def dataset_columns(path: Path) -> list[str]:
+    """Return the column names of a cleaned dataset without loading any rows."""
+
+    if path.suffix == ".parquet":
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+
+        return list(pq.read_schema(path).names)
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def _parquet_column_bytes(path: Path) -> dict[str, int]:
+    """Return the compressed on-disk size of each top-level Parquet column."""
+
+    import pyarrow.parquet as pq
+
+    metadata = pq.ParquetFile(path).metadata
+    sizes: dict[str, int] = {}
+    for group in range(metadata.num_row_groups):
+        row_group = metadata.row_group(group)
+        for index in range(row_group.num_columns):
+            column = row_group.column(index)
+            name = column.path_in_schema.split(".", 1)[0]
+            sizes[name] = sizes.get(name, 0) + column.total_compressed_size
+    return sizes
+
+
+def load_clean_columns(path: Path, columns: Iterable[str]) -> tuple[pd.DataFrame, LoadReport]:
+    """Load only ``columns`` from a cleaned dataset, typed via ``COLUMN_SCHEMA``.
+
+    Columns missing from the file are skipped so callers can keep reporting
+    them with their own messages. ``string`` columns load as ``category``
+    (bucket columns with their ordered ``BUCKETS`` dtype) and ``list``
+    columns as Python lists, for both CSV and Parquet inputs.
+
+    Returns:
+        The projected frame and a ``LoadReport`` describing the load.
+    """
+
+    start = time.perf_counter()
+    available = dataset_columns(path)
+    wanted = set(columns)
+    selected = [name for name in available if name in wanted]
+
+    disk_read: int | None = None
+    disk_total: int | None = None
+    with step(f"read_{path.suffix.lstrip('.')}") as record:
+        if path.suffix == ".parquet":
+            df = read_clean_dataset(path, columns=selected)
+            sizes = _parquet_column_bytes(path)
+            disk_read = sum(sizes.get(name, 0) for name in selected)
+            disk_total = sum(sizes.values())
+        else:
+            df = pd.read_csv(path, usecols=selected, **_csv_read_options(selected))
+            df = df[selected]
+            # usecols only drops columns after parsing: every byte is still read.
+            disk_read = disk_total = path.stat().st_size
+        record.rows = len(df)
+
+    report = LoadReport(
+        path=path,
+        columns_loaded=len(selected),
+        columns_total=len(available),
+        memory_bytes=int(df.memory_usage(deep=True).sum()),
+        seconds=time.perf_counter() - start,
+        disk_bytes_read=disk_read,
+        disk_bytes_total=disk_total,
+    )
+    return df, report
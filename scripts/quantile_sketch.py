@@ -0,0 +1,112 @@
+"""Mergeable quantile sketches with a relative-error guarantee.
+
+Values are counted in logarithmic bins. With ``gamma = (1 + a) / (1 - a)``
+a positive value ``x`` falls in bin ``ceil(log_gamma(x))`` and is reported
+as ``2 * gamma**k / (gamma + 1)``, which is within a relative ``a`` of every
+value in that bin. Negative values use mirrored bins and values smaller
+than ``MIN_MAGNITUDE`` in absolute value share a bin at zero. A sketch is
+therefore just ``(key, count)`` pairs: two sketches merge by adding their
+counts, and a quantile read from any merge is within a relative ``a`` of
+the exact quantile of the combined data (the DDSketch construction).
+
+Keys are signed integers ordered like the values they stand for, so sorting
+keys sorts bins.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+
+DEFAULT_ACCURACY = 0.01
+MIN_MAGNITUDE = 1e-9
+
+
+def _log_gamma(accuracy: float) -> float:
+    if not 0 < accuracy < 1:
+        raise ValueError(f"accuracy must be between 0 and 1, got {accuracy}")
+    return float(np.log((1 + accuracy) / (1 - accuracy)))
+
+
+def _offset(log_gamma: float) -> int:
+    """Shift bin indices so every magnitude above ``MIN_MAGNITUDE`` gets a key >= 1."""
+
+    return int(-np.floor(np.log(MIN_MAGNITUDE) / log_gamma)) + 1
+
+
+def sketch_keys(values: np.ndarray, accuracy: float = DEFAULT_ACCURACY) -> np.ndarray:
+    """Return the bin key of every (finite) value."""
+
+    log_gamma = _log_gamma(accuracy)
+    values = np.asarray(values, dtype="float64")
+    magnitude = np.abs(values)
+    keys = np.zeros(len(values), dtype=np.int64)
+    large = magnitude > MIN_MAGNITUDE
+    bins = np.ceil(np.log(magnitude[large]) / log_gamma).astype(np.int64)
+    keys[large] = (bins + _offset(log_gamma)) * np.sign(values[large]).astype(np.int64)
+    return keys
+
+
+def key_values(keys: np.ndarray, accuracy: float = DEFAULT_ACCURACY) -> np.ndarray:
+    """Return the representative value of each bin key."""
+
+    log_gamma = _log_gamma(accuracy)
+    keys = np.asarray(keys, dtype=np.int64)
+    bins = np.abs(keys) - _offset(log_gamma)
+    gamma = np.exp(log_gamma)
+    values = np.sign(keys) * 2 * np.exp(bins * log_gamma) / (gamma + 1)
+    return np.where(keys == 0, 0.0, values)
+
+
+def grouped_quantiles(
+    groups: np.ndarray,
+    keys: np.ndarray,
+    counts: np.ndarray,
+    n_groups: int,
+    quantiles: Sequence[float],
+    accuracy: float = DEFAULT_ACCURACY,
+) -> np.ndarray:
+    """Read quantiles from many sketches at once.
+
+    Args:
+        groups: Group number of each ``(key, count)`` pair. Pairs of the same
+            group are merged, so this also rolls sketches up.
+        keys: Bin keys from ``sketch_keys``.
+        counts: Number of values in each pair.
+        n_groups: Number of groups; groups without values get ``NaN``.
+        quantiles: Quantiles to read, each between 0 and 1.
+        accuracy: Relative accuracy the keys were computed with.
+
+    Returns:
+        An ``n_groups × len(quantiles)`` array. Like ``numpy.quantile``'s
+        default, a quantile between two ranks interpolates linearly between
+        their values.
+    """
+
+    wanted = np.asarray(quantiles, dtype="float64")
+    if ((wanted < 0) | (wanted > 1)).any():
+        raise ValueError(f"quantiles must be between 0 and 1, got {list(quantiles)}")
+    order = np.lexsort((keys, groups))
+    groups, keys = np.asarray(groups)[order], np.asarray(keys)[order]
+    counts = np.asarray(counts, dtype=np.int64)[order]
+
+    totals = np.bincount(groups, weights=counts, minlength=n_groups).astype(np.int64)
+    before = np.concatenate([[0], np.cumsum(totals)[:-1]])
+    within = np.cumsum(counts) - before[groups]
+
+    def value_at(ranks: np.ndarray) -> np.ndarray:
+        # The rank-``r`` value is in the first bin whose running count passes ``r``.
+        values = np.full(n_groups, np.nan)
+        passed = np.flatnonzero(within > ranks[groups])
+        found, first = np.unique(groups[passed], return_index=True)
+        values[found] = key_values(keys[passed[first]], accuracy)
+        return values
+
+    result = np.full((n_groups, len(wanted)), np.nan)
+    for column, quantile in enumerate(wanted):
+        rank = quantile * (totals - 1)
+        lower, upper = np.floor(rank), np.ceil(rank)
+        low = value_at(lower)
+        result[:, column] = low + (rank - lower) * (value_at(upper) - low)
+    return result
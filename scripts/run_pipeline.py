@@ -0,0 +1,278 @@
+"""Run the numbered pipeline scripts, skipping stages whose inputs are unchanged.
+
+Each stage is fingerprinted from its script source (which holds constants
+such as ``TOP_N_GENRES`` and the model hyper-parameters), the shared helper
+modules it imports (directly or through other helpers), its command-line
+arguments, the library versions and the content hashes of its input files.
+When the fingerprint matches the cached one and
+the recorded outputs are still on disk, the stage is skipped and its saved
+console output is replayed. A change to one stage therefore re-runs only
+that stage and the stages that consume its outputs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import sys
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from importlib import metadata
+from pathlib import Path
+
+from model_artifact import CURRENT_FILE, MODEL_DIR
+from movie_data import OUTPUT_FORMATS, output_path
+
+SCRIPTS = Path(__file__).resolve().parent
+CACHE_PATH = Path("results/.pipeline_cache.json")
+LOG_DIR = Path("results/logs")
+RAW_DATA = Path("data/movies_raw.csv")
+TRACKED_PACKAGES = ("numpy", "pandas", "scikit-learn", "matplotlib", "pyarrow", "orjson")
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One pipeline step: a script plus the files it reads and writes."""
+
+    name: str
+    script: Path
+    inputs: tuple[Path, ...] = ()
+    outputs: tuple[Path, ...] = ()
+    args: tuple[str, ...] = ()
+
+
+@dataclass
+class StageCache:
+    """Fingerprints and output hashes recorded for previously run stages."""
+
+    path: Path
+    entries: dict[str, dict] = field(default_factory=dict)
+    digests: dict[str, dict] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> StageCache:
+        if not path.exists():
+            return cls(path=path)
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return cls(path=path, entries=data.get("stages", {}), digests=data.get("digests", {}))
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"stages": self.entries, "digests": self.digests}
+        self.path.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+
+    def file_digest(self, path: Path) -> str:
+        """Return the SHA-256 of ``path``, reusing the cached value if size/mtime match."""
+
+        stat = path.stat()
+        key = str(path)
+        cached = self.digests.get(key)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["sha256"]
+
+        digest = hashlib.sha256()
+        with path.open("rb") as handle:
+            for block in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(block)
+        self.digests[key] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest.hexdigest(),
+        }
+        return digest.hexdigest()
+
+
+def default_stages(*, fmt: str = "csv", refresh: bool = False) -> list[Stage]:
+    """Return the standard ``00``–``04`` stages for a cleaned-data format."""
+
+    clean = output_path(fmt)
+    stages = [
+        Stage("clean", SCRIPTS / "01_clean_data.py", (RAW_DATA,), (clean,), ("--format", fmt)),
+        Stage(
+            "genres",
+            SCRIPTS / "02_analyze_genres.py",
+            (clean,),
+            (Path("outputs/genres_by_decade.png"), Path("results/genres/cooccurrence.csv")),
+            ("--format", fmt),
+        ),
+        Stage(
+            "financials",
+            SCRIPTS / "03_analyze_financials.py",
+            (clean,),
+            (Path("outputs/roi_by_budget_category.png"),),
+            ("--format", fmt),
+        ),
+        Stage(
+            "model",
+            SCRIPTS / "04_build_model.py",
+            (clean,),
+            (MODEL_DIR / CURRENT_FILE,),
+            ("--format", fmt),
+        ),
+    ]
+    if refresh:
+        stages.insert(0, Stage("refresh", SCRIPTS / "00_refresh_raw.py", (), (RAW_DATA,)))
+    return stages
+
+
+def _environment() -> dict[str, str]:
+    versions = {"python": platform.python_version()}
+    for package in TRACKED_PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = "missing"
+    return versions
+
+
+def _helper_modules(script: Path) -> list[Path]:
+    """Shared modules in the script's directory that ``script`` imports, transitively.
+
+    Imports are read from the source (including ones inside functions), so
+    a helper used only by another stage does not invalidate this one.
+    """
+
+    found: set[Path] = set()
+    pending = [script]
+    while pending:
+        tree = ast.parse(pending.pop().read_text(encoding="utf-8"))
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                path = script.parent / f"{name.partition('.')[0]}.py"
+                if path.exists() and path != script and path not in found:
+                    found.add(path)
+                    pending.append(path)
+    return sorted(found)
+
+
+def fingerprint(stage: Stage, cache: StageCache) -> str:
+    """Return a digest of everything that determines ``stage``'s outputs."""
+
+    digest = hashlib.sha256()
+    parts: dict[str, object] = {
+        "stage": stage.name,
+        "args": list(stage.args),
+        "environment": _environment(),
+        "script": cache.file_digest(stage.script),
+        "helpers": {path.name: cache.file_digest(path) for path in _helper_modules(stage.script)},
+        "inputs": {
+            str(path): cache.file_digest(path) if path.exists() else None for path in stage.inputs
+        },
+    }
+    digest.update(json.dumps(parts, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _is_fresh(stage: Stage, cache: StageCache, current: str) -> bool:
+    entry = cache.entries.get(stage.name)
+    if stage.name == "refresh" or entry is None or entry["fingerprint"] != current:
+        return False
+    for path, recorded in entry["outputs"].items():
+        output = Path(path)
+        if not output.exists() or cache.file_digest(output) != recorded:
+            return False
+    return True
+
+
+def _run(stage: Stage, log_path: Path) -> None:
+    """Run ``stage`` streaming its output to the console and ``log_path``."""
+
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    command = [sys.executable, str(stage.script), *stage.args]
+    with log_path.open("w", encoding="utf-8") as log:
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            env={**os.environ, "PYTHONUNBUFFERED": "1"},
+        )
+        assert process.stdout is not None
+        for line in process.stdout:
+            sys.stdout.write(line)
+            log.write(line)
+        returncode = process.wait()
+    if returncode != 0:
+        raise SystemExit(f"Stage {stage.name!r} failed with exit code {returncode}.")
+
+
+def run_pipeline(
+    stages: Iterable[Stage],
+    *,
+    cache_path: Path = CACHE_PATH,
+    log_dir: Path = LOG_DIR,
+    force: bool = False,
+    dry_run: bool = False,
+) -> list[str]:
+    """Run ``stages`` in order, skipping those with an up-to-date cache entry.
+
+    Returns:
+        The names of the stages that were (or, with ``dry_run``, would be) run.
+    """
+
+    cache = StageCache.load(cache_path)
+    executed = []
+    for stage in stages:
+        current = fingerprint(stage, cache)
+        log_path = log_dir / f"{stage.name}.log"
+        if not force and _is_fresh(stage, cache, current):
+            print(f"[{stage.name}] up to date, skipping", flush=True)
+            if log_path.exists():
+                sys.stdout.write(log_path.read_text(encoding="utf-8"))
+            continue
+
+        executed.append(stage.name)
+        if dry_run:
+            print(f"[{stage.name}] would run {stage.script.name}", flush=True)
+            continue
+
+        print(f"[{stage.name}] running {stage.script.name}", flush=True)
+        _run(stage, log_path)
+        cache.entries[stage.name] = {
+            "fingerprint": current,
+            "outputs": {str(path): cache.file_digest(path) for path in stage.outputs},
+        }
+        cache.save()
+    return executed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        metavar="STAGE",
+        help="Run only these stages (clean, genres, financials, model).",
+    )
+    parser.add_argument("--format", choices=sorted(OUTPUT_FORMATS), default="csv")
+    parser.add_argument(
+        "--refresh", action="store_true", help="Also re-download the raw data (always runs)."
+    )
+    parser.add_argument("--force", action="store_true", help="Ignore the cache and run all.")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would run.")
+    args = parser.parse_args()
+
+    stages = default_stages(fmt=args.format, refresh=args.refresh)
+    if args.only:
+        unknown = set(args.only) - {stage.name for stage in stages}
+        if unknown:
+            raise SystemExit(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+        stages = [stage for stage in stages if stage.name in args.only]
+
+    executed = run_pipeline(stages, force=args.force, dry_run=args.dry_run)
+    print(f"Pipeline finished: {len(executed)} stage(s) run, {len(stages) - len(executed)} cached.")
+
+
+if __name__ == "__main__":
+    main()
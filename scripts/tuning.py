@@ -0,0 +1,190 @@
+"""Successive-halving hyper-parameter search over the model pipeline.
+
+A candidate is a flat ``dict`` of settings. Keys starting with ``model__``
+are model parameters; everything else (engine, encoding, ...) selects the
+preprocessing, so candidates that differ only in model parameters share
+the same preprocessed fold matrices. Each ``(preprocessing, fold)`` matrix
+comes from a ``fold_cache.FoldCache``: it is fitted and transformed once, in a
+worker process, and reused by every candidate (and, with an on-disk cache, by
+later searches).
+
+Candidates start on one CV fold; after each rung only the best
+``1 / eta`` (by mean MAE) move on to ``eta`` times as many folds, until
+the survivors have been scored on every fold. Fold fits run in parallel
+worker processes, and every fold score is appended to a JSON-lines trial
+log as soon as it finishes, so an interrupted search resumes without
+refitting what it already scored.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import KFold
+
+from fold_cache import FoldCache, fit_and_score
+
+TUNING_DIR = Path("results/tuning")
+
+
+def candidate_key(params: dict[str, Any]) -> str:
+    """Return a short stable id for a candidate's settings."""
+
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+
+
+def _model_params(params: dict[str, Any]) -> dict[str, Any]:
+    return {
+        name.removeprefix("model__"): value
+        for name, value in params.items()
+        if name.startswith("model__")
+    }
+
+
+def halving_schedule(n_splits: int, eta: int = 3) -> list[int]:
+    """Return the number of folds scored at each rung, e.g. ``[1, 3, 5]``."""
+
+    if eta < 2:
+        raise ValueError("eta must be at least 2")
+    rungs = [1]
+    while rungs[-1] < n_splits:
+        rungs.append(min(n_splits, rungs[-1] * eta))
+    return rungs
+
+
+@dataclass
+class TrialStore:
+    """Append-only JSON-lines log of per-fold scores, keyed by candidate and fold."""
+
+    path: Path
+    records: dict[tuple[str, int], dict[str, Any]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> TrialStore:
+        store = cls(path=path)
+        if path.exists():
+            for line in path.read_text(encoding="utf-8").splitlines():
+                if line.strip():
+                    record = json.loads(line)
+                    store.records[(record["candidate"], record["fold"])] = record
+        return store
+
+    def append(self, record: dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(record, sort_keys=True) + "\n")
+        self.records[(record["candidate"], record["fold"])] = record
+
+    def scores(self, key: str, folds: Iterable[int]) -> list[dict[str, Any]]:
+        return [self.records[(key, fold)] for fold in folds if (key, fold) in self.records]
+
+
+def successive_halving(
+    candidates: list[dict[str, Any]],
+    X: pd.DataFrame,
+    y: pd.Series,
+    build_pipeline: Callable[[dict[str, Any]], Any],
+    *,
+    store: TrialStore,
+    n_splits: int = 5,
+    eta: int = 3,
+    random_state: int = 42,
+    n_jobs: int | None = None,
+    cache: FoldCache | None = None,
+    log: Callable[[str], None] = print,
+) -> pd.DataFrame:
+    """Search ``candidates`` with successive halving over CV folds.
+
+    Args:
+        candidates: Candidate settings; ``build_pipeline(params)`` must return
+            an unfitted ``Pipeline`` with ``pre`` and ``model`` steps for each.
+        X, y: Training data.
+        store: Trial log; folds already in it are not refitted.
+        n_splits: CV folds (the same ``KFold`` split as ``04_build_model.py``).
+        eta: Keep the best ``1 / eta`` candidates at each rung.
+        n_jobs: Worker processes for the fold fits (default: all cores).
+        cache: Fold matrix cache (default: a fresh in-memory one).
+        log: Progress callback.
+
+    Returns:
+        One row per candidate with the folds it was scored on, mean R²/MAE
+        and its settings, best first.
+    """
+
+    cv = KFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    splits = list(cv.split(X))
+    cache = cache if cache is not None else FoldCache()
+    misses_before = cache.misses
+    workers = n_jobs if n_jobs and n_jobs > 0 else (os.cpu_count() or 1)
+    keys = {candidate_key(params): params for params in candidates}
+    pipelines = {key: build_pipeline(params) for key, params in keys.items()}
+    models = {}
+    for key, pipeline in pipelines.items():
+        model = clone(pipeline.named_steps["model"])
+        if "n_jobs" in model.get_params():
+            model.set_params(n_jobs=1)
+        models[key] = model.set_params(**_model_params(keys[key]))
+
+    survivors = list(keys)
+    rungs = halving_schedule(n_splits, eta)
+    for rung, n_folds in enumerate(rungs):
+        folds = range(n_folds)
+        todo = [
+            (key, fold) for key in survivors for fold in folds if (key, fold) not in store.records
+        ]
+        log(
+            f"Rung {rung}: {len(survivors)} candidate(s) x {n_folds} fold(s), "
+            f"{len(todo)} fit(s) to run"
+        )
+        # Each distinct (preprocessing, fold) is prepared once, in a worker.
+        prepared = cache.get_many(
+            [(pipelines[key].named_steps["pre"], X, y, *splits[fold]) for key, fold in todo],
+            n_jobs=workers,
+        )
+        results = Parallel(n_jobs=workers, return_as="generator")(
+            delayed(fit_and_score)(
+                clone(models[key]), data.X_train, data.y_train, data.X_test, data.y_test
+            )
+            for (key, _), data in zip(todo, prepared)
+        )
+        for (key, fold), scores in zip(todo, results):
+            store.append({"candidate": key, "fold": fold, "params": keys[key], **scores})
+
+        if rung < len(rungs) - 1:
+            ranked = sorted(
+                survivors, key=lambda key: np.mean([r["mae"] for r in store.scores(key, folds)])
+            )
+            survivors = ranked[: max(1, math.ceil(len(ranked) / eta))]
+
+    fits = cache.misses - misses_before
+    log(f"Preprocessing fitted {fits} time(s) for {len(keys)} candidate(s)")
+    rows = []
+    for key, params in keys.items():
+        scored = store.scores(key, range(n_splits))
+        if not scored:
+            continue
+        rows.append(
+            {
+                "candidate": key,
+                "folds": len(scored),
+                "cv_r2_mean": float(np.mean([r["r2"] for r in scored])),
+                "cv_mae_mean": float(np.mean([r["mae"] for r in scored])),
+                "fit_seconds": float(np.mean([r["fit_seconds"] for r in scored])),
+                **params,
+            }
+        )
+    return pd.DataFrame(rows).sort_values(
+        ["folds", "cv_mae_mean"], ascending=[False, True], ignore_index=True
+    )
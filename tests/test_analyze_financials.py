@@ -6,9 +6,12 @@ import sys
 from pathlib import Path
 from typing import Any, cast
 
+import numpy as np
 import pandas as pd
 import pytest
 
+from movie_cube import MovieCube
+
 _MODULE_PATH = Path(__file__).resolve().parents[1] / "scripts" / "03_analyze_financials.py"
 _SPEC = importlib.util.spec_from_file_location("analyze_financials", _MODULE_PATH)
 if _SPEC is None or _SPEC.loader is None:
@@ -42,3 +45,120 @@ def test_aggregate_budget_metrics_computes_expected_values() -> None:
     assert agg.loc["low", "avg_profit_millions"] == pytest.approx(4.5)
     assert agg.loc["medium", "avg_profit_millions"] == pytest.approx(55.0)
     assert agg.loc["low", "count"] == pytest.approx(2)
+
+
+def test_aggregate_budget_metrics_takes_the_exact_median() -> None:
+    df = pd.DataFrame(
+        {
+            "budget_category": ["low", "low", "low", "high"],
+            "roi": [0.1, 0.2, float("inf"), 7.0],
+            "is_profitable": [1.0, 1.0, 1.0, 1.0],
+            "budget_millions": [5.0, 4.0, 3.0, 90.0],
+            "profit": [1e6, 1e6, 1e6, 1e6],
+            "id": [1, 2, None, 4],
+        }
+    )
+
+    agg = _fin._aggregate_budget_metrics(df, order=["low", "medium", "high"])
+
+    assert agg.loc["low", "median_roi"] == pytest.approx(0.15)
+    assert agg.loc["high", "median_roi"] == 7.0
+    # Like the original groupby, ``count`` counts movies with an id.
+    assert agg.loc["low", "count"] == 2
+
+
+def test_budget_metrics_from_cube_match_the_row_summary() -> None:
+    df = pd.DataFrame(
+        {
+            "budget_category": ["low", "low", "medium", "medium"],
+            "roi": [1.5, 0.5, 0.2, 0.4],
+            "is_profitable": [1.0, 0.0, 1.0, 1.0],
+            "budget_millions": [5.0, 4.0, 60.0, 70.0],
+            "profit": [10_000_000.0, -1_000_000.0, 50_000_000.0, 60_000_000.0],
+            "id": [1, 2, 3, 4],
+        }
+    )
+    cube = MovieCube.build(df, dimensions=("budget_category",))
+
+    agg = _fin._budget_metrics_from_cube(cube, order=["low", "medium", "high"])
+
+    assert list(agg.index) == ["low", "medium", "high"]
+    assert agg.loc["low", "mean_roi"] == pytest.approx(1.0)
+    assert agg.loc["medium", "mean_roi"] == pytest.approx(0.3)
+    assert agg.loc["low", "share_profitable"] == pytest.approx(0.5)
+    assert agg.loc["medium", "share_profitable"] == pytest.approx(1.0)
+    assert agg.loc["low", "avg_profit_millions"] == pytest.approx(4.5)
+    assert agg.loc["medium", "avg_profit_millions"] == pytest.approx(55.0)
+    assert agg.loc["low", "count"] == pytest.approx(2)
+    assert agg.loc["low", "avg_budget_millions"] == pytest.approx(4.5)
+    assert agg.loc["medium", "median_roi"] == pytest.approx(0.3, rel=0.01)
+    assert agg.loc["high"].isna().all()
+
+
+def test_budget_metrics_can_be_grouped_by_another_dimension_and_filtered() -> None:
+    df = pd.DataFrame(
+        {
+            "budget_category": ["low", "low", "high", "high"],
+            "decade": ["1990s", "2000s", "1990s", "1990s"],
+            "primary_language": ["en", "en", "en", "fr"],
+            "roi": [1.0, 3.0, 0.2, 0.4],
+            "is_profitable": [1.0, 1.0, 0.0, 1.0],
+            "budget_millions": [5.0, 4.0, 90.0, 70.0],
+            "profit": [5e6, 12e6, -1e6, 28e6],
+            "id": [1, 2, 3, 4],
+        }
+    )
+    cube = MovieCube.build(df, dimensions=("budget_category", "decade", "primary_language"))
+
+    agg = _fin._budget_metrics_from_cube(cube, by="decade", where={"budget_category": "high"})
+    specs = _fin._variant_specs(cube)
+
+    assert agg.index.name == "decade"
+    assert agg.index.tolist() == ["1990s"]
+    assert agg.loc["1990s", "mean_roi"] == pytest.approx(0.3)
+    assert agg.loc["1990s", "share_profitable"] == pytest.approx(0.5)
+    assert [spec.path.name for spec in specs] == [
+        "tier-low.png",
+        "tier-high.png",
+        "language-en.png",
+        "language-fr.png",
+    ]
+    assert specs[0].data.index.tolist() == ["1990s", "2000s"]
+    assert specs[2].data.index.tolist() == ["low", "high"]
+
+
+def test_budget_metrics_match_a_row_groupby_within_the_documented_tolerance() -> None:
+    rng = np.random.default_rng(0)
+    budget = rng.lognormal(17, 1.2, 3_000)
+    revenue = budget * rng.lognormal(0.2, 1.1, len(budget))
+    df = pd.DataFrame(
+        {
+            "budget_category": pd.cut(
+                budget, [0, 20e6, 80e6, np.inf], labels=["low", "medium", "high"]
+            ).astype(str),
+            "roi": (revenue - budget) / budget,
+            "is_profitable": revenue > budget,
+            "budget_millions": budget / 1e6,
+            "profit": revenue - budget,
+            "id": np.where(rng.random(len(budget)) < 0.05, np.nan, np.arange(len(budget))),
+        }
+    )
+    cube = MovieCube.build(df.iloc[:1_000], dimensions=("budget_category",)).merge(
+        MovieCube.build(df.iloc[1_000:], dimensions=("budget_category",))
+    )
+
+    agg = _fin._budget_metrics_from_cube(cube, order=["low", "medium", "high"])
+
+    rows = df.assign(roi_capped=df["roi"].clip(-1, 10)).groupby("budget_category")
+    expected = rows.agg(
+        mean_roi=("roi_capped", "mean"),
+        median_roi=("roi", "median"),
+        share_profitable=("is_profitable", "mean"),
+        avg_budget_millions=("budget_millions", "mean"),
+        count=("id", "count"),
+    ).reindex(["low", "medium", "high"])
+    exact = ["mean_roi", "share_profitable", "avg_budget_millions", "count"]
+    assert agg[exact].to_numpy() == pytest.approx(expected[exact].to_numpy(), rel=1e-9)
+    assert agg["median_roi"].to_numpy() == pytest.approx(
+        expected["median_roi"].to_numpy(), rel=0.01
+    )
@@ -9,6 +9,8 @@ from typing import Any, cast
 import pandas as pd
 import pytest
 
+from movie_cube import MovieCube
+
 _MODULE_PATH = Path(__file__).resolve().parents[1] / "scripts" / "02_analyze_genres.py"
 _SPEC = importlib.util.spec_from_file_location("analyze_genres", _MODULE_PATH)
 if _SPEC is None or _SPEC.loader is None:
@@ -61,3 +63,39 @@ def test_compute_genre_shares_normalizes_rows() -> None:
     assert pytest.approx(1.0) == shares.loc["1990s"].sum()
     assert pytest.approx(1.0) == shares.loc["2000s"].sum()
     assert (shares >= 0).all().all()
+
+
+def test_language_variants_count_only_that_language() -> None:
+    df = pd.DataFrame(
+        {
+            "decade": ["1990s", "1990s", "2000s", "2000s", "2000s"],
+            "primary_genre": ["Action", "Drama", "Action", "Comedy", "Comedy"],
+            "primary_language": ["en", "fr", "en", "fr", "fr"],
+        }
+    )
+    cube = MovieCube.build(
+        df, dimensions=("decade", "primary_genre", "primary_language"), measures=()
+    )
+
+    french = _genres._genre_counts_from_cube(cube, where={"primary_language": "fr"})
+    specs = _genres._language_variants(cube, top_n=1)
+
+    assert french.to_dict() == {
+        "Comedy": {"1990s": 0, "2000s": 2},
+        "Drama": {"1990s": 1, "2000s": 0},
+    }
+    assert [spec.path.name for spec in specs] == ["language-fr.png"]
+    assert specs[0].style["title"].endswith("(fr)")
+    assert specs[0].data.sum(axis=1).tolist() == [1.0, 1.0]
+
+
+def test_top_pairs_reads_the_upper_triangle() -> None:
+    cooccurrence = pd.DataFrame(
+        [[5, 3, 1], [3, 4, 2], [1, 2, 3]],
+        index=["Action", "Drama", "Comedy"],
+        columns=["Action", "Drama", "Comedy"],
+    )
+
+    pairs = _genres._top_pairs(cooccurrence, n=2)
+
+    assert pairs.to_dict() == {"Action + Drama": 3, "Drama + Comedy": 2}
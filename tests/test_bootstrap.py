@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+# pylint: disable=protected-access
+import numpy as np
+import pandas as pd
+import pytest
+
+import bootstrap
+from bootstrap import bootstrap_ci, ci_width_vs_runtime
+
+
+def _sample(seed: int = 0) -> tuple[np.ndarray, pd.Series]:
+    rng = np.random.default_rng(seed)
+    sizes = {"low": 15, "medium": 40, "high": 200}
+    # Every group gets unit standard deviation, so CI widths depend only on n.
+    noise = [rng.normal(size=n) for n in sizes.values()]
+    values = np.concatenate([loc + x / x.std() for loc, x in zip((1, 5, 9), noise)])
+    groups = pd.Series(np.repeat(list(sizes), list(sizes.values())), name="tier")
+    shuffle = rng.permutation(len(values))
+    return values[shuffle], groups.iloc[shuffle].reset_index(drop=True)
+
+
+@pytest.mark.parametrize("statistic", ["mean", "median"])
+def test_segment_statistic_matches_numpy_per_group_and_resample(statistic: str) -> None:
+    rng = np.random.default_rng(1)
+    counts = np.array([3, 1, 6, 4])
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    values = np.concatenate([np.sort(rng.normal(size=n)) for n in counts])
+    rows = np.stack(
+        [
+            np.concatenate(
+                [rng.integers(start, end, end - start) for start, end in zip(offsets, offsets[1:])]
+            )
+            for _ in range(5)
+        ]
+    )
+
+    result = bootstrap._segment_statistic(values, offsets, statistic, rows)
+
+    reducer = np.mean if statistic == "mean" else np.median
+    expected = [
+        [reducer(values[row[start:end]]) for start, end in zip(offsets, offsets[1:])]
+        for row in rows
+    ]
+    np.testing.assert_allclose(result, expected)
+
+
+def test_weighted_statistic_with_integer_weights_matches_repeated_values() -> None:
+    values = np.array([1.0, 2.0, 3.0, 10.0, 20.0])
+    offsets = np.array([0, 3, 5])
+    weights = np.array([[2.0, 0.0, 1.0, 1.0, 3.0], [0.0, 0.0, 0.0, 1.0, 1.0]])
+
+    means = bootstrap._weighted_statistic(values, offsets, "mean", weights)
+    medians = bootstrap._weighted_statistic(values, offsets, "median", weights)
+
+    np.testing.assert_allclose(means, [[5 / 3, 17.5], [np.nan, 15.0]])
+    # Lower weighted median: [1, 1, 3] -> 1 and [10, 20, 20, 20] -> 20; [10, 20] -> 10.
+    np.testing.assert_allclose(medians, [[1.0, 20.0], [np.nan, 10.0]])
+
+
+@pytest.mark.parametrize("method", ["index", "poisson"])
+@pytest.mark.parametrize("statistic", ["mean", "median"])
+def test_intervals_cover_the_estimate_and_shrink_with_group_size(
+    method: str, statistic: str
+) -> None:
+    values, groups = _sample()
+
+    result = bootstrap_ci(
+        values, groups, statistic=statistic, method=method, resamples=400, batch_size=64
+    )
+
+    assert result.index.tolist() == ["high", "low", "medium"]
+    assert result["n"].tolist() == [200, 15, 40]
+    reducer = "mean" if statistic == "mean" else "median"
+    np.testing.assert_allclose(
+        result["estimate"], pd.Series(values).groupby(groups).agg(reducer).to_numpy()
+    )
+    assert (result["ci_low"] <= result["estimate"]).all()
+    assert (result["estimate"] <= result["ci_high"]).all()
+    if statistic == "mean":
+        # Standard errors scale with 1 / sqrt(n); medians of small groups are too lumpy.
+        width = result["ci_width"]
+        assert width["low"] > width["medium"] > width["high"]
+    assert result["ci_width"].between(0.05, 3.0).all()
+
+
+def test_results_depend_on_the_seed_but_not_on_the_worker_count() -> None:
+    values, groups = _sample()
+
+    def run(seed: int, workers: int = 1) -> pd.DataFrame:
+        return bootstrap_ci(
+            values,
+            groups,
+            statistic="median",
+            resamples=250,
+            batch_size=50,
+            seed=seed,
+            workers=workers,
+        )
+
+    serial = run(3)
+    parallel = run(3, workers=2)
+    reseeded = run(4)
+
+    pd.testing.assert_frame_equal(parallel, serial)
+    assert not np.allclose(reseeded["ci_low"], serial["ci_low"])
+
+
+def test_missing_values_and_unused_categories_are_dropped() -> None:
+    values = np.array([1.0, np.nan, 3.0, 4.0, 5.0])
+    groups = pd.Series(
+        pd.Categorical(["a", "a", "b", None, "b"], categories=["a", "b", "c"]), name="g"
+    )
+
+    result = bootstrap_ci(values, groups, resamples=20)
+
+    assert result.index.tolist() == ["a", "b"]
+    assert result.index.name == "g"
+    assert result["n"].tolist() == [1, 2]
+    assert result.loc["a", "ci_width"] == 0
+
+
+@pytest.mark.parametrize(
+    ("options", "message"),
+    [
+        ({"statistic": "mode"}, "statistic"),
+        ({"method": "jackknife"}, "method"),
+        ({"resamples": 0}, "at least 1"),
+        ({"confidence": 1.0}, "confidence"),
+    ],
+)
+def test_invalid_options_are_rejected(options: dict, message: str) -> None:
+    values, groups = _sample()
+
+    with pytest.raises(ValueError, match=message):
+        bootstrap_ci(values, groups, **options)
+
+
+def test_ci_width_vs_runtime_reports_each_resample_count() -> None:
+    values, groups = _sample()
+
+    report = ci_width_vs_runtime(values, groups, [50, 200], batch_size=40)
+
+    assert report.index.tolist() == [50, 200]
+    assert report.columns.tolist() == ["seconds", "mean_ci_width", "max_ci_width"]
+    assert (report["seconds"] > 0).all()
+    assert (report["max_ci_width"] >= report["mean_ci_width"]).all()
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from buckets import BUCKETS, BucketSpec, bucketize, decade_labels
+
+
+@pytest.mark.parametrize("name", sorted(BUCKETS))
+def test_bucketize_matches_scalar_labels_at_boundaries(name: str) -> None:
+    spec = BUCKETS[name]
+    values = [np.nan, 0.0, *spec.edges, *(edge - 1 for edge in spec.edges), 1e12]
+
+    result = bucketize(values, spec)
+
+    assert list(result.astype(str)) == [spec.label(value) for value in values]
+    assert result.dtype == spec.dtype
+
+
+def test_bucketize_budget_tiers() -> None:
+    result = bucketize(pd.Series([5e6, 2e7, 8e7, None]), BUCKETS["budget_category"])
+    assert list(result) == ["low", "medium", "high", "unknown"]
+
+
+def test_decade_labels_orders_decades_and_keeps_unknown() -> None:
+    labels = decade_labels(pd.Series([2011.0, 1995.0, np.nan, 1999.0]))
+
+    assert list(labels) == ["2010s", "1990s", "Unknown", "1990s"]
+    assert list(labels.categories) == ["1990s", "2010s", "Unknown"]
+    assert labels.ordered
+
+
+def test_bucket_spec_requires_one_more_label_than_edges() -> None:
+    with pytest.raises(ValueError, match="one more label"):
+        BucketSpec(edges=(1, 2), labels=("a", "b"))
@@ -8,6 +8,10 @@ from typing import Any, cast
 
 import numpy as np
 import pandas as pd
+import pytest
+from sklearn.model_selection import train_test_split
+
+from fold_cache import FoldCache
 
 _MODULE_PATH = Path(__file__).resolve().parents[1] / "scripts" / "04_build_model.py"
 _SPEC = importlib.util.spec_from_file_location("build_model", _MODULE_PATH)
@@ -61,3 +65,181 @@ def test_evaluate_model_returns_metrics() -> None:
 
     importance = _model.aggregated_feature_importance(pipeline)
     assert not importance.empty
+
+
+def test_evaluate_model_does_not_share_the_cached_preprocessor() -> None:
+    rng = np.random.default_rng(0)
+    X = pd.concat(
+        [
+            pd.DataFrame(
+                rng.normal(size=(40, len(_model.NUM_FEATURES))), columns=_model.NUM_FEATURES
+            ),
+            pd.DataFrame({name: rng.choice(["A", "B"], size=40) for name in _model.CAT_FEATURES}),
+        ],
+        axis=1,
+    )
+    y = pd.Series(rng.normal(size=40))
+    cache = FoldCache()
+    pipeline = _model._build_pipeline()
+
+    _model._evaluate_model(pipeline, X, y, n_splits=2, test_size=0.25, random_state=0, cache=cache)
+    train, test = train_test_split(np.arange(len(X)), test_size=0.25, random_state=0)
+    cached = cache.get(_model._build_pipeline().named_steps["pre"], X, y, train, test).pre
+    before = cached.transform(X)
+    pipeline.fit(X.iloc[:10], y.iloc[:10])
+
+    assert pipeline.named_steps["pre"] is not cached
+    np.testing.assert_array_equal(cached.transform(X), before)
+
+
+def test_parallel_budget_never_oversubscribes() -> None:
+    assert _model._parallel_budget(5, 8) == (5, 1)
+    assert _model._parallel_budget(5, 20) == (5, 4)
+    assert _model._parallel_budget(5, 2) == (2, 1)
+    fold_jobs, model_jobs = _model._parallel_budget(3)
+    assert 1 <= fold_jobs <= 3 and model_jobs >= 1
+
+
+def test_cross_validate_folds_matches_per_metric_scoring() -> None:
+    from sklearn.model_selection import KFold, cross_val_score
+
+    rng = np.random.default_rng(1)
+    numeric = pd.DataFrame(
+        rng.normal(size=(40, len(_model.NUM_FEATURES))), columns=_model.NUM_FEATURES
+    )
+    categorical = pd.DataFrame(
+        {name: rng.choice(["A", "B"], size=len(numeric)) for name in _model.CAT_FEATURES}
+    )
+    X = pd.concat([numeric, categorical], axis=1)
+    y = pd.Series(numeric[_model.NUM_FEATURES[0]] + rng.normal(scale=0.1, size=len(X)))
+
+    pipeline = _model._build_pipeline()
+    pipeline.set_params(model__n_estimators=20)
+    folds = _model._cross_validate_folds(pipeline, X, y, n_splits=3, random_state=0, n_jobs=2)
+
+    cv = KFold(n_splits=3, shuffle=True, random_state=0)
+    expected = cross_val_score(pipeline, X, y, cv=cv, scoring="r2")
+    np.testing.assert_allclose(folds["r2"].to_numpy(), expected)
+    assert list(folds.columns) == [
+        "r2",
+        "mae",
+        "fit_seconds",
+        "score_seconds",
+        "cpu_seconds",
+        "peak_rss_mb",
+    ]
+    assert (folds["mae"] > 0).all()
+
+
+def _training_frame(rows: int = 60) -> tuple[pd.DataFrame, pd.Series]:
+    rng = np.random.default_rng(7)
+    numeric = pd.DataFrame(
+        rng.normal(size=(rows, len(_model.NUM_FEATURES))), columns=_model.NUM_FEATURES
+    )
+    categorical = pd.DataFrame(
+        {
+            name: rng.choice([f"{name}_{i}" for i in range(12)], size=rows)
+            for name in _model.CAT_FEATURES
+        }
+    )
+    X = pd.concat([numeric, categorical], axis=1)
+    return X, pd.Series(numeric[_model.NUM_FEATURES[0]] + rng.normal(scale=0.1, size=rows))
+
+
+@pytest.mark.parametrize("mode", ["onehot", "rare", "target", "hash"])
+def test_importance_maps_back_to_base_features_for_every_encoding(mode: str) -> None:
+    X, y = _training_frame()
+    encodings = dict.fromkeys(_model.HIGH_CARDINALITY_FEATURES, mode)
+    pipeline = _model._build_pipeline(encodings)
+    pipeline.set_params(model__n_estimators=10)
+    pipeline.fit(X, y)
+
+    importance = _model.aggregated_feature_importance(pipeline)
+
+    assert set(importance.index) <= set(_model.NUM_FEATURES + _model.CAT_FEATURES)
+    assert set(_model.HIGH_CARDINALITY_FEATURES) <= set(importance.index)
+    assert importance.sum() == pytest.approx(1.0)
+
+
+def test_target_encoding_keeps_matrix_narrow() -> None:
+    X, y = _training_frame()
+    onehot = _model._build_pipeline().named_steps["pre"].fit_transform(X, y)
+    encodings = dict.fromkeys(_model.HIGH_CARDINALITY_FEATURES, "target")
+    target = _model._build_pipeline(encodings).named_steps["pre"].fit_transform(X, y)
+
+    assert target.shape[1] < onehot.shape[1]
+    assert isinstance(target, np.ndarray)
+
+
+def test_parse_encodings() -> None:
+    assert _model._parse_encodings(["hash", "director=target"]) == {
+        "director": "target",
+        "lead_actor": "hash",
+        "top_keyword": "hash",
+    }
+    with pytest.raises(ValueError, match="Unknown encoding"):
+        _model._parse_encodings(["director=ordinal"])
+    with pytest.raises(ValueError, match="not one of the categorical features"):
+        _model._parse_encodings(["runtime=hash"])
+
+
+def test_hgb_engine_splits_categoricals_natively() -> None:
+    X, y = _training_frame()
+    pipeline = _model._build_pipeline(engine="hgb")
+
+    metrics = _model._evaluate_model(pipeline, X, y, n_splits=3, test_size=0.3, random_state=0)
+
+    model = pipeline.named_steps["model"]
+    width = len(_model.NUM_FEATURES) + len(_model.CAT_FEATURES)
+    assert pipeline.named_steps["pre"].transform(X).shape == (len(X), width)
+    assert model.is_categorical_.tolist() == [False] * len(_model.NUM_FEATURES) + [True] * len(
+        _model.CAT_FEATURES
+    )
+    assert set(metrics) == {
+        "cv_r2_mean",
+        "cv_r2_std",
+        "cv_mae_mean",
+        "cv_mae_std",
+        "holdout_r2",
+        "holdout_mae",
+        "holdout_size",
+    }
+
+    importance = _model.aggregated_feature_importance(pipeline, X, y)
+    assert set(importance.index) == set(_model.NUM_FEATURES + _model.CAT_FEATURES)
+    assert importance.index[0] == _model.NUM_FEATURES[0]
+    with pytest.raises(ValueError, match="permutation importance"):
+        _model.aggregated_feature_importance(pipeline)
+
+
+def test_hgb_engine_accepts_compact_encodings() -> None:
+    X, y = _training_frame()
+    encodings = dict.fromkeys(_model.HIGH_CARDINALITY_FEATURES, "target")
+    pipeline = _model._build_pipeline(encodings, engine="hgb").fit(X, y)
+
+    native = len(_model.CAT_FEATURES) - len(_model.HIGH_CARDINALITY_FEATURES)
+    assert pipeline.named_steps["model"].is_categorical_.sum() == native
+
+
+def test_unknown_engine_is_rejected() -> None:
+    with pytest.raises(ValueError, match="Unknown engine"):
+        _model._build_pipeline(engine="svm")
+
+
+def test_tune_searches_only_the_requested_engines(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    searched: list[dict[str, Any]] = []
+
+    def fake_search(candidates: list[dict[str, Any]], *_args: Any, **_kwargs: Any) -> None:
+        searched.extend(candidates)
+
+    monkeypatch.setattr(_model, "TUNING_DIR", tmp_path)
+    monkeypatch.setattr(_model, "successive_halving", fake_search)
+    data_path = tmp_path / "movies_clean.csv"
+    data_path.write_text("id\n1\n", encoding="utf-8")
+    X, y = _training_frame()
+
+    _model._tune(X, y, data_path=data_path, n_jobs=1, eta=3, cache=FoldCache(), engines=["hgb"])
+
+    assert searched and {params["engine"] for params in searched} == {"hgb"}
@@ -18,58 +18,66 @@ _clean = cast(Any, importlib.util.module_from_spec(_SPEC))
 sys.modules[_SPEC.name] = _clean
 _SPEC.loader.exec_module(_clean)  # type: ignore[arg-type]
 
+# The per-value helpers the cleaning step used to run, kept as benchmark baselines.
+_LEGACY_PATH = Path(__file__).resolve().parents[1] / "benchmarks" / "_legacy.py"
+_LEGACY_SPEC = importlib.util.spec_from_file_location("legacy_helpers", _LEGACY_PATH)
+if _LEGACY_SPEC is None or _LEGACY_SPEC.loader is None:
+    raise RuntimeError("Failed to load legacy helpers spec")
+_legacy = cast(Any, importlib.util.module_from_spec(_LEGACY_SPEC))
+_LEGACY_SPEC.loader.exec_module(_legacy)  # type: ignore[arg-type]
+
 
 def test_names_from_json_extracts_strings() -> None:
     payload = '[{"name": "Action"}, {"name": "Drama"}, {"id": 5}]'
-    assert _clean._names_from_json(payload) == ["Action", "Drama"]
+    assert _legacy.names_from_json(payload) == ["Action", "Drama"]
 
 
 def test_codes_from_json_factory() -> None:
-    extractor = _clean._codes_from_json("iso_639_1")
+    extractor = _legacy.codes_from_json("iso_639_1")
     payload = '[{"iso_639_1": "en"}, {"iso_639_1": "fr"}, {"other": "xx"}]'
     assert extractor(payload) == ["en", "fr"]
 
 
 def test_extract_director_falls_back_to_unknown() -> None:
     payload = '[{"job": "Writer", "name": "Someone"}]'
-    assert _clean._extract_director(payload) == "Unknown"
+    assert _legacy.extract_director(payload) == "Unknown"
     payload = '[{"job": "Director", "name": "Greta Gerwig"}]'
-    assert _clean._extract_director(payload) == "Greta Gerwig"
+    assert _legacy.extract_director(payload) == "Greta Gerwig"
 
 
 def test_pick_if_present_returns_default_when_missing() -> None:
-    picker = _clean._pick_if_present(1, default="N/A")
+    picker = _legacy.pick_if_present(1, default="N/A")
     assert picker(["Lead", "Support"]) == "Support"
     assert picker(["Lead"]) == "N/A"
 
 
 def test_take_first_handles_non_lists() -> None:
-    taker = _clean._take_first(3)
+    taker = _legacy.take_first(3)
     assert taker(["a", "b", "c", "d"]) == ["a", "b", "c"]
     assert taker("not-a-list") == []
 
 
 def test_decade_label_handles_missing_values() -> None:
-    assert _clean._decade_label(1995) == "1990s"
-    assert _clean._decade_label(np.nan) == "Unknown"
+    assert _legacy.decade_label(1995) == "1990s"
+    assert _legacy.decade_label(np.nan) == "Unknown"
 
 
 def test_budget_category_boundaries() -> None:
-    assert _clean._budget_category(5_000_000) == "low"
-    assert _clean._budget_category(25_000_000) == "medium"
-    assert _clean._budget_category(100_000_000) == "high"
+    assert _legacy.budget_category(5_000_000) == "low"
+    assert _legacy.budget_category(25_000_000) == "medium"
+    assert _legacy.budget_category(100_000_000) == "high"
 
 
 def test_vote_count_bucket_boundaries() -> None:
-    assert _clean._vote_count_bucket(100) == "emerging"
-    assert _clean._vote_count_bucket(1_000) == "established"
-    assert _clean._vote_count_bucket(5_000) == "blockbuster"
+    assert _legacy.vote_count_bucket(100) == "emerging"
+    assert _legacy.vote_count_bucket(1_000) == "established"
+    assert _legacy.vote_count_bucket(5_000) == "blockbuster"
 
 
 def test_runtime_bucket_categories() -> None:
-    assert _clean._runtime_bucket(80) == "short"
-    assert _clean._runtime_bucket(120) == "extended"
-    assert _clean._runtime_bucket(170) == "epic"
+    assert _legacy.runtime_bucket(80) == "short"
+    assert _legacy.runtime_bucket(120) == "extended"
+    assert _legacy.runtime_bucket(170) == "epic"
 
 
 def test_profit_simple_difference() -> None:
@@ -115,3 +123,142 @@ def test_log1p_nonnegative_clamps_negative_values() -> None:
     result = _clean._log1p_nonnegative(series)
     expected = pd.Series([np.log1p(0), np.log1p(0), np.log1p(99)])
     pd.testing.assert_series_equal(result, expected)
+
+
+@pytest.mark.parametrize("backend", sorted(_clean.JSON_BACKENDS))
+def test_decode_json_columns_matches_per_column_helpers(backend: str) -> None:
+    raw = pd.DataFrame(
+        {
+            "genres": ['[{"name": "Action"}, {"name": "Drama"}]', ""],
+            "keywords": ['[{"name": "heist"}]', None],
+            "production_companies": ['[{"name": ""}, {"name": "Studio"}]', "[]"],
+            "production_countries": ['[{"iso_3166_1": "US"}]', "[]"],
+            "spoken_languages": ["[]", '[{"iso_639_1": "fr"}]'],
+            "original_language": ["en", "xx"],
+            "crew": ['[{"job": "Director", "name": "Ava"}]', '[{"job": "Writer", "name": "Bo"}]'],
+            "cast": ['[{"name": "A"}, {"name": "B"}, {"name": "C"}, {"name": "D"}]', "[]"],
+        }
+    )
+
+    decoded = _clean._decode_json_columns(raw, loads=_clean._json_loads(backend))
+
+    assert decoded["genres_list"].tolist() == [["Action", "Drama"], []]
+    assert decoded["genre_count"].tolist() == [2, 0]
+    assert decoded["primary_genre"].tolist() == ["Action", "Unknown"]
+    assert decoded["top_keyword"].tolist() == ["heist", "None"]
+    assert decoded["primary_company"].tolist() == ["Studio", "Unknown"]
+    assert decoded["primary_country"].tolist() == ["US", "Unknown"]
+    assert decoded["primary_language"].tolist() == ["en", "fr"]
+    assert decoded["director"].tolist() == ["Ava", "Unknown"]
+    assert decoded["top_cast"].tolist() == [["A", "B", "C"], []]
+    assert decoded["supporting_actor"].tolist() == ["B", "Unknown"]
+    assert decoded["ensemble_size"].tolist() == [4, 0]
+
+
+def test_json_loads_rejects_unknown_backend() -> None:
+    with pytest.raises(ValueError, match="Unknown JSON backend"):
+        _clean._json_loads("yaml")
+
+
+def _raw_movies() -> pd.DataFrame:
+    genres = '[{"name": "Action"}]'
+    return pd.DataFrame(
+        {
+            "id": [1, 2, 3, 4, 5],
+            "title": ["A", "B, the sequel", "C", "D", "E"],
+            "original_title": ["A", "B", "C", "D", "E"],
+            "status": ["Released"] * 5,
+            "original_language": ["en", "fr", "en", "ja", "en"],
+            "release_date": ["1999-01-02", "", "2004-05-06", "2011-07-08", "1987-09-10"],
+            "budget": [10_000_000, 20_000_000, None, 90_000_000, 1_000_000],
+            "revenue": [30_000_000, 0, 5_000_000, 80_000_000, 4_000_000],
+            "runtime": [95.0, 100.0, 130.0, 160.0, 85.0],
+            "vote_average": [6.5, 7.0, 5.5, 8.1, 6.0],
+            "vote_count": [100, 600, 2_500, 50, 700],
+            "popularity": [10.5, 3.2, 7.7, 1.1, 2.2],
+            "genres": [genres, "[]", genres, "", genres],
+            "keywords": ["[]"] * 5,
+            "production_companies": ['[{"name": "Studio"}]'] * 5,
+            "production_countries": ['[{"iso_3166_1": "US"}]'] * 5,
+            "spoken_languages": ["[]"] * 5,
+            "crew": ['[{"job": "Director", "name": "Ava"}]'] * 5,
+            "cast": ['[{"name": "Lead"}]'] * 5,
+            "overview": ["Line one\nline two", "Plain", 'Has "quotes"', "", "x"],
+        }
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 10])
+def test_streaming_clean_matches_in_memory_bytes(tmp_path: Path, chunk_size: int) -> None:
+    raw_path = tmp_path / "movies_raw.csv"
+    _raw_movies().to_csv(raw_path, index=False)
+    full_path = tmp_path / "full.csv"
+    streamed_path = tmp_path / "streamed.csv"
+
+    df = _clean.clean_movie_data(data_in=raw_path, data_out=full_path)
+    rows = _clean.clean_movie_data_streaming(
+        chunk_size=chunk_size, data_in=raw_path, data_out=streamed_path
+    )
+
+    assert rows == len(df) == 4
+    assert streamed_path.read_bytes() == full_path.read_bytes()
+
+
+def test_parallel_clean_preserves_row_order_and_bytes(tmp_path: Path) -> None:
+    raw_path = tmp_path / "movies_raw.csv"
+    _raw_movies().to_csv(raw_path, index=False)
+    serial_path = tmp_path / "serial.csv"
+    parallel_path = tmp_path / "parallel.csv"
+
+    _clean.clean_movie_data(data_in=raw_path, data_out=serial_path)
+    df = _clean.clean_movie_data(workers=2, shard_size=2, data_in=raw_path, data_out=parallel_path)
+
+    assert df["id"].tolist() == [1, 3, 4, 5]
+    assert parallel_path.read_bytes() == serial_path.read_bytes()
+
+
+def test_incremental_clean_matches_full_rebuild(tmp_path: Path) -> None:
+    raw_path = tmp_path / "movies_raw.csv"
+    out_path = tmp_path / "incremental.csv"
+    full_path = tmp_path / "full.csv"
+    raw = _raw_movies()
+    raw.to_csv(raw_path, index=False)
+
+    first = _clean.clean_movie_data_incremental(data_in=raw_path, data_out=out_path)
+    # The full rebuild counts the rows it wrote; one raw row has no release date.
+    assert first["inserted"] == len(pd.read_csv(out_path)) == 4
+
+    raw.loc[0, "title"] = "A (Director's Cut)"
+    raw = raw[raw["id"] != 4]
+    extra = raw.iloc[[0]].assign(id=6, title="F")
+    pd.concat([raw.iloc[:2], extra, raw.iloc[2:]]).to_csv(raw_path, index=False)
+
+    stats = _clean.clean_movie_data_incremental(data_in=raw_path, data_out=out_path)
+    _clean.clean_movie_data(data_in=raw_path, data_out=full_path)
+
+    assert stats == {"inserted": 1, "modified": 1, "deleted": 1, "unchanged": 3}
+    assert out_path.read_bytes() == full_path.read_bytes()
+
+
+@pytest.mark.parametrize(
+    ("argv", "message"),
+    [
+        (["--chunk-size", "0"], "--chunk-size must be a positive number"),
+        (["--chunk-size", "-5"], "--chunk-size must be a positive number"),
+        (["--workers", "-2"], "--workers must be 0 (one per CPU core)"),
+    ],
+)
+def test_main_rejects_non_positive_sizes(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    argv: list[str],
+    message: str,
+) -> None:
+    monkeypatch.setenv("MOVIE_METRICS_FILE", str(tmp_path / "steps.jsonl"))
+    monkeypatch.setattr(sys, "argv", ["01_clean_data.py", *argv])
+    with pytest.raises(SystemExit) as exc:
+        _clean.main()
+
+    assert exc.value.code == 2
+    assert message in capsys.readouterr().err
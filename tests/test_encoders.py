@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+# pylint: disable=protected-access
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import StandardScaler
+
+import encoders
+from encoders import ENCODINGS, HashingEncoder, base_feature_names, categorical_encoder
+
+
+def test_hashing_encoder_is_dense_and_named_per_column() -> None:
+    X = np.array([["a", "x"], ["b", "x"], ["a", "y"]], dtype=object)
+    encoder = HashingEncoder(n_features=8).fit(X)
+
+    out = encoder.transform(X)
+
+    assert out.shape == (3, 16)
+    assert out.sum(axis=1).tolist() == [2.0, 2.0, 2.0]
+    np.testing.assert_array_equal(out[0], encoder.transform(X[:1])[0])
+    names = encoder.get_feature_names_out(["director", "lead_actor"])
+    assert names[0] == "director_hash0" and names[-1] == "lead_actor_hash7"
+
+
+def test_rare_encoding_groups_infrequent_categories() -> None:
+    X = np.array([["common"]] * 10 + [["once"], ["twice"], ["twice"]], dtype=object)
+    encoder = categorical_encoder("rare").fit(X)
+
+    assert encoder.get_feature_names_out(["director"]).tolist() == [
+        "director_common",
+        "director_infrequent_sklearn",
+    ]
+
+
+def test_every_encoding_is_constructible_and_unknown_modes_fail() -> None:
+    for mode in ENCODINGS:
+        assert categorical_encoder(mode) is not None
+    with pytest.raises(ValueError, match="Unknown encoding"):
+        categorical_encoder("ordinal")
+
+
+def test_base_feature_names_maps_encoded_columns_to_their_inputs() -> None:
+    X = pd.DataFrame(
+        {
+            "budget": [1.0, 2.0, 3.0],
+            "director": ["Ridley_Scott", "Jane", "Jane"],
+            "director_country": ["US", "UK", "US"],
+        }
+    )
+    pre = ColumnTransformer(
+        [
+            ("num", StandardScaler(), ["budget"]),
+            ("cat", categorical_encoder("onehot"), ["director", "director_country"]),
+        ]
+    ).fit(X)
+
+    assert base_feature_names(pre) == [
+        "budget",
+        "director",
+        "director",
+        "director_country",
+        "director_country",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("version", "release"),
+    [("1.7.2", (1, 7)), ("1.9rc1", (1, 9)), ("1.10.dev0", (1, 10)), ("2.0", (2, 0))],
+)
+def test_release_ignores_pre_and_dev_suffixes(version: str, release: tuple[int, int]) -> None:
+    assert encoders._release(version) == release
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+# pylint: disable=protected-access
+import importlib.util
+import sys
+from pathlib import Path
+from typing import Any, cast
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from encoders import base_feature_names
+
+_MODULE_PATH = Path(__file__).resolve().parents[1] / "scripts" / "07_explain_model.py"
+_SPEC = importlib.util.spec_from_file_location("explain_model", _MODULE_PATH)
+if _SPEC is None or _SPEC.loader is None:
+    raise RuntimeError("Failed to load explanation module spec")
+
+_explain = cast(Any, importlib.util.module_from_spec(_SPEC))
+sys.modules[_SPEC.name] = _explain
+_SPEC.loader.exec_module(_explain)  # type: ignore[arg-type]
+
+
+def _fitted(sparse: bool) -> tuple[Any, Any, np.ndarray, list[str]]:
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(
+        {
+            "signal": rng.normal(size=120),
+            "noise": rng.normal(size=120),
+            "genre": rng.choice(["Drama", "Action", "Comedy"], size=120),
+        }
+    )
+    y = 3 * X["signal"] + (X["genre"] == "Drama") * 2 + rng.normal(scale=0.1, size=120)
+    pre = ColumnTransformer(
+        [("num", StandardScaler(), ["signal", "noise"]), ("cat", OneHotEncoder(), ["genre"])],
+        sparse_threshold=1.0 if sparse else 0.0,
+    )
+    matrix = pre.fit_transform(X)
+    model = RandomForestRegressor(n_estimators=20, random_state=0).fit(matrix, y)
+    return model, matrix, y.to_numpy(), base_feature_names(pre)
+
+
+@pytest.mark.parametrize("sparse", [True, False])
+def test_contributions_add_up_to_predictions(sparse: bool) -> None:
+    model, matrix, _, groups = _fitted(sparse)
+    assert sp.issparse(matrix) == sparse
+
+    contributions = _explain.tree_contributions(model, matrix, groups, n_jobs=3)
+
+    assert list(contributions.columns) == ["prediction", "bias", "signal", "noise", "genre"]
+    np.testing.assert_allclose(contributions["prediction"], model.predict(matrix), atol=1e-6)
+    total = contributions.drop(columns="prediction").sum(axis=1)
+    np.testing.assert_allclose(total, contributions["prediction"])
+    assert contributions["signal"].abs().mean() > contributions["noise"].abs().mean()
+
+
+@pytest.mark.parametrize("sparse", [True, False])
+def test_grouped_permutation_importance_groups_one_hot_columns(sparse: bool) -> None:
+    model, matrix, y, groups = _fitted(sparse)
+
+    importance = _explain.grouped_permutation_importance(
+        model, matrix, y, groups, repeats=3, n_jobs=2
+    )
+
+    assert importance["base_feature"].tolist()[:2] == ["signal", "genre"]
+    assert set(importance["base_feature"]) == {"signal", "noise", "genre"}
+    noise = importance.set_index("base_feature").loc["noise", "importance_mean"]
+    assert abs(noise) < 0.05
+
+
+def test_permute_columns_moves_only_the_group() -> None:
+    matrix = np.arange(12, dtype=float).reshape(4, 3)
+    order = np.array([3, 2, 1, 0])
+
+    dense = _explain._permute_columns(matrix, np.array([1, 2]), order)
+    sparse = _explain._permute_columns(sp.csr_matrix(matrix), np.array([1, 2]), order)
+
+    np.testing.assert_array_equal(dense[:, 0], matrix[:, 0])
+    np.testing.assert_array_equal(dense[:, 1:], matrix[order][:, 1:])
+    np.testing.assert_array_equal(sparse.toarray(), dense)
+
+
+def test_contributions_need_a_tree_ensemble() -> None:
+    X = np.random.default_rng(0).normal(size=(50, 2))
+    model = HistGradientBoostingRegressor(max_iter=5).fit(X, X[:, 0])
+
+    with pytest.raises(ValueError, match="tree ensemble"):
+        _explain.tree_contributions(model, X, ["a", "b"])
+
+
+def test_tree_chunks_accumulate_per_base_feature() -> None:
+    model, matrix, _, groups = _fitted(sparse=True)
+    indicator = sp.csr_matrix(
+        ([1.0, 1.0, 1.0, 1.0, 1.0], ([0, 1, 2, 3, 4], [0, 1, 2, 2, 2])), shape=(5, 3)
+    )
+    assert groups == ["signal", "noise", "genre", "genre", "genre"]
+
+    partial = _explain._tree_contributions(model.estimators_[:3], matrix, indicator)
+
+    assert partial.shape == (matrix.shape[0], 3)
+
+
+def test_permutation_importance_runs_the_forest_on_one_core(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    model, matrix, y, groups = _fitted(sparse=False)
+    model.set_params(n_jobs=-1)
+    seen: list[int] = []
+    score = _explain._permutation_scores
+
+    def spy(model: Any, *args: Any) -> np.ndarray:
+        seen.append(model.n_jobs)
+        return score(model, *args)
+
+    monkeypatch.setattr(_explain, "_permutation_scores", spy)
+    _explain.grouped_permutation_importance(model, matrix, y, groups, repeats=1, n_jobs=2)
+
+    assert seen == [1, 1, 1]
+    assert model.n_jobs == -1
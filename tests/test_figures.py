@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import figures
+from figures import FigureSpec, render_figures, slug, stored_digest
+
+
+def _shares() -> pd.DataFrame:
+    return pd.DataFrame(
+        {"Drama": [0.6, 0.5, 0.4], "Comedy": [0.4, 0.5, 0.6]},
+        index=pd.Index(["1990s", "2000s", "2010s"], name="decade"),
+    )
+
+
+def _tiers() -> pd.DataFrame:
+    return pd.DataFrame(
+        {"mean_roi": [2.5, 1.2, 0.4], "share_profitable": [0.7, 0.6, 0.5]},
+        index=pd.Index(["low", "medium", "high"], name="budget_category"),
+    )
+
+
+def _specs(directory: Path) -> list[FigureSpec]:
+    return [
+        FigureSpec(directory / "genres.png", "stacked_area", _shares(), {"title": "Genres"}),
+        FigureSpec(directory / "tiers" / "roi.png", "roi_bars", _tiers(), {"figsize": (13, 5)}),
+    ]
+
+
+def test_figures_are_rendered_once_and_skipped_while_unchanged(tmp_path: Path) -> None:
+    specs = _specs(tmp_path)
+
+    first = render_figures(specs)
+    modified = {spec.path: spec.path.stat().st_mtime_ns for spec in specs}
+    second = render_figures(specs)
+
+    assert set(first.values()) == {"rendered"}
+    assert set(second.values()) == {"unchanged"}
+    assert {spec.path: spec.path.stat().st_mtime_ns for spec in specs} == modified
+    assert stored_digest(specs[0].path) == specs[0].digest()
+    assert specs[0].path.read_bytes().startswith(b"\x89PNG")
+
+
+def test_changed_data_or_style_redraws_only_that_figure(tmp_path: Path) -> None:
+    genres, tiers = _specs(tmp_path)
+    render_figures([genres, tiers])
+
+    restyled = FigureSpec(genres.path, genres.kind, genres.data, {"title": "Genre mix"})
+    status = render_figures([restyled, tiers])
+    data = _tiers()
+    data.loc["high", "mean_roi"] = 0.5
+    updated = render_figures([restyled, FigureSpec(tiers.path, tiers.kind, data, tiers.style)])
+
+    assert status == {genres.path: "rendered", tiers.path: "unchanged"}
+    assert updated == {genres.path: "unchanged", tiers.path: "rendered"}
+    assert render_figures([restyled, tiers], force=True)[genres.path] == "rendered"
+
+
+def test_parallel_rendering_writes_every_figure(tmp_path: Path) -> None:
+    specs = _specs(tmp_path)
+
+    status = render_figures(specs, workers=2)
+
+    assert set(status.values()) == {"rendered"}
+    assert all(stored_digest(spec.path) == spec.digest() for spec in specs)
+
+
+def test_files_without_a_digest_are_treated_as_stale(tmp_path: Path) -> None:
+    path = tmp_path / "genres.png"
+    path.write_bytes(b"not a png")
+
+    assert stored_digest(path) is None
+    assert stored_digest(tmp_path / "missing.png") is None
+    assert render_figures([FigureSpec(path, "stacked_area", _shares())])[path] == "rendered"
+
+
+def test_invalid_specs_are_rejected(tmp_path: Path) -> None:
+    path = tmp_path / "a.png"
+
+    with pytest.raises(ValueError, match="Unknown figure kinds"):
+        render_figures([FigureSpec(path, "pie", _shares())])
+    with pytest.raises(ValueError, match="unique"):
+        render_figures([FigureSpec(path, "stacked_area", _shares())] * 2)
+
+
+def test_rendering_does_not_import_pyplot(tmp_path: Path) -> None:
+    script = (
+        "import sys; from pathlib import Path; import pandas as pd; import figures; "
+        f"figures.render_figures([figures.FigureSpec(Path({str(tmp_path / 'a.png')!r}), "
+        "'roi_bars', pd.DataFrame({'mean_roi': [1.0], 'share_profitable': [0.5]}))]); "
+        "assert 'matplotlib.pyplot' not in sys.modules"
+    )
+    scripts = Path(figures.__file__).parent
+
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=scripts)
+
+    assert (tmp_path / "a.png").exists()
+
+
+def test_slug_makes_labels_safe_for_file_names() -> None:
+    assert slug("United States of America") == "united-states-of-america"
+    assert slug("en") == "en"
+    assert slug("") == "none"
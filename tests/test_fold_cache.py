@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+# pylint: disable=protected-access
+import gc
+import os
+import warnings
+import weakref
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+import fold_cache
+from fold_cache import FoldCache, fit_and_score
+
+
+def _data() -> tuple[pd.DataFrame, pd.Series]:
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({"x": rng.normal(size=20), "genre": rng.choice(["A", "B", "C"], size=20)})
+    return X, pd.Series(X["x"] * 3)
+
+
+def _pre(sparse: bool = True) -> ColumnTransformer:
+    return ColumnTransformer(
+        [("num", StandardScaler(), ["x"]), ("cat", OneHotEncoder(), ["genre"])],
+        sparse_threshold=1.0 if sparse else 0.0,
+    )
+
+
+def test_memory_cache_fits_each_split_once() -> None:
+    X, y = _data()
+    cache = FoldCache()
+    train, test = np.arange(15), np.arange(15, 20)
+
+    first = cache.get(_pre(), X, y, train, test)
+    second = cache.get(_pre(), X, y, train, test)
+    other = cache.get(_pre(), X, y, np.arange(5, 20), np.arange(5))
+
+    assert first is second
+    assert other is not first
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert first.X_train.shape[0] == 15 and first.X_test.shape[0] == 5
+
+
+def test_get_many_prepares_each_distinct_split_once_in_workers(tmp_path: Path) -> None:
+    X, y = _data()
+    first, second = (np.arange(15), np.arange(15, 20)), (np.arange(5, 20), np.arange(5))
+    cache = FoldCache(tmp_path)
+
+    folds = cache.get_many(
+        [(_pre(), X, y, *first), (_pre(), X, y, *second), (_pre(), X, y, *first)], n_jobs=2
+    )
+
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert folds[0] is folds[2] and folds[1] is not folds[0]
+    assert len(list(tmp_path.iterdir())) == 2
+    assert cache.get(_pre(), X, y, *second) is folds[1]
+    expected = FoldCache().get(_pre(), X, y, *first)
+    np.testing.assert_allclose(folds[0].X_train.toarray(), expected.X_train.toarray())
+
+
+def test_disk_cache_is_memory_mapped_and_matches(tmp_path: Path) -> None:
+    X, y = _data()
+    train, test = np.arange(15), np.arange(15, 20)
+    for sparse in (True, False):
+        fresh = FoldCache(tmp_path).get(_pre(sparse), X, y, train, test)
+        cache = FoldCache(tmp_path)
+        cached = cache.get(_pre(sparse), X, y, train, test)
+
+        assert (cache.hits, cache.misses) == (1, 0)
+        assert sp.issparse(cached.X_train) == sparse
+        dense_train = cached.X_train.toarray() if sparse else cached.X_train
+        expected = fresh.X_train.toarray() if sparse else fresh.X_train
+        np.testing.assert_array_equal(dense_train, expected)
+        # Read-only views of the memory-mapped .npy files, not in-memory copies.
+        backing = cached.X_train.data if sparse else cached.X_train
+        assert not backing.flags.writeable and not backing.flags.owndata
+        transformed = cached.pre.transform(X.iloc[test])
+        np.testing.assert_array_equal(
+            transformed.toarray() if sparse else transformed,
+            cached.X_test.toarray() if sparse else cached.X_test,
+        )
+
+
+def test_cache_key_tracks_settings_and_data() -> None:
+    X, y = _data()
+    cache = FoldCache()
+    train, test = np.arange(15), np.arange(15, 20)
+    key = cache.key(_pre(), X, y, train, test)
+
+    assert cache.key(_pre(), X, y, train, test) == key
+    assert cache.key(_pre(sparse=False), X, y, train, test) != key
+    assert cache.key(_pre(), X.assign(x=X["x"] + 1), y, train, test) != key
+    assert cache.key(_pre(), X, y, np.arange(1, 16), test) != key
+
+
+def test_cache_key_tracks_library_and_encoder_versions(monkeypatch: pytest.MonkeyPatch) -> None:
+    X, y = _data()
+    cache = FoldCache()
+    train, test = np.arange(15), np.arange(15, 20)
+    key = cache.key(_pre(), X, y, train, test)
+
+    monkeypatch.setattr(fold_cache, "ENCODERS_VERSION", fold_cache.ENCODERS_VERSION + 1)
+    bumped = cache.key(_pre(), X, y, train, test)
+    monkeypatch.setattr(fold_cache.sklearn, "__version__", "99.0rc1")
+
+    assert bumped != key
+    assert cache.key(_pre(), X, y, train, test) not in {key, bumped}
+
+
+def test_disk_cache_evicts_least_recently_used_entries(tmp_path: Path) -> None:
+    X, y = _data()
+    splits = [(np.arange(start, start + 15), np.arange(15)) for start in range(3)]
+    FoldCache(tmp_path).get(_pre(), X, y, *splits[0])
+    entry_bytes = sum(path.stat().st_size for path in next(tmp_path.iterdir()).iterdir())
+    cache = FoldCache(tmp_path, max_bytes=2 * entry_bytes)
+
+    cache.get(_pre(), X, y, *splits[1])
+    first, second = (cache.key(_pre(), X, y, *split) for split in splits[:2])
+    os.utime(tmp_path / first, (1, 1))  # Used longest ago.
+    cache.get(_pre(), X, y, *splits[2])
+
+    remaining = {entry.name for entry in tmp_path.iterdir()}
+    assert first not in remaining and second in remaining and len(remaining) == 2
+
+    cache.clear()
+    assert not tmp_path.exists()
+    assert FoldCache(tmp_path).get(_pre(), X, y, *splits[1]) is not None
+
+
+def test_fit_and_score() -> None:
+    X = np.arange(10, dtype=float).reshape(-1, 1)
+    scores = fit_and_score(LinearRegression(), X[:8], X[:8, 0] * 2, X[8:], X[8:, 0] * 2)
+
+    assert scores["r2"] == 1.0
+    assert scores["mae"] < 1e-9
+    assert scores["fit_seconds"] >= 0 and scores["score_seconds"] >= 0
+
+
+def test_cache_does_not_keep_frames_alive() -> None:
+    X, y = _data()
+    cache = FoldCache()
+    cache.get(_pre(), X, y, np.arange(15), np.arange(15, 20))
+    frame = weakref.ref(X)
+
+    del X
+    gc.collect()
+
+    assert frame() is None
+
+
+def test_failed_disk_write_warns_unless_another_process_won(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    X, y = _data()
+    train, test = np.arange(15), np.arange(15, 20)
+
+    def disk_full(*_args: object, **_kwargs: object) -> None:
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(fold_cache.joblib, "dump", disk_full)
+    with pytest.warns(RuntimeWarning, match="No space left"):
+        FoldCache(tmp_path).get(_pre(), X, y, train, test)
+    monkeypatch.undo()
+
+    winner = FoldCache(tmp_path)
+    winner.get(_pre(), X, y, train, test)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        # The entry already exists, so the rename fails the way a lost race does.
+        winner._write(winner.key(_pre(), X, y, train, test), winner.get(_pre(), X, y, train, test))
+    assert not [entry for entry in tmp_path.iterdir() if entry.name.startswith(".")]
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from genre_analytics import GenreAnalytics
+
+
+def _movies() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "genres_list": [
+                ["Action", "Drama"],
+                ["Drama"],
+                [],
+                ["Comedy", "Drama", "Action"],
+                ["Action"],
+            ],
+            "decade": ["1990s", "1990s", "2000s", None, "2000s"],
+            "primary_country": ["US", "GB", "US", "US", "GB"],
+            "primary_language": "en",
+            "budget_category": pd.Categorical(
+                ["low", "high", "low", "low", "high"], categories=["low", "medium", "high"]
+            ),
+        }
+    )
+
+
+def test_incidence_is_csr_coded_by_genre_frequency() -> None:
+    engine = GenreAnalytics.from_frame(_movies())
+
+    assert engine.genres.tolist() == ["Action", "Drama", "Comedy"]
+    assert engine.indptr.tolist() == [0, 2, 3, 3, 6, 7]
+    assert engine.matrix().toarray().tolist() == [
+        [1, 1, 0],
+        [0, 1, 0],
+        [0, 0, 0],
+        [1, 1, 1],
+        [1, 0, 0],
+    ]
+
+
+def test_counts_match_an_exploded_groupby() -> None:
+    rng = np.random.default_rng(0)
+    names = np.array(["Action", "Drama", "Comedy", "Horror", "Family"])
+    df = pd.DataFrame(
+        {
+            "genres_list": [
+                list(rng.choice(names, size, replace=False)) for size in rng.integers(0, 4, 300)
+            ],
+            "decade": rng.choice(["1980s", "1990s", "2000s"], 300),
+            "primary_country": rng.choice(["US", "GB", "FR", None], 300),
+            "primary_language": rng.choice(["en", "fr"], 300),
+            "budget_category": rng.choice(["low", "medium", "high"], 300),
+        }
+    )
+    engine = GenreAnalytics.from_frame(df)
+    by = ["decade", "primary_country", "budget_category"]
+
+    expected = (
+        df.explode("genres_list")
+        .dropna(subset=["genres_list", *by])
+        .groupby([*by, "genres_list"])
+        .size()
+        .unstack(fill_value=0)
+    )
+    counts = engine.counts(by)
+
+    observed = counts.loc[expected.index, expected.columns]
+    assert (observed.to_numpy() == expected.to_numpy()).all()
+    assert counts.drop(index=expected.index).to_numpy().sum() == 0
+
+
+def test_shares_normalize_by_tags_or_movies() -> None:
+    engine = GenreAnalytics.from_frame(_movies())
+
+    by_tags = engine.shares(["decade"])
+    by_movies = engine.shares(["decade"], normalize="movies")
+
+    assert by_tags.sum(axis=1).tolist() == pytest.approx([1.0, 1.0])
+    assert by_movies.loc["1990s"].tolist() == pytest.approx([0.5, 1.0, 0.0])
+    assert by_movies.loc["2000s"].tolist() == pytest.approx([0.5, 0.0, 0.0])
+    assert engine.movie_counts(["decade"]).tolist() == [2, 2]
+    with pytest.raises(ValueError, match="normalize"):
+        engine.shares(normalize="budget")
+
+
+def test_cooccurrence_per_group_comes_from_one_product() -> None:
+    engine = GenreAnalytics.from_frame(_movies())
+
+    overall = engine.cooccurrence()
+    by_country = engine.cooccurrence(["primary_country"])
+
+    assert overall.loc["Action", "Drama"] == 2
+    assert np.diag(overall.to_numpy()).tolist() == engine.counts().iloc[0].tolist()
+    assert by_country.loc[("US", "Action"), "Drama"] == 2
+    assert by_country.loc[("GB", "Action"), "Drama"] == 0
+    assert by_country.index.names == ["primary_country", "genre"]
+    with pytest.raises(ValueError, match="Unknown dimensions"):
+        engine.counts(["studio"])
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+import instrumentation
+from instrumentation import instrumented, read_steps, step, summarize
+
+
+def _worker_step(rows: int) -> int:
+    with step("worker", rows=rows):
+        return os.getpid()
+
+
+def test_step_only_measures_outside_a_run(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.delenv(instrumentation.RUN_ENV, raising=False)
+    monkeypatch.setenv(instrumentation.METRICS_ENV, str(tmp_path / "steps.jsonl"))
+
+    with step("sleep", rows=3) as record:
+        time.sleep(0.01)
+
+    assert record.wall_seconds >= 0.01
+    assert record.rows == 3
+    assert not (tmp_path / "steps.jsonl").exists()
+
+
+def test_instrumented_run_logs_steps_from_workers_and_prints_a_summary(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    path = tmp_path / "steps.jsonl"
+
+    with instrumented("demo", path=path) as run:
+        with step("read_csv") as record:
+            record.rows = 10
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            pids = set(pool.map(_worker_step, [4, 6]))
+
+    assert instrumentation.RUN_ENV not in os.environ
+    records = read_steps(path, run)
+    assert [record["step"] for record in records][-1] == "total"
+    assert {record["pid"] for record in records if record["step"] == "worker"} == pids
+    assert all(record["run"] == run for record in records)
+    json.loads(path.read_text().splitlines()[0])
+
+    summary = summarize(records)
+    assert summary.loc["read_csv", "rows"] == 10
+    assert summary.loc["worker", "calls"] == 2
+    assert summary.loc["worker", "rows"] == 10
+    assert summary["peak_rss_mb"].notna().all()
+    output = capsys.readouterr().out
+    assert f"Step timings ({run}" in output
+    assert "read_csv" in output
+
+
+def test_profiler_hook_writes_collapsed_stacks(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv(instrumentation.PROFILE_ENV, "1")
+    path = tmp_path / "steps.jsonl"
+
+    with instrumented("demo", path=path) as run:
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            pass
+
+    lines = (tmp_path / f"{run}.folded").read_text().splitlines()
+    main_thread = [line.rsplit(" ", 1) for line in lines if line.startswith("MainThread;")]
+    assert main_thread
+    assert all(int(count) > 0 for _, count in main_thread)
+    assert any("test_profiler_hook_writes_collapsed_stacks" in stack for stack, _ in main_thread)
+
+
+def test_summary_does_not_reread_the_log_history(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    path = tmp_path / "steps.jsonl"
+    # A corrupt line from an old run would fail the summary if history were parsed.
+    path.write_text("not json\n")
+
+    with instrumented("demo", path=path):
+        with step("read_csv", rows=5):
+            pass
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            list(pool.map(_worker_step, [3]))
+
+    output = capsys.readouterr().out
+    assert "read_csv" in output
+    assert "worker" in output
+    assert path.read_text().startswith("not json\n")
+
+
+def test_large_logs_are_rotated_when_a_run_starts(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(instrumentation, "MAX_METRICS_BYTES", 100)
+    path = tmp_path / "steps.jsonl"
+    path.write_text("x" * 200)
+
+    with instrumented("demo", path=path) as run:
+        pass
+
+    assert (tmp_path / "steps.jsonl.1").read_text() == "x" * 200
+    assert [record["run"] for record in read_steps(path)] == [run]
+    assert not instrumentation.rotate_log(path, max_bytes=10_000)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+import model_artifact
+from model_artifact import (
+    METADATA_FILE,
+    MODEL_FILE,
+    ModelMetadata,
+    artifact_path,
+    data_fingerprint,
+    load_model_artifact,
+    save_model_artifact,
+)
+
+
+def _metadata(tmp_path: Path) -> ModelMetadata:
+    data = tmp_path / "train.csv"
+    data.write_text("x,y\n1,2\n", encoding="utf-8")
+    return ModelMetadata(
+        num_features=["x"],
+        cat_features=[],
+        target="y",
+        data_path=str(data),
+        data_sha256=data_fingerprint(data),
+        training_rows=1,
+        metrics={"holdout_r2": 0.5},
+    )
+
+
+def test_artifact_round_trip_memory_maps_arrays(tmp_path: Path) -> None:
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({"x": rng.normal(size=50)})
+    model = RandomForestRegressor(n_estimators=5, random_state=0).fit(X, X["x"] * 2)
+    meta = _metadata(tmp_path)
+
+    save_model_artifact(model, meta, tmp_path / "model")
+    loaded, loaded_meta = load_model_artifact(tmp_path / "model")
+
+    assert loaded_meta == meta
+    assert loaded_meta.features == ["x"]
+    np.testing.assert_array_equal(loaded.predict(X), model.predict(X))
+
+
+def test_load_rejects_other_artifact_versions(tmp_path: Path) -> None:
+    directory = tmp_path / "model"
+    save_model_artifact(object(), _metadata(tmp_path), directory)
+    metadata_path = artifact_path(directory) / METADATA_FILE
+    payload = json.loads(metadata_path.read_text(encoding="utf-8"))
+    payload["version"] = 0
+    metadata_path.write_text(json.dumps(payload), encoding="utf-8")
+
+    with pytest.raises(ValueError, match="version 0"):
+        load_model_artifact(directory)
+
+
+def test_load_missing_artifact_raises(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError):
+        load_model_artifact(tmp_path)
+
+
+def test_each_save_is_a_new_version_behind_one_pointer(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(model_artifact, "KEEP_VERSIONS", 2)
+    directory = tmp_path / "model"
+    meta = _metadata(tmp_path)
+
+    paths = [save_model_artifact({"model": index}, meta, directory) for index in range(3)]
+    loaded, _ = load_model_artifact(directory)
+
+    assert loaded == {"model": 2}
+    assert paths[-1] == artifact_path(directory) / MODEL_FILE
+    assert len({path.parent for path in paths}) == 3
+    # Versions beyond KEEP_VERSIONS are pruned; the current one always stays.
+    assert sorted(path.exists() for path in paths) == [False, True, True]
+    assert paths[-1].exists()
+
+
+def test_artifacts_saved_without_a_pointer_still_load(tmp_path: Path) -> None:
+    directory = tmp_path / "model"
+    save_model_artifact(["legacy"], _metadata(tmp_path), directory)
+    version = artifact_path(directory)
+    for name in (MODEL_FILE, METADATA_FILE):
+        (version / name).rename(directory / name)
+    (directory / model_artifact.CURRENT_FILE).unlink()
+
+    loaded, meta = load_model_artifact(directory)
+
+    assert loaded == ["legacy"]
+    assert meta.target == "y"
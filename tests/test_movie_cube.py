@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import movie_cube
+from movie_cube import MovieCube, load_cube, merge_cubes, read_cube, stream_cube
+
+
+def _movies(rows: int = 600, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    budget = rng.lognormal(17, 1, rows)
+    revenue = budget * rng.lognormal(0.3, 1, rows)
+    return pd.DataFrame(
+        {
+            "decade": rng.choice(["1990s", "2000s", "2010s"], rows),
+            "primary_genre": rng.choice(["Action", "Drama", "Comedy", None], rows),
+            "budget_category": rng.choice(["low", "medium", "high"], rows),
+            "primary_language": rng.choice(["en", "fr"], rows),
+            "runtime_bucket": rng.choice(["short", "standard"], rows),
+            "budget_millions": budget / 1e6,
+            "profit": revenue - budget,
+            "roi": (revenue - budget) / budget,
+            "is_profitable": revenue > budget,
+            "id": np.arange(rows),
+        }
+    )
+
+
+def test_rollups_match_groupby_on_the_rows() -> None:
+    df = _movies()
+    cube = MovieCube.build(df)
+
+    summary = cube.summary(
+        "profit", ["decade", "budget_category"], where={"primary_language": "en"}
+    )
+    rows = df[df["primary_language"] == "en"].groupby(["decade", "budget_category"])["profit"]
+
+    expected = rows.agg(["count", "mean", "std"])
+    assert summary.index.tolist() == expected.index.tolist()
+    assert summary[["count", "mean", "std"]].to_numpy() == pytest.approx(expected.to_numpy())
+    assert summary["median"].to_numpy() == pytest.approx(rows.median().to_numpy(), rel=0.011)
+    assert cube.rollup()["count"].tolist() == [len(df)]
+    assert cube.rollup(["primary_genre"])["count"].sum() == len(df)
+
+
+def test_merged_chunk_cubes_equal_one_build() -> None:
+    df = _movies()
+    whole = MovieCube.build(df)
+
+    merged = MovieCube.build(df.iloc[:250]).merge(MovieCube.build(df.iloc[250:]))
+
+    pd.testing.assert_frame_equal(
+        merged.summary("roi", ["runtime_bucket"]), whole.summary("roi", ["runtime_bucket"])
+    )
+    quantiles = merged.quantiles("budget_millions", ["decade"], q=(0.1, 0.9))
+    pd.testing.assert_frame_equal(
+        quantiles, whole.quantiles("budget_millions", ["decade"], q=(0.1, 0.9))
+    )
+
+
+def test_queries_reject_unknown_names() -> None:
+    cube = MovieCube.build(_movies(50))
+
+    with pytest.raises(ValueError, match="Unknown dimensions"):
+        cube.rollup(["studio"])
+    with pytest.raises(ValueError, match="Quantiles"):
+        cube.quantiles("is_profitable")
+
+
+def test_load_cube_reuses_the_saved_cube_until_the_data_changes(tmp_path: Path) -> None:
+    path = tmp_path / "movies_clean.csv"
+    _movies(100).to_csv(path, index=False)
+    directory = tmp_path / "cube"
+
+    _, first = load_cube(path, directory=directory)
+    cube, second = load_cube(path, directory=directory)
+    _movies(120, seed=1).to_csv(path, index=False)
+    rebuilt, third = load_cube(path, directory=directory)
+
+    assert (first, second, third) == (True, False, True)
+    assert (directory / movie_cube.CUBE_FILE).exists()
+    assert cube.rollup()["count"].tolist() == [100]
+    assert rebuilt.rollup()["count"].tolist() == [120]
+    with pytest.raises(ValueError, match="missing required columns: roi"):
+        _movies(10).drop(columns="roi").to_csv(path, index=False)
+        load_cube(path, directory=None)
+
+
+def test_streamed_and_sharded_cubes_equal_one_build(tmp_path: Path) -> None:
+    df = _movies(400)
+    whole = MovieCube.build(df)
+    path = tmp_path / "movies_clean.csv"
+    df.to_csv(path, index=False)
+    for shard, rows in enumerate((df.iloc[:150], df.iloc[150:])):
+        MovieCube.build(rows).save(tmp_path / f"shard-{shard}.cube")
+
+    streamed = stream_cube(path, chunk_size=64)
+    sharded = merge_cubes(read_cube(tmp_path / f"shard-{shard}.cube") for shard in (0, 1))
+
+    def by_label(cube: MovieCube) -> pd.DataFrame:
+        # Streaming reads the tier with its ordered dtype; compare by label.
+        summary = cube.summary("roi", ["budget_category"])
+        return summary.set_axis(summary.index.astype(str).tolist()).sort_index()
+
+    pd.testing.assert_frame_equal(by_label(streamed), by_label(whole))
+    pd.testing.assert_frame_equal(by_label(sharded), by_label(whole))
+    with pytest.raises(ValueError, match="No cubes"):
+        merge_cubes([])
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from movie_data import (
+    CLEAN_CSV,
+    CLEAN_FORMAT_ENV,
+    CLEAN_PARQUET,
+    CleanDatasetWriter,
+    clean_data_path,
+    iter_clean_batches,
+    load_clean_columns,
+    read_clean_dataset,
+    write_clean_dataset,
+)
+
+
+def _cleaned_frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "id": [1, 2, 3],
+            "title": ["A", "B", "C"],
+            "primary_genre": ["Drama", "Action", "Drama"],
+            "genres_list": [["Drama"], ["Action", "Drama"], []],
+            "budget": [1.0, None, 3.0],
+            "is_profitable": [True, False, True],
+            "overview": ["text", None, "more"],
+        }
+    )
+
+
+def test_parquet_round_trip_preserves_types(tmp_path: Path) -> None:
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "movies_clean.parquet"
+
+    write_clean_dataset(_cleaned_frame(), path)
+    loaded = read_clean_dataset(path)
+
+    assert loaded["genres_list"].tolist() == [["Drama"], ["Action", "Drama"], []]
+    assert isinstance(loaded["primary_genre"].dtype, pd.CategoricalDtype)
+    assert loaded["budget"].isna().tolist() == [False, True, False]
+    assert loaded["is_profitable"].tolist() == [True, False, True]
+
+
+def test_parquet_writer_appends_chunks_as_row_groups(tmp_path: Path) -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "movies_clean.parquet"
+    frame = _cleaned_frame()
+
+    with CleanDatasetWriter(path) as writer:
+        writer.write(frame.iloc[:0])
+        writer.write(frame.iloc[:2])
+        writer.write(frame.iloc[2:])
+
+    assert writer.rows == 3
+    assert pq.ParquetFile(path).metadata.num_row_groups == 2
+    assert read_clean_dataset(path)["id"].tolist() == [1, 2, 3]
+
+
+def test_load_clean_columns_projects_and_types_csv(tmp_path: Path) -> None:
+    path = tmp_path / "movies_clean.csv"
+    write_clean_dataset(_cleaned_frame(), path)
+
+    df, report = load_clean_columns(path, {"primary_genre", "genres_list", "not_a_column"})
+
+    assert list(df.columns) == ["primary_genre", "genres_list"]
+    assert isinstance(df["primary_genre"].dtype, pd.CategoricalDtype)
+    assert df["genres_list"].tolist() == [["Drama"], ["Action", "Drama"], []]
+    assert (report.columns_loaded, report.columns_total) == (2, 7)
+    assert "Loaded 2 of 7 columns" in report.describe()
+    assert report.disk_bytes_read == report.disk_bytes_total == path.stat().st_size
+    assert "column pruning saves no I/O" in report.describe()
+
+
+def test_load_clean_columns_reports_parquet_bytes_skipped(tmp_path: Path) -> None:
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "movies_clean.parquet"
+    write_clean_dataset(_cleaned_frame(), path)
+
+    df, report = load_clean_columns(path, ["budget", "id"])
+
+    assert list(df.columns) == ["id", "budget"]
+    assert report.disk_bytes_read is not None and report.disk_bytes_total is not None
+    assert 0 < report.disk_bytes_read < report.disk_bytes_total
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_iter_clean_batches_streams_typed_projection(tmp_path: Path, suffix: str) -> None:
+    if suffix == ".parquet":
+        pytest.importorskip("pyarrow")
+    path = tmp_path / f"movies_clean{suffix}"
+    write_clean_dataset(_cleaned_frame(), path)
+
+    batches = list(iter_clean_batches(path, ["genres_list", "primary_genre", "id"], batch_size=2))
+
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert list(batches[0].columns) == ["id", "primary_genre", "genres_list"]
+    assert isinstance(batches[0]["primary_genre"].dtype, pd.CategoricalDtype)
+    combined = pd.concat(batches, ignore_index=True)
+    assert combined["genres_list"].tolist() == [["Drama"], ["Action", "Drama"], []]
+
+
+def test_clean_data_path_never_guesses_between_formats(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv(CLEAN_FORMAT_ENV, raising=False)
+    assert clean_data_path() == CLEAN_CSV
+
+    CLEAN_PARQUET.parent.mkdir(parents=True)
+    CLEAN_PARQUET.touch()
+    assert clean_data_path() == CLEAN_PARQUET
+
+    CLEAN_CSV.touch()
+    with pytest.raises(ValueError, match="--format"):
+        clean_data_path()
+    assert clean_data_path("csv") == CLEAN_CSV
+    monkeypatch.setenv(CLEAN_FORMAT_ENV, "parquet")
+    assert clean_data_path() == CLEAN_PARQUET
+    with pytest.raises(ValueError, match="Unknown output format"):
+        clean_data_path("json")
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from quantile_sketch import grouped_quantiles, key_values, sketch_keys
+
+
+def test_keys_keep_order_and_relative_accuracy() -> None:
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.lognormal(0, 3, 2_000), -rng.lognormal(0, 1, 500), [0.0]])
+
+    keys = sketch_keys(values, 0.02)
+    approx = key_values(keys, 0.02)
+
+    order = np.argsort(values)
+    assert (np.diff(keys[order]) >= 0).all()
+    nonzero = values != 0
+    assert np.abs(approx[nonzero] / values[nonzero] - 1).max() <= 0.02
+    assert approx[~nonzero].tolist() == [0.0]
+    with pytest.raises(ValueError, match="accuracy"):
+        sketch_keys(values, 1.5)
+
+
+def test_grouped_quantiles_merge_pairs_and_match_exact_ranks() -> None:
+    rng = np.random.default_rng(1)
+    values = rng.normal(50, 20, 3_000)
+    groups = rng.integers(0, 2, len(values))
+    keys = sketch_keys(values)
+    # Split every group's values over two duplicate pairs to exercise the merge.
+    pairs = np.concatenate([groups, groups])
+    counts = np.concatenate([np.ones(len(values)), np.ones(len(values))]).astype(int)
+
+    result = grouped_quantiles(pairs, np.concatenate([keys, keys]), counts, 3, [0.0, 0.5, 0.9])
+
+    for group in (0, 1):
+        ordered = np.sort(values[groups == group])
+        exact = np.quantile(ordered, [0.0, 0.5, 0.9])
+        assert result[group] == pytest.approx(exact, rel=0.011)
+    assert np.isnan(result[2]).all()
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+# pylint: disable=protected-access
+import importlib.util
+import json
+import sys
+import threading
+import urllib.error
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, cast
+
+import pandas as pd
+import pytest
+
+_MODULE_PATH = Path(__file__).resolve().parents[1] / "scripts" / "00_refresh_raw.py"
+_SPEC = importlib.util.spec_from_file_location("refresh_raw", _MODULE_PATH)
+if _SPEC is None or _SPEC.loader is None:
+    raise RuntimeError("Failed to load refresh module spec")
+
+_refresh = cast(Any, importlib.util.module_from_spec(_SPEC))
+sys.modules[_SPEC.name] = _refresh
+_SPEC.loader.exec_module(_refresh)  # type: ignore[arg-type]
+
+
+class _Source:
+    """A file served by ``_Handler`` with an ETag derived from its version."""
+
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+        self.version = 1
+        self.cut_after: int | None = None
+        self.requests: list[dict[str, str]] = []
+
+    @property
+    def etag(self) -> str:
+        return f'"v{self.version}"'
+
+    def update(self, body: bytes) -> None:
+        self.body = body
+        self.version += 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    sources: dict[str, _Source] = {}
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        source = self.sources.get(self.path)
+        if source is None:
+            self.send_error(404)
+            return
+        source.requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == source.etag:
+            self.send_response(304)
+            self.send_header("ETag", source.etag)
+            self.end_headers()
+            return
+
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range", source.etag) == source.etag:
+            start = int(range_header.removeprefix("bytes=").rstrip("-"))
+        body = source.body[start:]
+        self.send_response(206 if start else 200)
+        self.send_header("ETag", source.etag)
+        self.send_header("Content-Length", str(len(body)))
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{len(source.body) - 1}/*")
+        self.end_headers()
+        if source.cut_after is not None:
+            # Simulate a dropped connection once, part way through the body.
+            self.wfile.write(body[: source.cut_after])
+            source.cut_after = None
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server() -> Iterator[tuple[str, dict[str, _Source]]]:
+    sources: dict[str, _Source] = {}
+    handler = type("Handler", (_Handler,), {"sources": sources})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{httpd.server_port}", sources
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_unchanged_sources_are_not_downloaded_again(server, tmp_path: Path) -> None:
+    base, sources = server
+    sources["/movies.csv"] = _Source(b"id,title\n1,A\n")
+    sources["/credits.csv"] = _Source(b"movie_id,cast\n1,[]\n")
+    urls = {"movies": f"{base}/movies.csv", "credits": f"{base}/credits.csv"}
+
+    first = _refresh.fetch_sources(urls, tmp_path)
+    second = _refresh.fetch_sources(urls, tmp_path)
+    sources["/movies.csv"].update(b"id,title\n1,B\n")
+    third = _refresh.fetch_sources(urls, tmp_path)
+
+    assert {name: result.status for name, result in first.items()} == {
+        "movies": "downloaded",
+        "credits": "downloaded",
+    }
+    assert {name: result.status for name, result in second.items()} == {
+        "movies": "not_modified",
+        "credits": "not_modified",
+    }
+    assert second["movies"].bytes_received == 0
+    assert third["movies"].status == "downloaded"
+    assert third["credits"].status == "not_modified"
+    assert (tmp_path / "movies.csv").read_bytes() == b"id,title\n1,B\n"
+    assert json.loads((tmp_path / "movies.meta.json").read_text())["etag"] == '"v2"'
+
+
+def test_interrupted_download_resumes_from_the_partial_file(server, tmp_path: Path) -> None:
+    base, sources = server
+    body = bytes(range(256)) * 400
+    source = sources["/credits.csv"] = _Source(body)
+    source.cut_after = 30_000
+
+    result = _refresh.fetch_source("credits", f"{base}/credits.csv", tmp_path, backoff=0)
+
+    assert result.status == "resumed"
+    assert result.bytes_received == len(body) - 30_000
+    assert (tmp_path / "credits.csv").read_bytes() == body
+    assert not (tmp_path / "credits.csv.part").exists()
+    assert source.requests[1]["Range"] == "bytes=30000-"
+    assert source.requests[1]["If-Range"] == '"v1"'
+
+
+def test_partial_download_restarts_when_the_source_changed(server, tmp_path: Path) -> None:
+    base, sources = server
+    source = sources["/movies.csv"] = _Source(b"x" * 10_000)
+    source.cut_after = 4_000
+    with pytest.raises(ConnectionError):
+        _refresh.fetch_source("movies", f"{base}/movies.csv", tmp_path, retries=0)
+    assert (tmp_path / "movies.csv.part").stat().st_size == 4_000
+
+    source.update(b"y" * 9_000)
+    result = _refresh.fetch_source("movies", f"{base}/movies.csv", tmp_path)
+
+    assert result.status == "downloaded"
+    assert (tmp_path / "movies.csv").read_bytes() == b"y" * 9_000
+
+
+def test_missing_sources_fail_without_retrying(server, tmp_path: Path) -> None:
+    base, _ = server
+
+    with pytest.raises(urllib.error.HTTPError):
+        _refresh.fetch_source("movies", f"{base}/missing.csv", tmp_path, backoff=10)
+
+
+def test_offline_mode_uses_only_the_cache(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError, match="not cached"):
+        _refresh.fetch_sources({"movies": "http://unused"}, tmp_path, offline=True)
+
+    (tmp_path / "movies.csv").write_text("id\n1\n")
+    result = _refresh.fetch_sources({"movies": "http://unused"}, tmp_path, offline=True)
+
+    assert result["movies"].status == "cached"
+
+
+def _write_dumps(tmp_path: Path, rows: int = 3) -> tuple[Path, Path]:
+    movies = pd.DataFrame(
+        {
+            "id": range(1, rows + 1),
+            "title": [f"Movie {i}" for i in range(1, rows + 1)],
+            "original_title": "x",
+            "original_language": "en",
+            "status": "Released",
+            "release_date": "2001-01-01",
+            "budget": [0 if i % 5 == 0 else 10 for i in range(rows)],
+            "revenue": 30,
+            "runtime": [50 if i % 7 == 3 else 100 for i in range(rows)],
+            "vote_average": 6.0,
+            "vote_count": 100,
+            "popularity": [float((i * 37) % rows) for i in range(rows)],
+            "genres": "[]",
+            "keywords": "[]",
+            "production_companies": "[]",
+            "production_countries": "[]",
+            "spoken_languages": "[]",
+            "tagline": "",
+            "overview": "",
+            "homepage": "",
+        }
+    )
+    # Credits come in a different order and miss every eleventh movie.
+    credit_ids = [i for i in range(rows, 0, -1) if i % 11 != 4]
+    credits = pd.DataFrame(
+        {
+            "movie_id": credit_ids,
+            "title": "x",
+            "cast": [f'[{{"name": "Actor {i}"}}]' for i in credit_ids],
+            "crew": [f'[{{"name": "Crew {i}"}}]' for i in credit_ids],
+        }
+    )
+    movies.to_csv(tmp_path / "movies.csv", index=False)
+    credits.to_csv(tmp_path / "credits.csv", index=False)
+    return tmp_path / "movies.csv", tmp_path / "credits.csv"
+
+
+def test_curate_merges_cached_files_and_applies_filters(tmp_path: Path) -> None:
+    curated = _refresh.curate(*_write_dumps(tmp_path), max_rows=2)
+
+    assert curated.columns.tolist() == _refresh.COLUMNS
+    assert curated["title"].tolist() == ["Movie 3", "Movie 2"]
+    assert curated["cast"].tolist() == ['[{"name": "Actor 3"}]', '[{"name": "Actor 2"}]']
+
+
+@pytest.mark.parametrize("max_rows", [None, 20])
+def test_streaming_curate_matches_the_in_memory_merge(tmp_path: Path, max_rows) -> None:
+    movies, credits = _write_dumps(tmp_path, rows=100)
+
+    expected = _refresh.curate(movies, credits, max_rows=max_rows)
+    streamed = _refresh.curate(movies, credits, max_rows=max_rows, chunk_size=7)
+
+    assert len(expected) == (max_rows or 63)
+    pd.testing.assert_frame_equal(streamed, expected)
+
+
+def test_negative_max_rows_are_rejected(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    with pytest.raises(ValueError, match="max_rows"):
+        _refresh.curate(*_write_dumps(tmp_path), max_rows=-1)
+
+    monkeypatch.setenv("MOVIE_METRICS_FILE", str(tmp_path / "steps.jsonl"))
+    monkeypatch.setattr(sys, "argv", ["00_refresh_raw.py", "--offline", "--max-rows", "-5"])
+    with pytest.raises(SystemExit) as exc:
+        _refresh.main()
+
+    assert exc.value.code == 2
+    assert "--max-rows must be 0 (no cap)" in capsys.readouterr().err
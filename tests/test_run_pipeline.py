@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from run_pipeline import Stage, run_pipeline
+
+_COPY_SCRIPT = """
+import sys
+from pathlib import Path
+
+source, target = map(Path, sys.argv[1:3])
+target.write_text(source.read_text().upper())
+print(f"copied {source.name}")
+"""
+
+
+def _stages(tmp_path: Path) -> list[Stage]:
+    scripts = tmp_path / "scripts"
+    scripts.mkdir(exist_ok=True)
+    (scripts / "01_upper.py").write_text(_COPY_SCRIPT)
+    (scripts / "02_upper.py").write_text(_COPY_SCRIPT)
+    raw, clean, report = tmp_path / "raw.txt", tmp_path / "clean.txt", tmp_path / "report.txt"
+    return [
+        Stage("clean", scripts / "01_upper.py", (raw,), (clean,), (str(raw), str(clean))),
+        Stage("report", scripts / "02_upper.py", (clean,), (report,), (str(clean), str(report))),
+    ]
+
+
+def test_run_pipeline_skips_unchanged_stages(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    stages = _stages(tmp_path)
+    (tmp_path / "raw.txt").write_text("hello")
+    kwargs: dict[str, Any] = {"cache_path": tmp_path / "cache.json", "log_dir": tmp_path / "logs"}
+
+    assert run_pipeline(stages, **kwargs) == ["clean", "report"]
+    assert (tmp_path / "report.txt").read_text() == "HELLO"
+    assert run_pipeline(stages, **kwargs) == []
+    assert "copied raw.txt" in capsys.readouterr().out
+
+
+def test_run_pipeline_reruns_changed_stage_and_dependents(tmp_path: Path) -> None:
+    stages = _stages(tmp_path)
+    (tmp_path / "raw.txt").write_text("hello")
+    kwargs: dict[str, Any] = {"cache_path": tmp_path / "cache.json", "log_dir": tmp_path / "logs"}
+    run_pipeline(stages, **kwargs)
+
+    (tmp_path / "scripts" / "02_upper.py").write_text(_COPY_SCRIPT + "\n# tweak\n")
+    assert run_pipeline(stages, **kwargs) == ["report"]
+
+    (tmp_path / "raw.txt").write_text("changed")
+    assert run_pipeline(stages, **kwargs) == ["clean", "report"]
+
+    (tmp_path / "report.txt").unlink()
+    assert run_pipeline(stages, **kwargs) == ["report"]
+
+
+def test_helper_change_reruns_only_the_stages_that_import_it(tmp_path: Path) -> None:
+    stages = _stages(tmp_path)
+    scripts = tmp_path / "scripts"
+    (scripts / "shared.py").write_text("SUFFIX = ''\n")
+    (scripts / "financial_helper.py").write_text("from shared import SUFFIX\n")
+    (scripts / "03_upper.py").write_text("import financial_helper\n" + _COPY_SCRIPT)
+    clean, summary = tmp_path / "clean.txt", tmp_path / "summary.txt"
+    stages.append(
+        Stage("summary", scripts / "03_upper.py", (clean,), (summary,), (str(clean), str(summary)))
+    )
+    (tmp_path / "raw.txt").write_text("hello")
+    kwargs: dict[str, Any] = {"cache_path": tmp_path / "cache.json", "log_dir": tmp_path / "logs"}
+    run_pipeline(stages, **kwargs)
+
+    (scripts / "financial_helper.py").write_text("from shared import SUFFIX  # tweak\n")
+    assert run_pipeline(stages, **kwargs) == ["summary"]
+
+    # Helpers imported through other helpers count too.
+    (scripts / "shared.py").write_text("SUFFIX = '!'\n")
+    assert run_pipeline(stages, **kwargs) == ["summary"]
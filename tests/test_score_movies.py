@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+# pylint: disable=protected-access
+import importlib.util
+import sys
+from pathlib import Path
+from typing import Any, cast
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+from model_artifact import ModelMetadata, save_model_artifact
+
+_MODULE_PATH = Path(__file__).resolve().parents[1] / "scripts" / "05_score_movies.py"
+_SPEC = importlib.util.spec_from_file_location("score_movies", _MODULE_PATH)
+if _SPEC is None or _SPEC.loader is None:
+    raise RuntimeError("Failed to load scoring module spec")
+
+_score = cast(Any, importlib.util.module_from_spec(_SPEC))
+sys.modules[_SPEC.name] = _score
+_SPEC.loader.exec_module(_score)  # type: ignore[arg-type]
+
+
+def _candidates(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    return pd.DataFrame(
+        {
+            "id": np.arange(rows),
+            "title": [f"Movie {i}" for i in range(rows)],
+            "runtime": rng.normal(110, 20, size=rows),
+            "primary_genre": rng.choice(["Drama", "Action"], size=rows),
+        }
+    )
+
+
+def _save_model(directory: Path, frame: pd.DataFrame) -> Pipeline:
+    pipeline = Pipeline(
+        steps=[
+            (
+                "pre",
+                ColumnTransformer(
+                    [
+                        ("num", "passthrough", ["runtime"]),
+                        ("cat", OneHotEncoder(handle_unknown="ignore"), ["primary_genre"]),
+                    ]
+                ),
+            ),
+            ("model", RandomForestRegressor(n_estimators=5, random_state=0)),
+        ]
+    )
+    pipeline.fit(frame[["runtime", "primary_genre"]], frame["runtime"] / 20)
+    meta = ModelMetadata(
+        num_features=["runtime"],
+        cat_features=["primary_genre"],
+        target="vote_average",
+        data_path="train.csv",
+        data_sha256="0" * 64,
+        training_rows=len(frame),
+    )
+    save_model_artifact(pipeline, meta, directory)
+    return pipeline
+
+
+def test_score_file_streams_batches(tmp_path: Path) -> None:
+    frame = _candidates(25)
+    pipeline = _save_model(tmp_path / "model", frame)
+    data_in = tmp_path / "candidates.csv"
+    frame.to_csv(data_in, index=False)
+    data_out = tmp_path / "predictions.csv"
+
+    report = _score.score_file(data_in, data_out, artifact_dir=tmp_path / "model", batch_size=10)
+
+    assert (report.rows, report.batches) == (25, 3)
+    predictions = pd.read_csv(data_out)
+    assert predictions.columns.tolist() == ["id", "title", _score.PREDICTION_COLUMN]
+    expected = pipeline.predict(frame[["runtime", "primary_genre"]])
+    np.testing.assert_allclose(predictions[_score.PREDICTION_COLUMN], expected)
+
+
+def test_score_file_reports_missing_features(tmp_path: Path) -> None:
+    frame = _candidates(5)
+    _save_model(tmp_path / "model", frame)
+    data_in = tmp_path / "candidates.csv"
+    frame.drop(columns="runtime").to_csv(data_in, index=False)
+
+    with pytest.raises(ValueError, match="runtime"):
+        _score.score_file(data_in, tmp_path / "out.csv", artifact_dir=tmp_path / "model")
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+# pylint: disable=protected-access
+import importlib.util
+import json
+import sys
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, cast
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from model_artifact import ModelMetadata
+
+_MODULE_PATH = Path(__file__).resolve().parents[1] / "scripts" / "06_serve_model.py"
+_SPEC = importlib.util.spec_from_file_location("serve_model", _MODULE_PATH)
+if _SPEC is None or _SPEC.loader is None:
+    raise RuntimeError("Failed to load serving module spec")
+
+_serve = cast(Any, importlib.util.module_from_spec(_SPEC))
+sys.modules[_SPEC.name] = _serve
+_SPEC.loader.exec_module(_serve)  # type: ignore[arg-type]
+
+_META = ModelMetadata(
+    num_features=["runtime"],
+    cat_features=["primary_genre"],
+    target="vote_average",
+    data_path="train.csv",
+    data_sha256="0" * 64,
+    training_rows=0,
+)
+
+
+class _RecordingModel:
+    """Predicts ``runtime / 10`` and records the size of every predict call."""
+
+    def __init__(self) -> None:
+        self.calls: list[int] = []
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        self.calls.append(len(X))
+        return X["runtime"].to_numpy() / 10
+
+
+class _FailingModel(_RecordingModel):
+    """Like ``_RecordingModel`` but fails on any negative runtime."""
+
+    def __init__(self, error: type[Exception] = ValueError) -> None:
+        super().__init__()
+        self.error = error
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        predictions = super().predict(X)
+        if (X["runtime"] < 0).any():
+            raise self.error("negative runtime")
+        return predictions
+
+
+def _row(runtime: float) -> dict[str, Any]:
+    return {"runtime": runtime, "primary_genre": "Drama"}
+
+
+def test_batcher_coalesces_concurrent_requests() -> None:
+    model = _RecordingModel()
+    batcher = _serve.MicroBatcher(model, _META, max_batch=64, max_wait_ms=50)
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(lambda i: batcher.predict([_row(float(i))]), range(32)))
+    finally:
+        batcher.close()
+
+    assert results == [[i / 10] for i in range(32)]
+    assert sum(model.calls) == 32
+    assert len(model.calls) < 32
+    stats = batcher.stats.snapshot()
+    assert (stats["requests"], stats["rows"], stats["batches"]) == (32, 32, len(model.calls))
+    assert stats["p99_ms"] >= stats["p50_ms"] > 0
+
+
+def test_batcher_rejects_rows_missing_features() -> None:
+    batcher = _serve.MicroBatcher(_RecordingModel(), _META)
+    try:
+        with pytest.raises(ValueError, match="primary_genre"):
+            batcher.predict([{"runtime": 90}])
+    finally:
+        batcher.close()
+
+
+def test_batch_failure_reaches_only_the_request_that_caused_it() -> None:
+    model = _FailingModel()
+    batcher = _serve.MicroBatcher(model, _META, max_batch=64, max_wait_ms=200)
+    try:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            good = pool.submit(batcher.predict, [_row(100)])
+            bad = pool.submit(batcher.predict, [_row(-1)])
+            assert good.result() == [10.0]
+            with pytest.raises(ValueError, match="negative runtime"):
+                bad.result()
+    finally:
+        batcher.close()
+
+    # Both requests were tried as one batch, then each on its own.
+    assert sorted(model.calls) == [1, 1, 2]
+
+
+def test_batcher_rejects_non_scalar_features() -> None:
+    batcher = _serve.MicroBatcher(_RecordingModel(), _META)
+    try:
+        with pytest.raises(ValueError, match="scalars: primary_genre"):
+            batcher.predict([{"runtime": 90, "primary_genre": {"x": 1}}])
+    finally:
+        batcher.close()
+
+
+def test_http_predict_and_stats() -> None:
+    batcher = _serve.MicroBatcher(_RecordingModel(), _META, max_wait_ms=0)
+    server = _serve.create_server(batcher, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+
+    def post(payload: dict) -> urllib.request.Request:
+        return urllib.request.Request(
+            f"{url}/predict",
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+
+    try:
+        with urllib.request.urlopen(post({"rows": [_row(100), _row(120)]})) as response:
+            assert json.loads(response.read()) == {"predictions": [10.0, 12.0]}
+        with urllib.request.urlopen(post(_row(90))) as response:
+            assert json.loads(response.read()) == {"predictions": [9.0]}
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(post({"rows": [{"runtime": 1}]}))
+        assert error.value.code == 400
+        with urllib.request.urlopen(f"{url}/stats") as response:
+            stats = json.loads(response.read())
+        assert (stats["requests"], stats["rows"]) == (2, 3)
+    finally:
+        server.shutdown()
+        server.server_close()
+        batcher.close()
+
+
+def test_http_unexpected_model_errors_return_500() -> None:
+    batcher = _serve.MicroBatcher(_FailingModel(RuntimeError), _META, max_wait_ms=0)
+    server = _serve.create_server(batcher, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{server.server_port}/predict",
+        data=json.dumps(_row(-5)).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+
+    try:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(request)
+        assert error.value.code == 500
+        assert json.loads(error.value.read()) == {"error": "RuntimeError: negative runtime"}
+    finally:
+        server.shutdown()
+        server.server_close()
+        batcher.close()
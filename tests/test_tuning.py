@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from tuning import TrialStore, candidate_key, halving_schedule, successive_halving
+
+
+def _data(rows: int = 60) -> tuple[pd.DataFrame, pd.Series]:
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(
+        {"x": rng.normal(size=rows), "genre": rng.choice(["Drama", "Action"], size=rows)}
+    )
+    return X, pd.Series(2 * X["x"] + rng.normal(scale=0.1, size=rows))
+
+
+def _build(params: dict[str, Any]) -> Pipeline:
+    scale = StandardScaler() if params["scale"] else "passthrough"
+    pre = ColumnTransformer([("num", scale, ["x"]), ("cat", OneHotEncoder(), ["genre"])])
+    model = RandomForestRegressor(n_estimators=5, random_state=0, n_jobs=-1)
+    return Pipeline([("pre", pre), ("model", model)])
+
+
+def _candidates() -> list[dict[str, Any]]:
+    return [
+        {"scale": scale, "model__min_samples_leaf": leaf}
+        for scale in (True, False)
+        for leaf in (1, 5, 20)
+    ]
+
+
+def test_halving_schedule() -> None:
+    assert halving_schedule(5) == [1, 3, 5]
+    assert halving_schedule(4, eta=2) == [1, 2, 4]
+    assert halving_schedule(1) == [1]
+    with pytest.raises(ValueError):
+        halving_schedule(5, eta=1)
+
+
+def test_successive_halving_prunes_and_resumes(tmp_path: Path) -> None:
+    X, y = _data()
+    path = tmp_path / "trials.jsonl"
+    messages: list[str] = []
+
+    first = successive_halving(
+        _candidates(),
+        X,
+        y,
+        _build,
+        store=TrialStore.load(path),
+        n_splits=3,
+        n_jobs=1,
+        log=messages.append,
+    )
+
+    # 6 candidates on fold 0, the best 2 on folds 1-2: 6 + 2 * 2 fits.
+    assert sum(1 for _ in path.open()) == 10
+    assert first["folds"].tolist() == [3, 3, 1, 1, 1, 1]
+    # Preprocessing is fitted once per (scale setting, fold), not once per fit.
+    survivor_scales = first.loc[first["folds"] == 3, "scale"].nunique()
+    fits = 2 + 2 * survivor_scales
+    assert messages[-1] == f"Preprocessing fitted {fits} time(s) for 6 candidate(s)"
+    assert first.loc[0, "cv_mae_mean"] <= first.loc[1, "cv_mae_mean"]
+
+    messages.clear()
+    resumed = successive_halving(
+        _candidates(),
+        X,
+        y,
+        _build,
+        store=TrialStore.load(path),
+        n_splits=3,
+        n_jobs=1,
+        log=messages.append,
+    )
+
+    assert sum(1 for _ in path.open()) == 10
+    assert all(message.endswith("0 fit(s) to run") for message in messages[:-1])
+    pd.testing.assert_frame_equal(resumed, first)
+
+
+def test_candidate_key_ignores_dict_order() -> None:
+    assert candidate_key({"a": 1, "b": 2}) == candidate_key({"b": 2, "a": 1})
+    assert candidate_key({"a": 1}) != candidate_key({"a": 2})